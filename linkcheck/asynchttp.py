@@ -0,0 +1,213 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Send HTTP requests with asyncio streams, reading only the response headers.
+
+Requests are prepared by a requests session and the responses are
+requests.Response objects without content, so the checking code can
+handle them like the responses of the session.
+"""
+import asyncio
+import functools
+import http.client
+import io
+import os
+import ssl
+import urllib.parse
+
+import requests
+from requests.cookies import MockRequest, MockResponse
+from requests.structures import CaseInsensitiveDict
+
+# Maximum size of the response status line and headers
+MAX_HEAD_BYTES = 64 * 1024
+
+
+class Response(requests.Response):
+    """Response whose content has not been read."""
+
+    def __init__(self):
+        """Initialize the peer certificate and the empty content."""
+        super().__init__()
+        # certificate of the SSL connection or None
+        self.peercert = None
+        # the parsed headers, an http.client.HTTPMessage
+        self.message = None
+        self.raw = io.BytesIO()
+
+
+@functools.lru_cache(maxsize=None)
+def get_ssl_context(verify):
+    """Return SSL context for the verify option of requests.
+
+    @param verify: False to not verify certificates, True or the file
+      or directory name of CA certificates to verify them
+    """
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    elif isinstance(verify, str):
+        context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context()
+    return context
+
+
+def get_request_head(request, urlparts):
+    """Return the request line and headers of a prepared request."""
+    path = urlparts.path or "/"
+    if urlparts.query:
+        path += "?" + urlparts.query
+    headers = CaseInsensitiveDict(request.headers)
+    if "Host" not in headers:
+        headers["Host"] = urlparts.netloc.rsplit("@", 1)[-1]
+    # the content is not read
+    headers["Connection"] = "close"
+    lines = [f"{request.method} {path} HTTP/1.1"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")
+
+
+def get_response(request, head, peercert):
+    """Return a response object for the status line and headers."""
+    status_line, _sep, header_lines = head.partition(b"\r\n")
+    parts = status_line.decode("iso-8859-1").split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise requests.exceptions.ConnectionError(
+            "Bad status line %r" % status_line, request=request
+        )
+    message = http.client.parse_headers(io.BytesIO(header_lines))
+    response = Response()
+    response.status_code = int(parts[1])
+    response.reason = parts[2] if len(parts) > 2 else ""
+    # multiple headers are joined like urllib3 does
+    headers = CaseInsensitiveDict()
+    for name, value in message.items():
+        if name in headers:
+            headers[name] += ", " + value
+        else:
+            headers[name] = value
+    response.headers = headers
+    response.encoding = requests.utils.get_encoding_from_headers(headers)
+    response.url = request.url
+    response.request = request
+    response.peercert = peercert
+    response.message = message
+    return response
+
+
+async def send(request, timeout, verify, cookies=None):
+    """Send a prepared request and read the response headers.
+
+    @param request: the prepared request
+    @param timeout: timeout in seconds for connecting and reading
+    @param verify: SSL verification as in requests
+    @param cookies: cookie jar to store the response cookies in, or None
+    @return: the response without content
+    @rtype: Response
+    """
+    urlparts = urllib.parse.urlsplit(request.url)
+    if urlparts.scheme == "https":
+        port = urlparts.port or 443
+        context = get_ssl_context(verify)
+    else:
+        port = urlparts.port or 80
+        context = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                urlparts.hostname, port, ssl=context, limit=MAX_HEAD_BYTES
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        raise requests.exceptions.ConnectTimeout(
+            "Connection to %s timed out" % urlparts.netloc, request=request
+        )
+    except ssl.SSLError as msg:
+        raise requests.exceptions.SSLError(msg, request=request)
+    except OSError as msg:
+        raise requests.exceptions.ConnectionError(msg, request=request)
+    try:
+        writer.write(get_request_head(request, urlparts))
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        while head.split(None, 2)[1:2] == [b"100"]:
+            # skip interim 100 Continue responses like http.client does
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        peercert = writer.get_extra_info("peercert") if context else None
+    except asyncio.TimeoutError:
+        raise requests.exceptions.ReadTimeout(
+            "Read from %s timed out" % urlparts.netloc, request=request
+        )
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as msg:
+        raise requests.exceptions.ConnectionError(msg, request=request)
+    finally:
+        writer.close()
+    response = get_response(request, head, peercert)
+    if cookies is not None:
+        cookies.extract_cookies(MockResponse(response.message), MockRequest(request))
+    return response
+
+
+async def resolve_redirects(session, response, timeout, verify, send_request=None):
+    """Follow the redirects of a response like the resolve_redirects()
+    method of requests sessions.
+
+    @param send_request: coroutine function sending the redirected
+      requests with the arguments of send(), or None to use send()
+
+    @return: list of redirected responses
+    @rtype: list of Response
+    """
+    responses = []
+    request = response.request
+    fragment = urllib.parse.urlsplit(request.url).fragment
+    url = session.get_redirect_target(response)
+    while url:
+        if len(responses) >= session.max_redirects:
+            raise requests.exceptions.TooManyRedirects(
+                "Exceeded %d redirects." % session.max_redirects, response=response
+            )
+        if url.startswith("//"):
+            url = "%s:%s" % (urllib.parse.urlsplit(response.url).scheme, url)
+        urlparts = urllib.parse.urlsplit(url)
+        if not urlparts.fragment and fragment:
+            urlparts = urlparts._replace(fragment=fragment)
+        elif urlparts.fragment:
+            fragment = urlparts.fragment
+        url = urllib.parse.urljoin(
+            response.url, requests.utils.requote_uri(urlparts.geturl())
+        )
+        request = request.copy()
+        request.url = url
+        session.rebuild_method(request, response)
+        if response.status_code not in (307, 308):
+            for header in ("Content-Length", "Content-Type", "Transfer-Encoding"):
+                request.headers.pop(header, None)
+            request.body = None
+        request.headers.pop("Cookie", None)
+        request.prepare_cookies(session.cookies)
+        session.rebuild_auth(request, response)
+        response = await (send_request or send)(
+            request, timeout, verify, cookies=session.cookies
+        )
+        responses.append(response)
+        url = session.get_redirect_target(response)
+    return responses
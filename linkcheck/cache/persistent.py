@@ -0,0 +1,202 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Store check results on disk to reuse them in later runs.
+"""
+import collections
+import datetime
+import json
+import os
+import sqlite3
+import time
+
+from .. import log, LOG_CACHE
+from ..checker.urlbase import CompactUrlData, urlDataAttr
+from ..decorators import synchronized
+from ..lock import get_lock
+from .results import ResultCache
+
+# lock object
+store_lock = get_lock("results_store_lock")
+
+# Number of stored results after which changes are committed.
+NUM_WRITES_COMMIT = 1000
+
+
+# A page stored for revalidation: the validators of the HTTP response,
+# the check result and the links found in the page content as lists of
+# UrlBase.add_url() arguments.
+StoredPage = collections.namedtuple(
+    "StoredPage", "etag last_modified result links"
+)
+
+
+def dump_result(result):
+    """Serialize a CompactUrlData object to a JSON string."""
+    data = {attr: getattr(result, attr) for attr in urlDataAttr}
+    if data["modified"] is not None:
+        data["modified"] = data["modified"].isoformat()
+    return json.dumps(data)
+
+
+def load_result(text):
+    """Deserialize a CompactUrlData object from a JSON string."""
+    data = json.loads(text)
+    data["warnings"] = [tuple(warning) for warning in data["warnings"]]
+    if data["modified"] is not None:
+        data["modified"] = datetime.datetime.fromisoformat(data["modified"])
+    return CompactUrlData(data)
+
+
+class PersistentResultCache(ResultCache):
+    """
+    Result cache that also stores results in an SQLite database.
+    Stored results are used by later runs as long as they are fresh;
+    valid and invalid results have different times to live. Pages stored
+    for revalidation have valid results and live as long as those.
+    """
+
+    def __init__(
+        self, filename, valid_ttl, invalid_ttl, result_cache_size,
+        result_cache_bytes=0,
+    ):
+        """Open the result database, creating it if needed.
+
+        @param filename: name of the SQLite database file
+        @param valid_ttl: seconds a stored valid result is fresh
+        @param invalid_ttl: seconds a stored invalid result is fresh
+        """
+        super().__init__(result_cache_size, result_cache_bytes)
+        self.filename = os.path.expanduser(filename)
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self.num_writes = 0
+        # the connection is shared by all threads and guarded by store_lock
+        self.connection = sqlite3.connect(self.filename, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results"
+            " (key TEXT PRIMARY KEY, valid INTEGER, checked REAL, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages"
+            " (key TEXT PRIMARY KEY, checked REAL, etag TEXT, last_modified TEXT,"
+            " data TEXT, links TEXT)"
+        )
+        self.remove_expired()
+
+    def get_ttl(self, valid):
+        """Return time to live in seconds for results of given validity."""
+        return self.valid_ttl if valid else self.invalid_ttl
+
+    @synchronized(store_lock)
+    def remove_expired(self):
+        """Delete all results and pages that are no longer fresh."""
+        now = time.time()
+        self.connection.execute(
+            "DELETE FROM results WHERE (valid AND checked < ?)"
+            " OR (NOT valid AND checked < ?)",
+            (now - self.valid_ttl, now - self.invalid_ttl),
+        )
+        self.connection.execute(
+            "DELETE FROM pages WHERE checked < ?", (now - self.valid_ttl,)
+        )
+        self.connection.commit()
+
+    def add_result(self, key, result):
+        """Add result object to cache and store it on disk."""
+        super().add_result(key, result)
+        if key is not None and result is not None:
+            self.store_result(key, result)
+
+    @synchronized(store_lock)
+    def store_result(self, key, result):
+        """Write result to the database."""
+        if self.connection is None:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (key, bool(result.valid), time.time(), dump_result(result)),
+        )
+        self.num_writes += 1
+        if self.num_writes >= NUM_WRITES_COMMIT:
+            self.num_writes = 0
+            self.connection.commit()
+
+    def get_stored_result(self, key):
+        """Return a fresh result of a previous run or None if not found.
+        The result is added to the in-memory cache."""
+        result = self.load_stored_result(key)
+        if result is not None:
+            log.debug(LOG_CACHE, "using stored result for %s", key)
+            super().add_result(key, result)
+        return result
+
+    @synchronized(store_lock)
+    def load_stored_result(self, key):
+        """Read a fresh result from the database or return None."""
+        if self.connection is None:
+            return None
+        row = self.connection.execute(
+            "SELECT valid, checked, data FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        valid, checked, data = row
+        if time.time() - checked > self.get_ttl(valid):
+            return None
+        return load_result(data)
+
+    @synchronized(store_lock)
+    def add_page(self, key, etag, last_modified, result, links):
+        """Store validators, result and links of a page for revalidation."""
+        if self.connection is None:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key, time.time(), etag, last_modified, dump_result(result),
+                json.dumps(links),
+            ),
+        )
+        self.num_writes += 1
+        if self.num_writes >= NUM_WRITES_COMMIT:
+            self.num_writes = 0
+            self.connection.commit()
+
+    @synchronized(store_lock)
+    def get_page(self, key):
+        """Return the fresh StoredPage for given key or None if not found."""
+        if self.connection is None:
+            return None
+        row = self.connection.execute(
+            "SELECT checked, etag, last_modified, data, links FROM pages"
+            " WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        checked, etag, last_modified, data, links = row
+        if time.time() - checked > self.valid_ttl:
+            return None
+        return StoredPage(etag, last_modified, load_result(data), json.loads(links))
+
+    @synchronized(store_lock)
+    def close(self):
+        """Commit pending changes and close the database."""
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
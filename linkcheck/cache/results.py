@@ -16,6 +16,10 @@
 """
 Cache check results.
 """
+import collections
+import sys
+
+from ..containers import HashSet
 from ..decorators import synchronized
 from ..lock import get_lock
 
@@ -23,45 +27,217 @@ from ..lock import get_lock
 # lock object
 cache_lock = get_lock("results_cache_lock")
 
+# A checked document: the result of one URL of the document without
+# anchor warnings, the set of anchors in the content, and a flag if the
+# links of the content have been queued.
+Document = collections.namedtuple("Document", "result anchors parsed")
+
+
+def get_size(obj):
+    """Estimate the memory used by a cached key, result or document in
+    bytes. Lists, tuples and sets are counted with their items and
+    objects with slots with their attribute values."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(get_size(item) for item in obj)
+    else:
+        for attr in getattr(obj, "__slots__", ()):
+            size += get_size(getattr(obj, attr, None))
+    return size
+
 
 class ResultCache:
     """
     Thread-safe cache of UrlData.to_wire() results.
     the cache is limited in size since we rather recheck the same URL
-    multiple times instead of running out of memory.
+    multiple times instead of running out of memory. When the cache is
+    full the least recently used entries are evicted.
     format: {cache key (string) -> result (UrlData.towire())}
     """
 
-    def __init__(self, result_cache_size):
-        """Initialize result cache."""
-        # mapping {URL -> cached result}
-        self.cache = {}
+    def __init__(self, result_cache_size, result_cache_bytes=0):
+        """Initialize result cache.
+
+        @param result_cache_size: maximum number of cached entries
+        @param result_cache_bytes: maximum estimated memory usage of the
+          cached entries and documents in bytes, or zero for no limit
+        """
+        # mapping {URL -> cached result}, least recently used first
+        self.cache = collections.OrderedDict()
         self.max_size = result_cache_size
+        # mapping {URL -> estimated size of cache entry}
+        self.sizes = {}
+        self.max_bytes = result_cache_bytes
+        self.num_bytes = 0
+        # hashes of all keys that have been queued or added, also of
+        # the keys whose results have been evicted
+        self.seen = HashSet()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # functions called with the key of each stored non-empty result
+        self.listeners = []
+        # mapping {URL without anchor -> Document}, least recently used first
+        self.documents = collections.OrderedDict()
+        # mapping {URL without anchor -> estimated size of document}
+        self.document_sizes = {}
+
+    def add_listener(self, listener):
+        """Call listener(key) whenever a non-empty result is stored.
+        Listeners are called without holding the cache lock."""
+        self.listeners.append(listener)
 
     @synchronized(cache_lock)
     def get_result(self, key):
         """Return cached result or None if not found."""
-        return self.cache.get(key)
+        result = self.cache.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return result
 
     @synchronized(cache_lock)
+    def peek_result(self, key):
+        """Return cached result or None if not found, without counting
+        a cache hit or marking the result as recently used."""
+        return self.cache.get(key)
+
     def add_result(self, key, result):
         """Add result object to cache with given key.
-        The request is ignored when the cache is already full or the key
-        is None.
+        The request is ignored when the key is None. A None result only
+        marks the key as seen; it is not stored, so it cannot be evicted.
         """
-        if len(self.cache) > self.max_size:
-            return
-        if key is not None:
-            self.cache[key] = result
+        if self._add_result(key, result) and result is not None:
+            for listener in self.listeners:
+                listener(key)
 
-    def has_result(self, key):
-        """Non-thread-safe function for fast containment checks."""
+    @synchronized(cache_lock)
+    def _add_result(self, key, result):
+        """Store result object and return True if it was stored."""
+        if key is None:
+            return False
+        self.seen.add(key)
+        if result is None:
+            return False
+        if key in self.cache:
+            self.num_bytes -= self.sizes[key]
+            self.cache.move_to_end(key)
+        self.cache[key] = result
+        self.sizes[key] = get_size(key) + get_size(result)
+        self.num_bytes += self.sizes[key]
+        self._evict()
         return key in self.cache
 
+    def _evict(self):
+        """Remove least recently used entries until the cache is within
+        its limits. Documents are removed before results when the byte
+        budget is exceeded. The most recently added entry and document
+        are always kept. Not thread-safe!"""
+        while len(self.cache) > 1 and len(self.cache) > self.max_size:
+            self._evict_result()
+        while self.max_bytes and self.num_bytes > self.max_bytes:
+            if len(self.documents) > 1:
+                self._evict_document()
+            elif len(self.cache) > 1:
+                self._evict_result()
+            else:
+                break
+
+    def _evict_result(self):
+        """Remove the least recently used entry. Not thread-safe!"""
+        key, result = self.cache.popitem(last=False)
+        self.num_bytes -= self.sizes.pop(key)
+        self.evictions += 1
+
+    def _evict_document(self):
+        """Remove the least recently used document. Not thread-safe!"""
+        url, document = self.documents.popitem(last=False)
+        self.num_bytes -= self.document_sizes.pop(url)
+
+    @synchronized(cache_lock)
+    def has_result(self, key):
+        """Check if the cache has an entry for given key, and mark
+        the entry as recently used. Unlike get_result() this does not
+        count a cache hit or miss."""
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return True
+        return False
+
+    @synchronized(cache_lock)
+    def mark_seen(self, key):
+        """Remember that the URL with given key has been queued. Only a
+        hash of the key is kept, so URLs are not checked twice even when
+        their results have been evicted. The request is ignored when the
+        key is None.
+
+        @return: False if the key has been queued or added before, else True
+        """
+        if key is None:
+            return True
+        return self.seen.add(key)
+
+    @synchronized(cache_lock)
+    def unmark_seen(self, key):
+        """Forget that the URL with given key has been queued."""
+        if key is not None:
+            self.seen.discard(key)
+
+    @property
+    def num_keys(self):
+        """Number of different keys that have been queued or added."""
+        return len(self.seen)
+
+    @synchronized(cache_lock)
+    def get_document(self, url):
+        """Return the Document for given URL without anchor or None."""
+        document = self.documents.get(url)
+        if document is not None:
+            self.documents.move_to_end(url)
+        return document
+
+    @synchronized(cache_lock)
+    def add_document(self, url, document):
+        """Add Document for given URL without anchor."""
+        if url in self.documents:
+            self.num_bytes -= self.document_sizes[url]
+            self.documents.move_to_end(url)
+        self.documents[url] = document
+        self.document_sizes[url] = get_size(url) + get_size(document)
+        self.num_bytes += self.document_sizes[url]
+        while len(self.documents) > max(1, self.max_size):
+            self._evict_document()
+        self._evict()
+
+    def get_stored_result(self, key):
+        """Return a result of a previous run or None if not found.
+        This cache does not store results across runs."""
+        return None
+
+    def get_page(self, key):
+        """Return a page stored for revalidation or None if not found.
+        This cache does not store pages."""
+        return None
+
+    def add_page(self, key, etag, last_modified, result, links):
+        """Store a page for revalidation. This cache does not store pages."""
+        pass
+
+    def close(self):
+        """Release resources at the end of the check run."""
+        pass
+
     def has_non_empty_result(self, key):
         """Non-thread-safe function for fast containment checks."""
         return self.cache.get(key)
 
+    def status(self):
+        """Get tuple (cache hits, cache misses, evictions)."""
+        # no need to acquire the lock since the numbers are unreliable anyways.
+        return (self.hits, self.misses, self.evictions)
+
     def __len__(self):
         """Get number of cached elements. This is not thread-safe and is
         likely to change before the returned value is used."""
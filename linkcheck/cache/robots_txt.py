@@ -43,6 +43,18 @@ class RobotsTxt:
         self.hits = self.misses = 0
         self.roboturl_locks = {}
         self.useragent = useragent
+        # functions called with the URL and content of each parsed robots.txt
+        self.listeners = []
+
+    def add_listener(self, listener):
+        """Call listener(roboturl, rp) whenever a robots.txt file has been
+        downloaded and parsed."""
+        self.listeners.append(listener)
+
+    @synchronized(cache_lock)
+    def add_robots_txt(self, roboturl, rp):
+        """Store a parsed robots.txt file, for example of an earlier run."""
+        self.cache[roboturl] = rp
 
     def allows_url(self, url_data, timeout=None):
         """Ask robots.txt allowance."""
@@ -65,6 +77,8 @@ class RobotsTxt:
         rp.read()
         with cache_lock:
             self.cache[roboturl] = rp
+        for listener in self.listeners:
+            listener(roboturl, rp)
         self.add_sitemap_urls(rp, url_data, roboturl)
         return rp.can_fetch(self.useragent, url_data.url)
 
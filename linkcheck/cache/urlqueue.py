@@ -16,10 +16,17 @@
 """
 Handle a queue of URLs to check.
 """
+import os
+import pickle
+import shutil
+import tempfile
 import threading
 import collections
+import heapq
+import itertools
 from time import time as _time
 from .. import log, LOG_CACHE
+from ..checker import PendingUrl
 
 
 class Timeout(Exception):
@@ -34,18 +41,113 @@ class Empty(Exception):
     pass
 
 
-NUM_PUTS_CLEANUP = 10000
+# Number of queued URLs get() inspects when looking for a URL
+# whose host can be contacted without waiting.
+NUM_GET_LOOKAHEAD = 100
+
+
+class SpillFile:
+    """Append-only temporary file of pending links that do not fit into
+    the memory of a URL queue. Links are read back in the order they
+    were written. The links already read are removed from the file when
+    they take up at least half of it, so the file does not grow without
+    bounds while links are written and read. Spilled links are not
+    moved by UrlQueue.promote() before they are read back."""
+
+    # minimum number of bytes of read links before the file is compacted
+    compact_bytes = 1024 * 1024
+
+    def __init__(self):
+        """Initialize the read position. The file is created when the
+        first link is written."""
+        self.file = None
+        self.read_pos = 0
+        self.writing = False
+        self.num_urls = 0
+        # the aggregate of the links, which is not written to the file
+        self.aggregate = None
+
+    def __len__(self):
+        """Return the number of links in the file."""
+        return self.num_urls
+
+    def append(self, url_data):
+        """Write a pending link at the end of the file."""
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(prefix="linkchecker-queue-")
+        if not self.writing:
+            self.file.seek(0, os.SEEK_END)
+            self.writing = True
+        self.aggregate = url_data.aggregate
+        fields = tuple(url_data._replace(aggregate=None))
+        pickle.dump(fields, self.file, pickle.HIGHEST_PROTOCOL)
+        self.num_urls += 1
+
+    def pop(self, num):
+        """Read and return the first num pending links of the file."""
+        num = min(num, self.num_urls)
+        self.file.seek(self.read_pos)
+        self.writing = False
+        urls = []
+        for dummy in range(num):
+            url_data = PendingUrl(*pickle.load(self.file))
+            urls.append(url_data._replace(aggregate=self.aggregate))
+        self.read_pos = self.file.tell()
+        self.num_urls -= num
+        if not self.num_urls:
+            self.clear()
+        elif self.read_pos >= self.compact_bytes:
+            self.compact()
+        return urls
+
+    def compact(self):
+        """Copy the unread links to a new file if the read links take up
+        at least half of the file."""
+        size = self.file.seek(0, os.SEEK_END)
+        self.writing = True
+        if 2 * self.read_pos < size:
+            return
+        new_file = tempfile.TemporaryFile(prefix="linkchecker-queue-")
+        self.file.seek(self.read_pos)
+        shutil.copyfileobj(self.file, new_file)
+        self.file.close()
+        self.file = new_file
+        self.read_pos = 0
+
+    def clear(self):
+        """Remove all links from the file."""
+        if self.file is not None:
+            self.file.seek(0)
+            self.file.truncate()
+        self.read_pos = 0
+        self.writing = False
+        self.num_urls = 0
 
 
 class UrlQueue:
     """A queue supporting several consumer tasks. The task_done() idea is
     from the Python 2.5 implementation of Queue.Queue()."""
 
-    def __init__(self, max_allowed_urls=None):
-        """Initialize the queue state and task counters."""
+    def __init__(self, max_allowed_urls=None, host_scheduler=None, memory_size=0):
+        """Initialize the queue state and task counters.
+
+        @param max_allowed_urls: maximum number of URLs to check or None
+        @param host_scheduler: if not None, prefer URLs whose host is due
+        @type host_scheduler: director.scheduler.HostScheduler or None
+        @param memory_size: number of queued URLs kept in memory, further
+          pending links are written to a temporary file; 0 means no limit
+        """
         # Note: don't put a maximum size on the queue since it would
         # lead to deadlocks when all worker threads called put().
+        # The queue has two lanes: URLs whose result is already known
+        # are checked first since they need no network access.
+        self.cached = collections.deque()
+        # URLs without known result.
         self.queue = collections.deque()
+        # mapping {cache key -> URLs without known result}
+        self.pending = {}
+        # ids of URLs moved to self.cached that are still in self.queue
+        self.promoted = set()
         # mutex must be held whenever the queue is mutating.  All methods
         # that acquire mutex must release it before returning.  mutex
         # is shared between the two conditions, so acquiring and
@@ -66,24 +168,45 @@ class UrlQueue:
                 "Non-positive number of allowed URLs: %d" % max_allowed_urls
             )
         self.max_allowed_urls = max_allowed_urls
-        self.num_puts = 0
+        self.host_scheduler = host_scheduler
+        self.memory_size = memory_size
+        # pending links that did not fit into memory, in queue order
+        self.spill_file = SpillFile()
+        # heap of URLs to check again later: (due time, number, URL)
+        self.delayed = []
+        self.delayed_numbers = itertools.count()
+        # cache keys of the URLs in self.delayed
+        self.delayed_keys = set()
+        # number of task_done() calls for requeued URLs still to come
+        self.requeued_tasks = 0
+        # records queued and finished URLs for checkpoints, or None
+        self.checkpoint = None
 
     def qsize(self):
         """Return the approximate size of the queue (not reliable!)."""
         with self.mutex:
-            return len(self.queue)
+            return self._qsize()
+
+    def _qsize(self):
+        """Return the number of queued URLs. Not thread-safe!"""
+        return self._memory_qsize() + len(self.spill_file)
+
+    def _memory_qsize(self):
+        """Return the number of queued URLs in memory. Not thread-safe!"""
+        return len(self.cached) + len(self.queue) - len(self.promoted)
 
     def empty(self):
-        """Return True if the queue is empty, False otherwise.
+        """Return True if the queue is empty and no URLs are delayed,
+        False otherwise.
         Result is thread-safe, but not reliable since the queue could have
         been changed before the result is returned!"""
         with self.mutex:
-            return self._empty()
+            return self._empty() and not self.delayed
 
     def _empty(self):
         """Return True if the queue is empty, False otherwise.
         Not thread-safe!"""
-        return not self.queue
+        return not self._qsize()
 
     def get(self, timeout=None):
         """Get first not-in-progress url from the queue and
@@ -96,19 +219,90 @@ class UrlQueue:
         """Non thread-safe utility function of self.get() doing the real
         work."""
         if timeout is None:
-            while self._empty():
-                self.not_empty.wait()
+            endtime = None
+        elif timeout < 0:
+            raise ValueError("'timeout' must be a positive number")
         else:
-            if timeout < 0:
-                raise ValueError("'timeout' must be a positive number")
             endtime = _time() + timeout
-            while self._empty():
+        while self._empty_after_delayed():
+            remaining = None
+            if endtime is not None:
                 remaining = endtime - _time()
                 if remaining <= 0.0:
                     raise Empty()
-                self.not_empty.wait(remaining)
+            if self.delayed:
+                due = max(0.0, self.delayed[0][0] - _time())
+                remaining = due if remaining is None else min(remaining, due)
+            self.not_empty.wait(remaining)
         self.in_progress += 1
-        return self.queue.popleft()
+        self._read_spilled()
+        return self._pop_due()
+
+    def _empty_after_delayed(self):
+        """Queue the delayed URLs that are due and return True if the
+        queue is empty. Not thread-safe!"""
+        now = _time()
+        while self.delayed and self.delayed[0][0] <= now:
+            url_data = heapq.heappop(self.delayed)[2]
+            self.delayed_keys.discard(url_data.cache_url)
+            self._append(url_data)
+            self.pending.setdefault(url_data.cache_url, []).append(url_data)
+        return self._empty()
+
+    def _read_spilled(self):
+        """Move spilled links back into memory while there is room.
+        Not thread-safe!"""
+        num = self.memory_size - self._memory_qsize()
+        if self.spill_file and num > 0:
+            for url_data in self.spill_file.pop(num):
+                self._append(url_data)
+                self.pending.setdefault(url_data.cache_url, []).append(url_data)
+
+    def _pop_due(self):
+        """Remove and return the first URL with known result, else the
+        first URL whose host is due. If no such URL is among the first
+        queued URLs, return the first URL."""
+        if self.cached:
+            return self.cached.popleft()
+        self._drop_promoted(self.queue)
+        if self.host_scheduler is not None:
+            lookahead = itertools.islice(self.queue, NUM_GET_LOOKAHEAD)
+            for pos, url_data in enumerate(lookahead):
+                if id(url_data) in self.promoted:
+                    continue
+                if self.host_scheduler.is_due(url_data):
+                    if pos > 0:
+                        del self.queue[pos]
+                        self._remove_pending(url_data)
+                        return url_data
+                    break
+        url_data = self.queue.popleft()
+        self._remove_pending(url_data)
+        return url_data
+
+    def _drop_promoted(self, urls):
+        """Remove promoted URLs from the start of given deque.
+        Not thread-safe!
+
+        @return: number of removed URLs
+        """
+        num = 0
+        while urls and id(urls[0]) in self.promoted:
+            self.promoted.remove(id(urls.popleft()))
+            num += 1
+        return num
+
+    def _remove_pending(self, url_data):
+        """Remove URL from the mapping of URLs without known result.
+        Not thread-safe!"""
+        key = url_data.cache_url
+        urls = self.pending[key]
+        for pos, pending_url_data in enumerate(urls):
+            if pending_url_data is url_data:
+                del urls[pos]
+                break
+        if not urls:
+            del self.pending[key]
 
     def put(self, item):
         """Put an item into the queue.
@@ -124,43 +318,94 @@ class UrlQueue:
             return
         key = url_data.cache_url
         cache = url_data.aggregate.result_cache
-        if cache.has_result(key):
-            log.debug(LOG_CACHE, "skipping %s, %s already cached", url_data.url, key)
+        if not cache.mark_seen(key):
+            log.debug(LOG_CACHE, "skipping %s, %s already queued", url_data.url, key)
             return
         log.debug(LOG_CACHE, "queueing %s", url_data.url)
         if url_data.has_result:
-            self.queue.appendleft(url_data)
+            self.cached.appendleft(url_data)
         else:
             assert key is not None, "no result for None key: %s" % url_data
             if self.max_allowed_urls is not None:
                 self.max_allowed_urls -= 1
-            self.num_puts += 1
-            if self.num_puts >= NUM_PUTS_CLEANUP:
-                self.cleanup()
-            self.queue.append(url_data)
+            if self._must_spill(url_data):
+                self.spill_file.append(url_data)
+            else:
+                self._append(url_data)
+                self.pending.setdefault(key, []).append(url_data)
         self.unfinished_tasks += 1
-        # add none value to cache to prevent checking this url multiple times
-        cache.add_result(key, None)
-
-    def cleanup(self):
-        """Move cached elements to top."""
-        self.num_puts = 0
-        cached = []
-        for i, url_data in enumerate(self.queue):
-            key = url_data.cache_url
+        if self.checkpoint is not None:
+            self.checkpoint.url_queued(url_data)
+
+    def requeue(self, url_data, delay):
+        """Put an URL back in the queue to be checked again after given
+        number of seconds. Called by a consumer between get() and
+        task_done(); the following task_done() call does not count a
+        finished task. The URL has been queued before, so its cache key
+        is not marked as seen, it does not count as allowed URL and it is
+        not recorded for checkpoints again."""
+        with self.mutex:
+            if self.shutdown:
+                return
+            log.debug(LOG_CACHE, "queueing %s in %.1f seconds", url_data.url, delay)
+            heapq.heappush(
+                self.delayed, (_time() + delay, next(self.delayed_numbers), url_data)
+            )
+            self.delayed_keys.add(url_data.cache_url)
+            self.unfinished_tasks += 1
+            self.requeued_tasks += 1
+            self.not_empty.notify()
+
+    def _must_spill(self, url_data):
+        """Return True if given URL without result is written to the
+        spill file. Only pending links are written, and once the file
+        has links all following pending links go there too to keep the
+        queue order. Not thread-safe!"""
+        if not self.memory_size or not isinstance(url_data, PendingUrl):
+            return False
+        return bool(self.spill_file) or self._memory_qsize() >= self.memory_size
+
+    def _append(self, url_data):
+        """Append URL without result to the queue. Not thread-safe!"""
+        self.queue.append(url_data)
+
+    def claim(self, url_data, pending_key):
+        """Mark the cache key of a URL constructed from a pending link as
+        queued, like put() does. The URL is a duplicate if its key differs
+        from the approximated key of the pending link and has already been
+        queued or checked. The approximated key marked by put() is
+        forgotten then, and a duplicate does not count as allowed URL.
+
+        @return: False if the URL is a duplicate, else True
+        """
+        key = url_data.cache_url
+        if key == pending_key:
+            return True
+        with self.mutex:
             cache = url_data.aggregate.result_cache
-            if cache.has_non_empty_result(key):
-                cached.append(i)
-        for pos in cached:
-            self._move_to_top(pos)
-
-    def _move_to_top(self, pos):
-        """Move element at given position to top of queue."""
-        if pos > 0:
-            self.queue.rotate(-pos)
-            item = self.queue.popleft()
-            self.queue.rotate(pos)
-            self.queue.appendleft(item)
+            cache.unmark_seen(pending_key)
+            if not cache.mark_seen(key):
+                log.debug(
+                    LOG_CACHE, "skipping %s, %s already queued", url_data.url, key
+                )
+                if self.max_allowed_urls is not None:
+                    self.max_allowed_urls += 1
+                return False
+            if url_data.has_result and self.max_allowed_urls is not None:
+                # put() does not count URLs with known result
+                self.max_allowed_urls += 1
+            return True
+
+    def promote(self, key):
+        """Move queued URLs with given cache key to the lane of URLs with
+        known result. Called by the result cache after a result for the
+        key has been stored. Spilled links are not moved; they get the
+        result from the cache when they are checked."""
+        with self.mutex:
+            for url_data in self.pending.pop(key, ()):
+                # the URL stays in its old lane and is skipped there
+                self.promoted.add(id(url_data))
+                self.cached.append(url_data)
 
     def task_done(self, url_data):
         """
@@ -179,7 +424,16 @@ class UrlQueue:
         """
         with self.all_tasks_done:
             log.debug(LOG_CACHE, "task_done %s", url_data.url)
-            self.finished_tasks += 1
+            if (
+                self.checkpoint is not None
+                and url_data.cache_url not in self.delayed_keys
+            ):
+                self.checkpoint.url_done(url_data)
+            if self.requeued_tasks:
+                # the task continues with the requeued URL
+                self.requeued_tasks -= 1
+            else:
+                self.finished_tasks += 1
             self.unfinished_tasks -= 1
             self.in_progress -= 1
             if self.unfinished_tasks <= 0:
@@ -213,8 +467,8 @@ class UrlQueue:
     def do_shutdown(self):
         """Shutdown the queue by not accepting any more URLs."""
         with self.mutex:
-            unfinished = self.unfinished_tasks - len(self.queue)
-            self.queue.clear()
+            unfinished = self.unfinished_tasks - self._qsize() - len(self.delayed)
+            self._clear()
             if unfinished <= 0:
                 if unfinished < 0:
                     raise ValueError('shutdown is in error')
@@ -222,7 +476,97 @@ class UrlQueue:
             self.unfinished_tasks = unfinished
             self.shutdown = True
 
+    def _clear(self):
+        """Remove all queued URLs. Not thread-safe!"""
+        self.cached.clear()
+        self.queue.clear()
+        self.pending.clear()
+        self.promoted.clear()
+        self.spill_file.clear()
+        self.delayed.clear()
+        self.delayed_keys.clear()
+
     def status(self):
         """Get tuple (finished tasks, in progress, queue size)."""
         # no need to acquire self.mutex since the numbers are unreliable anyways.
-        return (self.finished_tasks, self.in_progress, len(self.queue))
+        return (
+            self.finished_tasks, self.in_progress, self._qsize() + len(self.delayed)
+        )
+
+
+def get_host_key(url_data):
+    """Return the lowercase host of the URL with its port if it is not the
+    default port, or an empty string for URLs without host."""
+    return url_data.host_key or ""
+
+
+class HostUrlQueue(UrlQueue):
+    """A URL queue keeping one sub-queue per host. URLs without result
+    are dispatched round-robin over the hosts, preferring hosts whose
+    next request is due. This keeps many threads busy on different hosts
+    when pages link to lots of URLs on one host."""
+
+    def __init__(self, max_allowed_urls=None, host_scheduler=None, memory_size=0):
+        """Initialize the host sub-queues."""
+        super().__init__(
+            max_allowed_urls=max_allowed_urls,
+            host_scheduler=host_scheduler,
+            memory_size=memory_size,
+        )
+        # URLs without known result are queued in self.hosts
+        # instead of self.queue.
+        # mapping {host -> deque of URLs}, in round-robin order
+        self.hosts = collections.OrderedDict()
+        self.num_host_urls = 0
+
+    def _memory_qsize(self):
+        """Return the number of queued URLs in memory. Not thread-safe!"""
+        return len(self.cached) + self.num_host_urls - len(self.promoted)
+
+    def _append(self, url_data):
+        """Append URL without result to the queue of its host.
+        Not thread-safe!"""
+        host = get_host_key(url_data)
+        if host not in self.hosts:
+            self.hosts[host] = collections.deque()
+        self.hosts[host].append(url_data)
+        self.num_host_urls += 1
+
+    def _pop_due(self):
+        """Remove and return the first URL with known result, else the next
+        URL of the first host in round-robin order which is due. If none of
+        the first hosts is due, return the URL of the first host."""
+        if self.cached:
+            return self.cached.popleft()
+        hosts = []
+        while not hosts:
+            # skip hosts which only have promoted URLs left
+            for host in list(itertools.islice(self.hosts, NUM_GET_LOOKAHEAD)):
+                urls = self.hosts[host]
+                self.num_host_urls -= self._drop_promoted(urls)
+                if urls:
+                    hosts.append(host)
+                else:
+                    del self.hosts[host]
+        host = hosts[0]
+        if self.host_scheduler is not None:
+            for _host in hosts:
+                if self.host_scheduler.is_due(self.hosts[_host][0]):
+                    host = _host
+                    break
+        urls = self.hosts[host]
+        url_data = urls.popleft()
+        self.num_host_urls -= 1
+        self._remove_pending(url_data)
+        if urls:
+            # serve the other hosts first
+            self.hosts.move_to_end(host)
+        else:
+            del self.hosts[host]
+        return url_data
+
+    def _clear(self):
+        """Remove all queued URLs. Not thread-safe!"""
+        super()._clear()
+        self.hosts.clear()
+        self.num_host_urls = 0
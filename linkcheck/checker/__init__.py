@@ -20,6 +20,7 @@ Main functions for link checking.
 import os
 import html
 import urllib.parse
+from collections import namedtuple
 
 from .. import url as urlutil, log, LOG_CHECK
 
@@ -150,6 +151,110 @@ def get_url_from(
     )
 
 
+class PendingUrl(
+    namedtuple(
+        "PendingUrl",
+        "base_url recursion_level aggregate parent_url base_ref line column "
+        "page name parent_content_type url_encoding cache_url scheme host_key",
+    )
+):
+    """A link found in a document, queued without constructing its
+    checker object. The cache_url is a cheap approximation of the cache
+    URL of the checker object, used to skip duplicate links; the checker
+    object is constructed by get_url_data() when the link is checked.
+    The scheme and host key are split from the cache_url once when the
+    link is queued."""
+
+    __slots__ = ()
+
+    # the result is not known before the checker object exists
+    has_result = False
+
+    @property
+    def url(self):
+        """The URL as found in the document."""
+        return self.base_url
+
+    def get_url_data(self):
+        """Construct the checker object of the link."""
+        return get_url_from(
+            self.base_url,
+            self.recursion_level,
+            self.aggregate,
+            parent_url=self.parent_url,
+            base_ref=self.base_ref,
+            line=self.line,
+            column=self.column,
+            page=self.page,
+            name=self.name,
+            parent_content_type=self.parent_content_type,
+            url_encoding=self.url_encoding,
+        )
+
+
+def get_pending_url(
+    base_url,
+    recursion_level,
+    aggregate,
+    parent_url=None,
+    base_ref=None,
+    line=None,
+    column=None,
+    page=0,
+    name="",
+    parent_content_type=None,
+    url_encoding=None,
+):
+    """
+    Get a pending link record from given base data. The parameters are
+    the same as for get_url_from().
+
+    @return: the pending link, or the checker object of a link which
+      cannot be split into URL parts
+    @rtype: PendingUrl or UrlBase
+    """
+    url = base_url.strip()
+    base = base_ref or parent_url
+    try:
+        if base:
+            url = urllib.parse.urljoin(base, url)
+        if "AnchorCheck" not in aggregate.config["enabledplugins"]:
+            # like UrlBase.set_cache_url()
+            url = urllib.parse.urldefrag(url)[0]
+        split = urllib.parse.urlsplit(url)
+    except ValueError:
+        # the syntax error is the result of the link
+        return get_url_from(
+            base_url,
+            recursion_level,
+            aggregate,
+            parent_url=parent_url,
+            base_ref=base_ref,
+            line=line,
+            column=column,
+            page=page,
+            name=name,
+            parent_content_type=parent_content_type,
+            url_encoding=url_encoding,
+        )
+    return PendingUrl(
+        base_url,
+        recursion_level,
+        aggregate,
+        parent_url,
+        base_ref,
+        line,
+        column,
+        page,
+        name,
+        parent_content_type,
+        url_encoding,
+        url,
+        split.scheme,
+        urlutil.url_host_key(split),
+    )
+
+
 def get_urlclass_from(scheme, assume_local_file=False):
     """Return checker class for given URL scheme. If the scheme
     cannot be matched and assume_local_file is True, assume a local file.
@@ -93,6 +93,8 @@ class FileUrl(urlbase.UrlBase):
     Url link with file scheme.
     """
 
+    __slots__ = ()
+
     def init(
         self,
         base_ref,
@@ -312,6 +314,8 @@ class AnchorCheckFileUrl(FileUrl):
     File URL link for AnchorCheck plugin.
     """
 
+    __slots__ = ("url_without_anchor",)
+
     def reset(self):
         super().reset()
         # the local file URI
@@ -30,6 +30,8 @@ class FtpUrl(internpaturl.InternPatternUrl):
     Url link with ftp scheme.
     """
 
+    __slots__ = ("filename", "filename_encoding", "files")
+
     def reset(self):
         """
         Initialize FTP url data.
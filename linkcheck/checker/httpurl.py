@@ -17,6 +17,12 @@
 Handle http links.
 """
 
+import asyncio
+import codecs
+import contextlib
+import time
+import urllib.parse
+
 import requests
 
 # The validity of SSL certs is ignored to be able
@@ -31,7 +37,6 @@ warnings.simplefilter(
 )
 
 from io import BytesIO
-import re
 
 from .. import (
     log,
@@ -40,17 +45,26 @@ from .. import (
     url as urlutil,
     LinkCheckerError,
     httputil,
+    asynchttp,
 )
+from ..htmlutil import htmlsoup, linkparse
 from . import internpaturl
 
 # import warnings
-from .const import WARN_HTTP_EMPTY_CONTENT, WARN_HTTP_RATE_LIMITED, WARN_HTTP_REDIRECTED
+from .const import (
+    WARN_HTTP_EMPTY_CONTENT,
+    WARN_HTTP_RATE_LIMITED,
+    WARN_HTTP_REDIRECTED,
+    WARN_URL_ERROR_GETTING_CONTENT,
+    ExcList,
+)
 from requests.sessions import REDIRECT_STATI
 
 HTTP_SCHEMAS = ('http://', 'https://')
 
-# match for robots meta element content attribute
-nofollow_re = re.compile(r"\bnofollow\b", re.IGNORECASE)
+# seconds to wait before the first retry of an URL without Retry-After
+# header, doubled for each further retry
+RETRY_BACKOFF_SECONDS = 1.0
 
 
 class HttpUrl(internpaturl.InternPatternUrl):
@@ -58,6 +72,11 @@ class HttpUrl(internpaturl.InternPatternUrl):
     Url link with http scheme.
     """
 
+    __slots__ = (
+        "auth", "headers", "not_modified", "redirects", "session", "ssl_cert",
+        "ssl_cipher", "stored_page",
+    )
+
     def reset(self):
         """
         Initialize HTTP specific variables.
@@ -69,6 +88,12 @@ class HttpUrl(internpaturl.InternPatternUrl):
         self.auth = None
         self.ssl_cipher = None
         self.ssl_cert = None
+        # page stored by a previous run for revalidation
+        self.stored_page = None
+        # flag if the server confirmed that the stored page is unchanged
+        self.not_modified = False
+        # redirected responses fetched by check_async()
+        self.redirects = None
 
     def allows_robots(self, url):
         """
@@ -93,9 +118,7 @@ class HttpUrl(internpaturl.InternPatternUrl):
         """
         if not self.is_html():
             return True
-
-        soup = self.get_soup()
-        return not soup.find("meta", attrs={"name": "robots", "content": nofollow_re})
+        return not self.get_analysis().nofollow
 
     def add_size_info(self):
         """Get size of URL content from HTTP header."""
@@ -139,21 +162,176 @@ class HttpUrl(internpaturl.InternPatternUrl):
             self.set_result(_("syntax OK"))
             self.do_check_content = False
             return
+        if self.aggregate.config["revalidate"] and self.allows_simple_recursion():
+            self.stored_page = self.aggregate.result_cache.get_page(self.cache_url)
+            self.found_links = []
         # check the http connection
-        request = self.build_request()
+        request = self.build_request(self.get_request_method())
         self.send_request(request)
+        if self.head_failed():
+            request = self.build_request()
+            self.send_request(request)
         self._add_response_info()
         self.follow_redirections(request)
+        if self.head_failed() or self.head_lacks_content():
+            # the redirection target does not support HEAD requests, or
+            # its content is needed
+            request = self.build_request()
+            self.send_request(request)
+            self._add_response_info()
+            self.follow_redirections(request)
         self.check_response()
         if self.allows_simple_recursion():
             self.parse_header_links()
 
-    def build_request(self):
+    def allows_async_check(self):
+        """Return True if the connection can be checked asynchronously.
+        The asynchronous check only reads the response headers, so the
+        content must be neither parsed nor checked by plugins. Requests
+        through proxies are not supported."""
+        if self.needs_content():
+            return False
+        proxies = requests.utils.get_environ_proxies(self.url)
+        return requests.utils.select_proxy(self.url, proxies) is None
+
+    def needs_content(self):
+        """Return True if the content may be parsed or checked by plugins."""
+        return bool(
+            self.allows_simple_recursion()
+            or self.aggregate.plugin_manager.content_plugins
+        )
+
+    def get_request_method(self):
+        """Return HEAD if HEAD requests are enabled, the content is not
+        needed and the host has not failed HEAD requests before, else
+        GET."""
+        if (
+            self.aggregate.config["headfirst"]
+            and not self.needs_content()
+            and self.aggregate.allows_head_for_host(self.host_key)
+        ):
+            return "HEAD"
+        return "GET"
+
+    def head_failed(self):
+        """Return True if the response is an error response to a HEAD
+        request, which must be checked again with a GET request. Hosts
+        not supporting HEAD requests are remembered."""
+        if self.url_connection.request.method != "HEAD":
+            return False
+        status = self.url_connection.status_code
+        if status < 400 or status == 429:
+            return False
+        log.debug(LOG_CHECK, "HEAD request failed with %d, sending GET", status)
+        if status in (405, 501):
+            self.aggregate.set_get_only_for_host(self.host_key)
+        self.close_connection()
+        return True
+
+    def head_lacks_content(self):
+        """Return True if the response is a response to a HEAD request,
+        but the content is needed. This happens when a HEAD request is
+        redirected to an URL whose content is parsed."""
+        if self.url_connection.request.method != "HEAD" or not self.needs_content():
+            return False
+        log.debug(LOG_CHECK, "Content of %r is needed, sending GET", self.url)
+        self.close_connection()
+        return True
+
+    async def check_async(self):
+        """Check the connection in an asyncio event loop like check()
+        does, without downloading the content."""
+        log.debug(LOG_CHECK, "Checking asynchronously %s", self)
+        try:
+            await self.check_connection_async()
+            self.set_content_type()
+            self.add_size_info()
+            self.aggregate.plugin_manager.run_connection_plugins(self)
+        except tuple(ExcList) as exc:
+            self.set_exception_result(exc)
+
+    async def check_connection_async(self):
+        """Check the HTTP connection like check_connection() does,
+        sending the requests with asyncio streams."""
+        if self.aggregate.config["robotstxt"]:
+            # robots.txt files are downloaded and cached by another thread
+            loop = asyncio.get_running_loop()
+            allowed = await loop.run_in_executor(None, self.allows_robots_in_thread)
+            if not allowed:
+                self.add_info(_("Access denied by robots.txt, checked only syntax."))
+                self.set_result(_("syntax OK"))
+                self.do_check_content = False
+                return
+        self.session = self.aggregate.get_request_session()
+        self.construct_auth()
+        request = self.build_request(self.get_request_method())
+        await self.send_request_async(request)
+        if self.head_failed():
+            request = self.build_request()
+            await self.send_request_async(request)
+        self._add_response_info()
+        await self.follow_redirections_async(request)
+        if self.head_failed() or self.head_lacks_content():
+            # the redirection target does not support HEAD requests, or
+            # its content is needed
+            request = self.build_request()
+            await self.send_request_async(request)
+            self._add_response_info()
+            await self.follow_redirections_async(request)
+        self.check_response()
+
+    async def send_request_async(self, request):
+        """Send request with asyncio streams and store response in
+        self.url_connection."""
+        host = self.host_key
+        await self.aggregate.wait_for_host_async(host)
+        kwargs = self.get_request_kwargs()
+        log.debug(LOG_CHECK, "Send request %s with %s", request, kwargs)
+        with self.host_request(host):
+            self.url_connection = await asynchttp.send(
+                request, kwargs["timeout"], kwargs["verify"], self.session.cookies
+            )
+        self._add_connection_info()
+
+    async def follow_redirections_async(self, request):
+        """Follow all redirections of the response with asyncio streams."""
+        kwargs = self.get_request_kwargs()
+        self.redirects = await asynchttp.resolve_redirects(
+            self.session,
+            self.url_connection,
+            kwargs["timeout"],
+            kwargs["verify"],
+            send_request=self.send_redirect_async,
+        )
+        self.follow_redirections(request)
+
+    async def send_redirect_async(self, request, timeout, verify, cookies):
+        """Send a redirected request with asyncio streams after waiting
+        for its host like send_request_async() does."""
+        host = urlutil.url_host_key(urllib.parse.urlsplit(request.url))
+        await self.aggregate.wait_for_host_async(host)
+        response = None
+        with self.host_request(host, lambda: response):
+            response = await asynchttp.send(request, timeout, verify, cookies=cookies)
+        return response
+
+    def allows_robots_in_thread(self):
+        """Check robots.txt with the request session of the current thread."""
+        self.session = self.aggregate.get_request_session()
+        self.construct_auth()
+        return self.allows_robots(self.url)
+
+    def build_request(self, method="GET"):
         """Build a prepared request object."""
         clientheaders = {}
         if self.parent_url and self.parent_url.lower().startswith(HTTP_SCHEMAS):
             clientheaders["Referer"] = self.parent_url
-        kwargs = dict(method='GET', url=self.url, headers=clientheaders)
+        if self.stored_page is not None:
+            if self.stored_page.etag:
+                clientheaders["If-None-Match"] = self.stored_page.etag
+            if self.stored_page.last_modified:
+                clientheaders["If-Modified-Since"] = self.stored_page.last_modified
+        kwargs = dict(method=method, url=self.url, headers=clientheaders)
         if self.auth:
             kwargs['auth'] = self.auth
         log.debug(LOG_CHECK, "Prepare request with %s", kwargs)
@@ -163,16 +341,46 @@ class HttpUrl(internpaturl.InternPatternUrl):
     def send_request(self, request):
         """Send request and store response in self.url_connection."""
         # throttle the number of requests to each host
-        self.aggregate.wait_for_host(self.urlparts[1])
+        host = self.host_key
+        self.aggregate.wait_for_host(host)
         kwargs = self.get_request_kwargs()
         kwargs["allow_redirects"] = False
-        self._send_request(request, **kwargs)
+        with self.host_request(host):
+            self._send_request(request, **kwargs)
+
+    @contextlib.contextmanager
+    def host_request(self, host, get_response=None):
+        """Release a request to host reserved with wait_for_host() after
+        the response headers have been received or the request failed.
+
+        @param get_response: function returning the response, or None
+          for the response in self.url_connection
+        """
+        start = time.time()
+        status = None
+        timeout = False
+        try:
+            yield
+            response = self.url_connection if get_response is None else get_response()
+            if response is not None:
+                status = response.status_code
+        except requests.exceptions.Timeout:
+            timeout = True
+            raise
+        finally:
+            self.aggregate.release_host(
+                host, status=status, latency=time.time() - start, timeout=timeout
+            )
 
     def _send_request(self, request, **kwargs):
         """Send GET request."""
         log.debug(LOG_CHECK, "Send request %s with %s", request, kwargs)
         log.debug(LOG_CHECK, "Request headers %s", request.headers)
         self.url_connection = self.session.send(request, **kwargs)
+        self._add_connection_info()
+
+    def _add_connection_info(self):
+        """Set headers, encoding and SSL info of the response."""
         self.headers = self.url_connection.headers
         log.debug(LOG_CHECK, "Response headers %s", self.headers)
         self.set_encoding(self.url_connection.encoding)
@@ -202,7 +410,9 @@ class HttpUrl(internpaturl.InternPatternUrl):
 
     def _add_ssl_info(self):
         """Add SSL cipher info."""
-        if self.scheme == 'https':
+        if isinstance(self.url_connection, asynchttp.Response):
+            self.ssl_cert = self.url_connection.peercert
+        elif self.scheme == 'https':
             sock = self._get_ssl_sock()
             if not sock:
                 log.debug(LOG_CHECK, "cannot extract SSL certificate from connection")
@@ -252,6 +462,22 @@ class HttpUrl(internpaturl.InternPatternUrl):
             and self.url_connection.status_code in REDIRECT_STATI
         )
 
+    def set_retry_delay(self):
+        """Set the delay before checking a rate limited or unavailable URL
+        again, from the Retry-After header or else with exponential
+        backoff. The delay is not set when the maximum number of retries
+        or the maximum total delay would be exceeded."""
+        config = self.aggregate.config
+        if self.retries >= config["maxretries"]:
+            return
+        delay = httputil.get_retry_after(self.headers)
+        if delay is None:
+            delay = RETRY_BACKOFF_SECONDS * 2 ** self.retries
+        if self.retry_seconds + delay > config["maxretryseconds"]:
+            log.debug(LOG_CHECK, "Not retrying %s in %.1f seconds", self.url, delay)
+            return
+        self.retry_delay = delay
+
     def get_request_kwargs(self):
         """Construct keyword parameters for Session.request() and
         Session.resolve_redirects()."""
@@ -264,8 +490,29 @@ class HttpUrl(internpaturl.InternPatternUrl):
 
     def get_redirects(self, request):
         """Return iterator of redirects for given request."""
+        if self.redirects is not None:
+            return iter(self.redirects)
         kwargs = self.get_request_kwargs()
-        return self.session.resolve_redirects(self.url_connection, request, **kwargs)
+        return self.throttle_redirects(
+            self.session.resolve_redirects(self.url_connection, request, **kwargs)
+        )
+
+    def throttle_redirects(self, redirects):
+        """Yield the responses of the redirects, sending each redirected
+        request after waiting for its host like send_request() does."""
+        response = self.url_connection
+        while True:
+            url = self.session.get_redirect_target(response)
+            if not url:
+                return
+            url = urllib.parse.urljoin(response.url, url)
+            host = urlutil.url_host_key(urllib.parse.urlsplit(url))
+            self.aggregate.wait_for_host(host)
+            with self.host_request(host, lambda: response):
+                response = next(redirects, None)
+            if response is None:
+                return
+            yield response
 
     def follow_redirections(self, request):
         """Follow all redirections of http response."""
@@ -305,7 +552,17 @@ class HttpUrl(internpaturl.InternPatternUrl):
 
     def check_response(self):
         """Check final result and log it."""
+        if self.url_connection.status_code in (429, 503):
+            self.set_retry_delay()
         if (
+            self.url_connection.status_code == 304
+            and self.stored_page is not None
+            and not self.aliases
+        ):
+            self.not_modified = True
+            self.set_result(self.stored_page.result.result)
+            self.add_info(_("Content not modified since last check."))
+        elif (
             self.url_connection.status_code >= 400
             and self.url_connection.status_code != 429
         ):
@@ -335,6 +592,123 @@ class HttpUrl(internpaturl.InternPatternUrl):
             else:
                 self.set_result(_("OK"))
 
+    def check_content(self):
+        """Check content of URL. Content that was not modified since the
+        last check is not downloaded; the links found in the stored
+        page are added instead.
+        @return: True if content can be parsed, else False
+        """
+        if not self.not_modified:
+            if not self.allows_streaming():
+                return super().check_content()
+            try:
+                self.stream_links()
+            except tuple(ExcList):
+                value = self.handle_exception()
+                self.add_warning(
+                    _("could not get content: %(msg)s") % {"msg": value},
+                    tag=WARN_URL_ERROR_GETTING_CONTENT,
+                )
+            return False
+        result = self.stored_page.result
+        self.content_type = result.content_type
+        self.size = result.size
+        self.modified = result.modified
+        for tag, msg in result.warnings:
+            if (tag, msg) not in self.warnings:
+                self.warnings.append((tag, msg))
+        for info in result.info:
+            if info not in self.info:
+                self.info.append(info)
+        for args in self.stored_page.links:
+            self.add_url(*args)
+        return False
+
+    def allows_streaming(self):
+        """Return True if the links of the HTML content are queued while
+        the content is downloaded. Content plugins need the whole
+        content, so streaming is only possible without them. The length
+        of the content must be known from the Content-Length of an
+        unencoded response, else links of content exceeding the maximum
+        parse size could already be queued."""
+        return bool(
+            self.aggregate.config["streamlinks"]
+            and self.do_check_content
+            and self.data is None
+            and not self.aggregate.plugin_manager.content_plugins
+            and self.is_html()
+            and self.can_get_content()
+            and self.allows_simple_recursion()
+            and 0 <= self.size <= self.aggregate.config["maxfilesizeparse"]
+            and self.headers.get("Content-Encoding", "identity") == "identity"
+        )
+
+    def stream_links(self):
+        """Download the HTML content and queue its links while reading
+        it. The links are held back until the document head is parsed,
+        so a robots meta element can still forbid following them. The
+        content is not kept, only its analysis."""
+        log.debug(LOG_CHECK, "Stream content of %r", self.url)
+        maxbytes = self.aggregate.config["maxfilesizedownload"]
+        t = time.time()
+        analyzer = linkparse.DocumentAnalyzer(anchors=self.needs_anchors())
+        decoder = None
+        size = queued = 0
+        for data in self.url_connection.iter_content(chunk_size=self.ReadChunkBytes):
+            size += len(data)
+            if size > maxbytes:
+                raise LinkCheckerError(_("File size too large"))
+            if decoder is None:
+                decoder = self.get_stream_decoder(data)
+            analyzer.feed(decoder.decode(data))
+            if analyzer.head_done:
+                queued = self.add_streamed_links(analyzer.analysis, queued)
+        if decoder is not None:
+            analyzer.feed(decoder.decode(b"", True))
+        self.analysis = analyzer.close()
+        self.set_download_info(size, time.time() - t)
+        self.add_streamed_links(self.analysis, queued)
+
+    def get_stream_decoder(self, data):
+        """Return an incremental decoder for the content starting with
+        the given data. The encoding is detected like in get_content(),
+        but only from the start of the content."""
+        encoding = htmlsoup.detect_encoding(data, self.content_encoding)
+        encoding = encoding or "ISO-8859-1"
+        if codecs.lookup(encoding).name == "ascii":
+            # the rest of the content need not be ASCII
+            encoding = "utf-8"
+        log.debug(LOG_CHECK, "Content encoding %s", encoding)
+        self.content_encoding = encoding
+        return codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def add_streamed_links(self, analysis, start):
+        """Queue the links of the analysis from index start on, unless a
+        robots meta element forbids following them.
+
+        @return: index of the next link to queue
+        @rtype: int
+        """
+        if analysis.nofollow:
+            return start
+        for url, line, column, name, base in analysis.links[start:]:
+            self.add_url(url, line=line, column=column, name=name, base=base)
+        return len(analysis.links)
+
+    def get_validators(self):
+        """Return tuple (ETag, Last-Modified) of the response, or None
+        if the response cannot be revalidated."""
+        if self.found_links is None or self.aliases or not self.valid:
+            return None
+        etag = self.headers.get("ETag")
+        last_modified = self.headers.get("Last-Modified")
+        if self.not_modified:
+            etag = etag or self.stored_page.etag
+            last_modified = last_modified or self.stored_page.last_modified
+        if not (etag or last_modified):
+            return None
+        return etag, last_modified
+
     def get_content(self):
         return super().get_content(self.content_encoding)
 
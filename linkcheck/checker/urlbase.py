@@ -18,6 +18,7 @@ Base URL handler.
 """
 # pylint: disable=assignment-from-none, catching-non-exception, no-member
 
+import functools
 import sys
 import os
 import urllib.parse
@@ -27,8 +28,9 @@ import errno
 import socket
 from io import BytesIO
 
-from . import absolute_url, get_url_from
+from . import absolute_url, get_pending_url
 from .. import (
+    containers,
     log,
     LOG_CHECK,
     strformat,
@@ -37,7 +39,7 @@ from .. import (
     trace,
     get_link_pat,
 )
-from ..htmlutil import htmlsoup
+from ..htmlutil import htmlsoup, linkparse
 from ..network import iputil
 from .const import (
     WARN_URL_EFFECTIVE_URL,
@@ -58,6 +60,9 @@ from ..url import url_fix_wayback_query
 # schemes that are invalid with an empty hostname
 scheme_requires_host = ("ftp", "http")
 
+# number of cached results of join_url()
+NUM_JOINED_URLS = 10000
+
 
 def urljoin(parent, url):
     """
@@ -82,9 +87,67 @@ def url_norm(url, encoding):
         raise LinkCheckerError(msg)
 
 
+@functools.lru_cache(maxsize=NUM_JOINED_URLS)
+def join_url(base_url, parent_url, base_ref, encoding):
+    """Norm the URL of a link and make it absolute. Pages link the same
+    relative URLs again and again, so the results are cached.
+
+    @return: tuple (url, base_ref) with the absolute URL and the absolute
+      base reference
+    @raises: LinkCheckerError if the URL has an unparsable domain name
+    """
+    # norm base url - can raise UnicodeError from url.idna_encode()
+    base_url, is_idn = url_norm(base_url, encoding)
+    # make url absolute
+    if base_ref:
+        # use base reference as parent url
+        if ":" not in base_ref:
+            # some websites have a relative base reference
+            base_ref = urljoin(parent_url, base_ref)
+        url = urljoin(base_ref, base_url)
+    elif parent_url:
+        # strip the parent url anchor
+        urlparts = list(urllib.parse.urlsplit(parent_url))
+        urlparts[4] = ""
+        parent_url = urlutil.urlunsplit(urlparts)
+        url = urljoin(parent_url, base_url)
+    else:
+        url = base_url
+    # urljoin can unnorm the url path, so norm it again
+    urlparts = list(urllib.parse.urlsplit(url))
+    if urlparts[2]:
+        urlparts[2] = urlutil.collapse_segments(urlparts[2])
+        if not urlparts[0].startswith("feed"):
+            # restore second / in http[s]:// in wayback path
+            urlparts[2] = url_fix_wayback_query(urlparts[2])
+    return urlutil.urlunsplit(urlparts), base_ref
+
+
+@functools.lru_cache(maxsize=None)
+def get_slot_names(klass):
+    """Return the names of the instance attributes of an URL class."""
+    return tuple(
+        name for cls in klass.__mro__ for name in getattr(cls, "__slots__", ())
+    )
+
+
 class UrlBase:
     """An URL with additional information like validity etc."""
 
+    # instance attributes are stored in slots since many URL objects
+    # exist at the same time
+    __slots__ = (
+        'aggregate', 'aliases', 'analysis', 'anchor', 'base_ref', 'base_url',
+        'cache_url', 'caching', 'checktime', 'column', 'content_encoding',
+        'content_type', 'data', 'dltime', 'do_check_content',
+        'document_anchors', 'document_url', 'encoding', 'extern', 'found_links',
+        'has_result', 'host', 'host_key', 'ignore_errors', 'info', 'line',
+        'modified', 'name', 'page', 'parent_url', 'port', 'recursion_level',
+        'result', 'retries', 'retry_delay', 'retry_seconds', 'scheme', 'size',
+        'soup', 'text', 'title', 'url', 'url_connection', 'urlparts',
+        'userinfo', 'valid', 'warnings',
+    )
+
     # file types that can be parsed recursively
     ContentMimetypes = {
         "text/html": "html",
@@ -232,6 +295,8 @@ class UrlBase:
         self.urlparts = None
         # the scheme, host, port and anchor part of url
         self.scheme = self.host = self.port = self.anchor = None
+        # the host with non-default port, see url.url_host_key()
+        self.host_key = ""
         # the result message string and flag
         self.result = ""
         self.has_result = False
@@ -260,8 +325,14 @@ class UrlBase:
         self.text = None
         # url content as a Beautiful Soup object
         self.soup = None
+        # analysis of HTML url content
+        self.analysis = None
         # cache url is set by build_url() calling set_cache_url()
         self.cache_url = None
+        # url without anchor, also set by set_cache_url()
+        self.document_url = None
+        # set of anchors in the content, or None if not collected
+        self.document_anchors = None
         # extern flags (is_extern, is_strict)
         self.extern = None
         # flag if the result should be cached
@@ -276,6 +347,15 @@ class UrlBase:
         self.aliases = []
         # error messages (regular expressions) to ignore
         self.ignore_errors = []
+        # list of add_url() arguments of found links, or None if
+        # links are not recorded
+        self.found_links = None
+        # seconds to wait before checking the URL again, or None
+        self.retry_delay = None
+        # number of times the URL has been checked again
+        self.retries = 0
+        # total seconds waited before checking the URL again
+        self.retry_seconds = 0.0
 
     def set_result(self, msg, valid=True, overwrite=False):
         """
@@ -423,12 +503,13 @@ class UrlBase:
 
     def set_cache_url(self):
         """Set the URL to be used for caching."""
+        self.document_url = urlutil.urlunsplit(self.urlparts[:4] + [''])
         if "AnchorCheck" in self.aggregate.config["enabledplugins"]:
             self.cache_url = self.url
         else:
             # remove anchor from cached target url since we assume
             # URLs with different anchors to have the same content
-            self.cache_url = urlutil.urlunsplit(self.urlparts[:4] + [''])
+            self.cache_url = self.document_url
         log.debug(LOG_CHECK, "cache_url '%s'", self.cache_url)
 
     def check_syntax(self):
@@ -473,31 +554,9 @@ class UrlBase:
         Construct self.url and self.urlparts out of the given base
         url information self.base_url, self.parent_url and self.base_ref.
         """
-        # norm base url - can raise UnicodeError from url.idna_encode()
-        base_url, is_idn = url_norm(self.base_url, self.encoding)
-        # make url absolute
-        if self.base_ref:
-            # use base reference as parent url
-            if ":" not in self.base_ref:
-                # some websites have a relative base reference
-                self.base_ref = urljoin(self.parent_url, self.base_ref)
-            self.url = urljoin(self.base_ref, base_url)
-        elif self.parent_url:
-            # strip the parent url anchor
-            urlparts = list(urllib.parse.urlsplit(self.parent_url))
-            urlparts[4] = ""
-            parent_url = urlutil.urlunsplit(urlparts)
-            self.url = urljoin(parent_url, base_url)
-        else:
-            self.url = base_url
-        # urljoin can unnorm the url path, so norm it again
-        urlparts = list(urllib.parse.urlsplit(self.url))
-        if urlparts[2]:
-            urlparts[2] = urlutil.collapse_segments(urlparts[2])
-            if not urlparts[0].startswith("feed"):
-                # restore second / in http[s]:// in wayback path
-                urlparts[2] = url_fix_wayback_query(urlparts[2])
-        self.url = urlutil.urlunsplit(urlparts)
+        self.url, self.base_ref = join_url(
+            self.base_url, self.parent_url, self.base_ref, self.encoding
+        )
         self.urlparts = self.build_url_parts(self.url)
         # and unsplit again
         self.url = urlutil.urlunsplit(self.urlparts)
@@ -533,6 +592,7 @@ class UrlBase:
             host = self.host
         else:
             host = f"{self.host}:{self.port}"
+        self.host_key = host or ""
         if self.userinfo:
             urlparts[1] = f"{self.userinfo}@{host}"
         else:
@@ -585,17 +645,46 @@ class UrlBase:
             self.add_size_info()
             self.aggregate.plugin_manager.run_connection_plugins(self)
         except tuple(ExcList) as exc:
-            value = self.handle_exception()
-            # make nicer error msg for unknown hosts
-            if isinstance(exc, socket.error) and exc.args[0] == -2:
-                value = _('Hostname not found')
-            elif isinstance(exc, UnicodeError):
-                # idna.encode(host) failed
-                value = _('Bad hostname %(host)r: %(msg)s') % {
-                    'host': self.host,
-                    'msg': value,
-                }
-            self.set_result(value, valid=False)
+            self.set_exception_result(exc)
+
+    def set_exception_result(self, exc):
+        """Set an invalid result for an exception of the connection check."""
+        value = self.handle_exception()
+        # make nicer error msg for unknown hosts
+        if isinstance(exc, socket.error) and exc.args[0] == -2:
+            value = _('Hostname not found')
+        elif isinstance(exc, UnicodeError):
+            # idna.encode(host) failed
+            value = _('Bad hostname %(host)r: %(msg)s') % {
+                'host': self.host,
+                'msg': value,
+            }
+        self.set_result(value, valid=False)
+
+    def allows_async_check(self):
+        """Return True if the connection can be checked with check_async()
+        in an asyncio event loop. Can be overridden in subclasses."""
+        return False
+
+    def get_retry_url(self):
+        """Return a new checker object to check the URL again after
+        self.retry_delay seconds."""
+        url_data = self.__class__(
+            self.base_url,
+            self.recursion_level,
+            self.aggregate,
+            parent_url=self.parent_url,
+            base_ref=self.base_ref,
+            line=self.line,
+            column=self.column,
+            page=self.page,
+            name=self.name,
+            url_encoding=self.encoding,
+            extern=self.extern,
+        )
+        url_data.retries = self.retries + 1
+        url_data.retry_seconds = self.retry_seconds + self.retry_delay
+        return url_data
 
     def check_content(self):
         """Check content of URL.
@@ -698,15 +787,17 @@ class UrlBase:
             return False
         if not self.allows_simple_recursion():
             return False
-        if self.size > self.aggregate.config["maxfilesizeparse"]:
-            log.debug(LOG_CHECK, "... no, maximum parse size.")
-            return False
         if not self.is_parseable():
             log.debug(LOG_CHECK, "... no, not parseable.")
             return False
         if not self.content_allows_robots():
             log.debug(LOG_CHECK, "... no, robots.")
             return False
+        # content_allows_robots() may download the content, which sets
+        # the size of content without known length
+        if self.size > self.aggregate.config["maxfilesizeparse"]:
+            log.debug(LOG_CHECK, "... no, maximum parse size.")
+            return False
         log.debug(LOG_CHECK, "... yes, recursion.")
         return True
 
@@ -727,18 +818,16 @@ class UrlBase:
         if not url:
             self.extern = (1, 1)
             return
-        for entry in self.aggregate.config["externlinks"]:
-            match = entry['pattern'].search(url)
-            if (entry['negate'] and not match) or (match and not entry['negate']):
+        match = self.aggregate.get_link_matcher().match(url)
+        if match is not None:
+            is_extern, entry = match
+            if is_extern:
                 log.debug(LOG_CHECK, "Extern URL %r", url)
                 self.extern = (1, entry['strict'])
-                return
-        for entry in self.aggregate.config["internlinks"]:
-            match = entry['pattern'].search(url)
-            if (entry['negate'] and not match) or (match and not entry['negate']):
+            else:
                 log.debug(LOG_CHECK, "Intern URL %r", url)
                 self.extern = (0, 0)
-                return
+            return
         if self.aggregate.config['checkextern']:
             self.extern = (1, 0)
         else:
@@ -757,17 +846,45 @@ class UrlBase:
         log.debug(LOG_CHECK, "Get content of %r", self.url)
         t = time.time()
         content = self.read_content()
-        self.size = len(content)
-        self.dltime = time.time() - t
+        self.set_download_info(len(content), time.time() - t)
+        return content
+
+    def set_download_info(self, size, dltime):
+        """Store size and download time of the downloaded content."""
+        self.size = size
+        self.dltime = dltime
         if self.size == 0:
             self.add_warning(_("Content size is zero."), tag=WARN_URL_CONTENT_SIZE_ZERO)
         else:
             self.aggregate.add_downloaded_bytes(self.size)
-        return content
+
+    def get_analysis(self):
+        """Return the DocumentAnalysis of the HTML content, parsing the
+        content only once for links, anchors and robots meta elements."""
+        if self.analysis is None:
+            self.analysis = linkparse.analyze(
+                self.get_content(), anchors=self.needs_anchors()
+            )
+        return self.analysis
+
+    def needs_anchors(self):
+        """Return True if the anchors of the content are checked by the
+        AnchorCheck plugin."""
+        return (
+            bool(self.anchor)
+            and "AnchorCheck" in self.aggregate.config["enabledplugins"]
+        )
+
+    def free_content(self):
+        """Free the content and the results of its analysis."""
+        self.data = None
+        self.text = None
+        self.soup = None
+        self.analysis = None
 
     def get_soup(self):
         if self.soup is None:
-            self.get_content()
+            self.soup = htmlsoup.make_soup(self.get_content())
         return self.soup
 
     def get_raw_content(self):
@@ -778,15 +895,18 @@ class UrlBase:
     def get_content(self, encoding=None):
         if self.text is None:
             self.get_raw_content()
-            self.soup = htmlsoup.make_soup(self.data, encoding)
-            # Sometimes soup.original_encoding is None!  Better mangled text
+            original_encoding = htmlsoup.detect_encoding(self.data, encoding)
+            # Sometimes the encoding cannot be detected!  Better mangled text
             # than an internal crash, eh?  ISO-8859-1 is a safe fallback in the
             # sense that any binary blob can be decoded, it'll never cause a
             # UnicodeDecodeError.
             log.debug(
-                LOG_CHECK, "Beautiful Soup detected %s", self.soup.original_encoding
+                LOG_CHECK,
+                "Detected encoding %s, given encoding %s",
+                original_encoding,
+                encoding,
             )
-            self.content_encoding = self.soup.original_encoding or 'ISO-8859-1'
+            self.content_encoding = original_encoding or 'ISO-8859-1'
             log.debug(LOG_CHECK, "Content encoding %s", self.content_encoding)
             self.text = self.data.decode(self.content_encoding)
         return self.text
@@ -808,6 +928,11 @@ class UrlBase:
         """
         return self.url_connection.read(self.ReadChunkBytes)
 
+    def get_validators(self):
+        """Return tuple (ETag, Last-Modified) to revalidate the content in
+        later runs, or None. Can be overridden in subclasses."""
+        return None
+
     def get_user_password(self):
         """Get tuple (user, password) from configured authentication.
         Both user and password can be None.
@@ -820,11 +945,16 @@ class UrlBase:
 
     def add_url(self, url, line=0, column=0, page=0, name="", base=None, parent=None):
         """Add new URL to queue."""
+        if self.found_links is not None:
+            self.found_links.append([url, line, column, page, name, base, parent])
+        if self.aggregate.urlqueue is None:
+            # the links are queued by the process owning the URL queue
+            return
         if base:
             base_ref = urlutil.url_norm(base, encoding=self.content_encoding)[0]
         else:
             base_ref = None
-        url_data = get_url_from(
+        url_data = get_pending_url(
             url,
             self.recursion_level + 1,
             self.aggregate,
@@ -839,6 +969,20 @@ class UrlBase:
         )
         self.aggregate.urlqueue.put(url_data)
 
+    def get_state(self):
+        """Return the set instance attributes as dictionary."""
+        return {
+            name: getattr(self, name)
+            for name in get_slot_names(self.__class__)
+            if hasattr(self, name)
+        }
+
+    def set_state(self, state):
+        """Set the instance attributes from a dictionary returned by
+        get_state()."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def serialized(self, sep=os.linesep):
         """
         Return serialized url check data as unicode string.
@@ -1010,12 +1154,79 @@ urlDataAttr = [
 ]
 
 
+# attributes with URL, host name and content type strings, which are
+# shared between the results
+internedAttr = frozenset([
+    'parent_url',
+    'base_ref',
+    'url',
+    'domain',
+    'cache_url',
+    'content_type',
+])
+
+# shared strings of the results
+strings = containers.InternTable()
+
+# attributes of the occurrence of an URL in a document
+occurrenceAttr = [
+    'parent_url',
+    'base_ref',
+    'base_url',
+    'line',
+    'column',
+    'level',
+    'name',
+]
+
+
 class CompactUrlData:
-    """Store selected UrlData attributes in slots to minimize memory usage."""
+    """Store selected UrlData attributes in slots to minimize memory usage.
+    The objects are shared by the result cache and must not be changed;
+    replace() returns a changed copy."""
 
     __slots__ = urlDataAttr
 
     def __init__(self, wired_url_data):
         '''Set all attributes according to the dictionary wired_url_data'''
         for attr in urlDataAttr:
-            setattr(self, attr, wired_url_data[attr])
+            value = wired_url_data[attr]
+            if attr in internedAttr and isinstance(value, str):
+                value = strings.intern(value)
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, name, value):
+        """Forbid changing the shared result."""
+        raise AttributeError("cannot set %r of immutable result" % name)
+
+    def __reduce__(self):
+        """Pickle and copy the result with its attributes."""
+        return CompactUrlData, ({attr: getattr(self, attr) for attr in urlDataAttr},)
+
+    def replace(self, **attrs):
+        """Return a copy of this result with the given attributes
+        changed."""
+        data = {attr: getattr(self, attr) for attr in urlDataAttr}
+        data.update(attrs)
+        return CompactUrlData(data)
+
+
+class UrlDataOccurrence:
+    """A cached result logged for another occurrence of its URL. The
+    attributes of the occurrence in its document are stored, all other
+    attributes are those of the shared result."""
+
+    __slots__ = ['record'] + occurrenceAttr
+
+    def __init__(self, record, **occurrence):
+        """Store the shared result and the attributes of the occurrence."""
+        self.record = record
+        for attr in occurrenceAttr:
+            setattr(self, attr, occurrence[attr])
+
+    def __getattr__(self, name):
+        """Return an attribute of the shared result."""
+        if name.startswith("__"):
+            # no special methods, and no recursion without record
+            raise AttributeError(name)
+        return getattr(self.record, name)
@@ -231,6 +231,32 @@ class ArgParser(LCArgumentParser):
                 "of threads is 10. To disable threading specify a non-positive number."
             ),
         )
+        group.add_argument(
+            "--processes",
+            type=int,
+            metavar="NUMBER",
+            help=_(
+                "Check URLs in the given number of worker processes, assigning\n"
+                "the URLs to the workers by host. Default is to check URLs in\n"
+                "the main process."
+            ),
+        )
+        group.add_argument(
+            "--checkpoint",
+            metavar="FILENAME",
+            help=_(
+                "Write the state of the check to the given file in regular\n"
+                "intervals and when the check ends."
+            ),
+        )
+        group.add_argument(
+            "--resume",
+            metavar="FILENAME",
+            help=_(
+                "Continue an interrupted check from the given checkpoint file.\n"
+                "Give the same URLs and options as for the interrupted check."
+            ),
+        )
         group.add_argument(
             "-V", "--version", action="store_true", help=_("Print version and exit.")
         )
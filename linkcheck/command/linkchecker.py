@@ -156,7 +156,10 @@ def linkchecker():
     log.debug(LOG_CMDLINE, "configuration: %s", pprint.pformat(sorted(config.items())))
 
     # prepare checking queue
-    aggregate = get_aggregate(config)
+    try:
+        aggregate = get_aggregate(config)
+    except LinkCheckerError as msg:
+        print_usage(str(msg))
     if options.trace:
         # enable thread tracing
         config["trace"] = True
@@ -173,6 +173,13 @@ def setup_config(config, options):
         if options.threads < 1:
             options.threads = 0
         config["threads"] = options.threads
+    if options.processes is not None:
+        config["processes"] = max(0, options.processes)
+    if options.checkpoint is not None:
+        config["checkpointfile"] = options.checkpoint
+    if options.resume is not None:
+        config["checkpointfile"] = options.resume
+        config["resume"] = True
     if options.timeout is not None:
         if options.timeout > 0:
             config["timeout"] = options.timeout
@@ -148,14 +148,35 @@ class Configuration(dict):
         self["maxnumurls"] = None
         self["maxrunseconds"] = None
         self["maxrequestspersecond"] = 10
+        self["adaptivehostrate"] = False
+        self["maxretries"] = 0
+        self["maxretryseconds"] = 300
+        self["maxconnectionshttp"] = 0
+        self["maxconnectionshttps"] = 0
+        self["maxconnectionsftp"] = 0
+        self["maxconnectionsperhost"] = 0
+        self["headfirst"] = False
+        self["streamlinks"] = False
+        self["hostqueues"] = False
+        self["queuesize"] = 0
         self["maxhttpredirects"] = 10
         self["sslverify"] = True
         self["threads"] = 10
+        self["processes"] = 0
+        self["asyncchecks"] = 0
         self["timeout"] = 60
         self["aborttimeout"] = 300
         self["recursionlevel"] = -1
         self["useragent"] = UserAgent
         self["resultcachesize"] = 100000
+        self["resultcachebytes"] = 0
+        self["resultcachefile"] = None
+        self["resultcachevalidttl"] = 7 * 24 * 60 * 60
+        self["resultcacheinvalidttl"] = 60 * 60
+        self["revalidate"] = False
+        self["checkpointfile"] = None
+        self["checkpointseconds"] = 60
+        self["resume"] = False
         # authentication
         self["authentication"] = []
         self["loginurl"] = None
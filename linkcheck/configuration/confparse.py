@@ -194,11 +194,24 @@ class LCConfigParser(RawConfigParser):
         section = "checking"
         self.read_int_option(section, "threads", min=-1)
         self.config['threads'] = max(0, self.config['threads'])
+        self.read_int_option(section, "processes", min=0)
+        self.read_int_option(section, "asyncchecks", min=0)
         self.read_int_option(section, "timeout", min=1)
         self.read_int_option(section, "aborttimeout", min=1)
         self.read_int_option(section, "recursionlevel", min=-1)
         self.read_string_option(section, "useragent")
         self.read_float_option(section, "maxrequestspersecond", min=0.001)
+        self.read_boolean_option(section, "adaptivehostrate")
+        self.read_int_option(section, "maxretries", min=0)
+        self.read_int_option(section, "maxretryseconds", min=0)
+        self.read_int_option(section, "maxconnectionshttp", min=0)
+        self.read_int_option(section, "maxconnectionshttps", min=0)
+        self.read_int_option(section, "maxconnectionsftp", min=0)
+        self.read_int_option(section, "maxconnectionsperhost", min=0)
+        self.read_boolean_option(section, "headfirst")
+        self.read_boolean_option(section, "streamlinks")
+        self.read_boolean_option(section, "hostqueues")
+        self.read_int_option(section, "queuesize", min=0)
         self.read_int_option(section, "maxnumurls", min=0)
         self.read_int_option(section, "maxfilesizeparse", min=1)
         self.read_int_option(section, "maxfilesizedownload", min=1)
@@ -217,6 +230,13 @@ class LCConfigParser(RawConfigParser):
             self.read_string_option(section, "sslverify")
         self.read_int_option(section, "maxrunseconds", min=0)
         self.read_int_option(section, "resultcachesize", min=0)
+        self.read_int_option(section, "resultcachebytes", min=0)
+        self.read_string_option(section, "resultcachefile")
+        self.read_int_option(section, "resultcachevalidttl", min=0)
+        self.read_int_option(section, "resultcacheinvalidttl", min=0)
+        self.read_boolean_option(section, "revalidate")
+        self.read_string_option(section, "checkpointfile")
+        self.read_int_option(section, "checkpointseconds", min=1)
 
     def read_authentication_config(self):
         """Read configuration options in section "authentication"."""
@@ -16,6 +16,9 @@
 """
 Special container classes.
 """
+import array
+import hashlib
+import threading
 
 
 class LFUCache(dict):
@@ -102,3 +105,133 @@ class LFUCache(dict):
         """Remove and return a value."""
         value = super().pop()
         return value[1]
+
+
+class HashSet:
+    """Set of strings storing only 64-bit hashes of the strings in an
+    array-backed hash table with open addressing. Different strings
+    with the same hash are regarded as equal, which is unlikely for
+    less than billions of strings."""
+
+    def __init__(self, size=1024):
+        """Initialize an empty table.
+
+        @param size: initial number of slots, a power of two
+        """
+        if size < 1 or size & (size - 1):
+            raise ValueError("invalid table size %d" % size)
+        # zero marks an empty slot
+        self.table = array.array("Q", bytes(8 * size))
+        self.mask = size - 1
+        self.num = 0
+
+    @staticmethod
+    def get_hash(key):
+        """Return the non-zero 64-bit hash of a string."""
+        digest = hashlib.blake2b(
+            key.encode("utf-8", "surrogatepass"), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _find(self, value):
+        """Return the slot index of a hash value, or of the empty slot
+        where it belongs."""
+        i = value & self.mask
+        while self.table[i] and self.table[i] != value:
+            i = (i + 1) & self.mask
+        return i
+
+    def __contains__(self, key):
+        """Check if the string is in the set."""
+        value = self.get_hash(key)
+        return self.table[self._find(value)] == value
+
+    def add(self, key):
+        """Add a string to the set.
+
+        @return: True if the string was not in the set, else False
+        """
+        value = self.get_hash(key)
+        i = self._find(value)
+        if self.table[i] == value:
+            return False
+        self.table[i] = value
+        self.num += 1
+        if 2 * self.num > len(self.table):
+            self._grow()
+        return True
+
+    def discard(self, key):
+        """Remove a string from the set. The following hashes of its
+        probe sequence are moved back, so no lookup passes an empty slot
+        before reaching its hash.
+
+        @return: True if the string was in the set, else False
+        """
+        value = self.get_hash(key)
+        i = self._find(value)
+        if self.table[i] != value:
+            return False
+        self.table[i] = 0
+        self.num -= 1
+        j = i
+        while True:
+            j = (j + 1) & self.mask
+            value = self.table[j]
+            if not value:
+                return True
+            # the hash can move to slot i if its home slot is not
+            # between slot i and slot j
+            home = value & self.mask
+            if (home - i - 1) & self.mask >= (j - i) & self.mask:
+                self.table[i] = value
+                self.table[j] = 0
+                i = j
+
+    def _grow(self):
+        """Double the number of slots, keeping at least half of them
+        empty for short probe sequences."""
+        old_table = self.table
+        self.table = array.array("Q", bytes(16 * len(old_table)))
+        self.mask = len(self.table) - 1
+        for value in old_table:
+            if value:
+                self.table[self._find(value)] = value
+
+    def __len__(self):
+        """Return the number of strings in the set."""
+        return self.num
+
+
+class InternTable:
+    """Table of shared strings. Equal strings passed to intern() are
+    replaced by one string object, so they are stored only once. When
+    the table is full the oldest strings are removed from it; they stay
+    valid but are no longer shared with new equal strings."""
+
+    def __init__(self, size=100000):
+        """Initialize an empty table.
+
+        @param size: maximum number of strings in the table
+        """
+        if size < 1:
+            raise ValueError("invalid table size %d" % size)
+        self.size = size
+        # mapping {string -> shared string}, oldest first
+        self.strings = {}
+        self.lock = threading.Lock()
+
+    def intern(self, string):
+        """Return the shared string equal to the given string."""
+        shared = self.strings.get(string)
+        if shared is not None:
+            return shared
+        with self.lock:
+            shared = self.strings.setdefault(string, string)
+            if len(self.strings) > self.size:
+                del self.strings[next(iter(self.strings))]
+        return shared
+
+    def __len__(self):
+        """Return the number of strings in the table."""
+        return len(self.strings)
@@ -20,8 +20,8 @@ import os
 import time
 
 from .. import log, LOG_CHECK, LinkCheckerError, LinkCheckerInterrupt, plugins
-from ..cache import urlqueue, robots_txt, results
-from . import aggregator, console
+from ..cache import urlqueue, robots_txt, results, persistent
+from . import aggregator, checkpoint, console, scheduler
 
 
 def check_urls(aggregate):
@@ -43,6 +43,8 @@ def check_urls(aggregate):
     except Exception as msg:
         log.error(LOG_CHECK, _("Error starting log output: %(msg)s.") % dict(msg=msg))
         raise
+    if aggregate.checkpoint is not None:
+        aggregate.checkpoint.restore_log_stats(aggregate.logger.loggers)
     try:
         if not aggregate.urlqueue.empty():
             aggregate.start_threads()
@@ -131,10 +133,48 @@ def abort_now():
 
 def get_aggregate(config):
     """Get an aggregator instance with given configuration."""
-    _urlqueue = urlqueue.UrlQueue(max_allowed_urls=config["maxnumurls"])
+    connection_limits = scheduler.ConnectionLimits(
+        config.get_connectionlimits(), config["maxconnectionsperhost"]
+    )
+    host_scheduler = scheduler.HostScheduler(
+        config["maxrequestspersecond"],
+        config["adaptivehostrate"],
+        connection_limits if connection_limits.is_limited() else None,
+    )
+    if config["hostqueues"]:
+        queue_class = urlqueue.HostUrlQueue
+    else:
+        queue_class = urlqueue.UrlQueue
+    _urlqueue = queue_class(
+        max_allowed_urls=config["maxnumurls"],
+        host_scheduler=host_scheduler,
+        memory_size=config["queuesize"],
+    )
     _robots_txt = robots_txt.RobotsTxt(config["useragent"])
     plugin_manager = plugins.PluginManager(config)
-    result_cache = results.ResultCache(config["resultcachesize"])
-    return aggregator.Aggregate(
-        config, _urlqueue, _robots_txt, plugin_manager, result_cache
+    if config["resultcachefile"]:
+        result_cache = persistent.PersistentResultCache(
+            config["resultcachefile"],
+            config["resultcachevalidttl"],
+            config["resultcacheinvalidttl"],
+            config["resultcachesize"],
+            config["resultcachebytes"],
+        )
+    else:
+        result_cache = results.ResultCache(
+            config["resultcachesize"], config["resultcachebytes"]
+        )
+    # check queued URLs first once their result is known
+    result_cache.add_listener(_urlqueue.promote)
+    aggregate = aggregator.Aggregate(
+        config, _urlqueue, _robots_txt, plugin_manager, result_cache,
+        host_scheduler
     )
+    if config["checkpointfile"]:
+        _checkpoint = checkpoint.Checkpoint(
+            config["checkpointfile"], resume=config["resume"]
+        )
+        if config["resume"]:
+            _checkpoint.restore(aggregate)
+        _checkpoint.attach(aggregate)
+    return aggregate
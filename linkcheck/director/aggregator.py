@@ -19,25 +19,31 @@ Aggregate needed object instances for checker threads.
 import threading
 
 import requests
-import time
 import urllib.parse
-import random
-from .. import log, LOG_CHECK, strformat, LinkCheckerError
+from .. import log, LOG_CHECK, strformat, httppool, linkmatch, LinkCheckerError
 from ..decorators import synchronized
 from ..cache import urlqueue
 from ..htmlutil import loginformsearch
 from ..cookies import from_file
-from . import logger, status, checker, interrupter
+from . import (
+    logger, status, checker, interrupter, processes, checkpoint, scheduler
+)
 
 
 _threads_lock = threading.RLock()
-_hosts_lock = threading.RLock()
 _downloadedbytes_lock = threading.RLock()
 
 
-def new_request_session(config, cookies):
-    """Create a new request session."""
+def new_request_session(config, cookies, adapter=None):
+    """Create a new request session.
+
+    @param adapter: if not None, the transport adapter shared by the
+      sessions of all threads
+    """
     session = requests.Session()
+    if adapter is not None:
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
     if cookies:
         session.cookies = cookies
     session.max_redirects = config["maxhttpredirects"]
@@ -58,26 +64,36 @@ def new_request_session(config, cookies):
 
 class Aggregate:
     """Store thread-safe data collections for checker threads."""
-    wait_time_min_default = 0.1
-    wait_time_max_default = 0.6
 
-    def __init__(self, config, urlqueue, robots_txt, plugin_manager, result_cache):
+    def __init__(
+        self, config, urlqueue, robots_txt, plugin_manager, result_cache,
+        host_scheduler
+    ):
         """Store given link checking objects."""
         self.config = config
         self.urlqueue = urlqueue
         self.logger = logger.Logger(config)
         self.threads = []
         self.request_sessions = {}
+        # connection pool of the request sessions, kept-alive connections
+        # to one host are limited like concurrent connections
+        self.http_adapter = httppool.PoolAdapter(
+            config["maxconnectionsperhost"] or max(1, config["threads"])
+        )
         self.robots_txt = robots_txt
         self.plugin_manager = plugin_manager
         self.result_cache = result_cache
-        self.times = {}
-        self.maxrated = {}
+        self.host_scheduler = host_scheduler
         self.cookies = None
-        requests_per_second = config["maxrequestspersecond"]
-        self.wait_time_min = 1.0 / requests_per_second
-        self.wait_time_max = 6 * self.wait_time_min
         self.downloaded_bytes = 0
+        # worker processes checking the URLs, or None
+        self.workers = None
+        # checkpoint recording the check state, or None
+        self.checkpoint = None
+        # hosts not supporting HEAD requests
+        self.get_only_hosts = set()
+        # compiled extern and intern link patterns
+        self.link_matcher = None
 
     def visit_loginurl(self):
         """Check for a login URL and visit it."""
@@ -118,6 +134,12 @@ class Aggregate:
     @synchronized(_threads_lock)
     def start_threads(self):
         """Spawn threads for URL checking and status printing."""
+        num = self.config["threads"]
+        if self.config["processes"] > 0:
+            # all URLs in progress might belong to the hosts of one worker
+            self.workers = processes.WorkerPool(
+                self.config, self.cookies, self.config["processes"], max(1, num)
+            )
         if self.config["status"]:
             t = status.Status(self, self.config["status_wait_seconds"])
             t.start()
@@ -126,8 +148,21 @@ class Aggregate:
             t = interrupter.Interrupt(self.config["maxrunseconds"])
             t.start()
             self.threads.append(t)
-        num = self.config["threads"]
-        if num > 0:
+        if self.checkpoint is not None:
+            t = checkpoint.Checkpointer(self, self.config["checkpointseconds"])
+            t.start()
+            self.threads.append(t)
+        if num > 0 and self.config["asyncchecks"] > 0:
+            t = checker.AsyncChecker(
+                self.urlqueue,
+                self.logger,
+                self.add_request_session,
+                self.config["asyncchecks"],
+                num,
+            )
+            self.threads.append(t)
+            t.start()
+        elif num > 0:
             for dummy in range(num):
                 t = checker.Checker(
                     self.urlqueue, self.logger, self.add_request_session
@@ -136,14 +171,14 @@ class Aggregate:
                 t.start()
         else:
             self.request_sessions[threading.get_ident()] = new_request_session(
-                self.config, self.cookies
+                self.config, self.cookies, self.http_adapter
             )
             checker.check_urls(self.urlqueue, self.logger)
 
     @synchronized(_threads_lock)
     def add_request_session(self):
         """Add a request session for current thread."""
-        session = new_request_session(self.config, self.cookies)
+        session = new_request_session(self.config, self.cookies, self.http_adapter)
         self.request_sessions[threading.get_ident()] = session
 
     @synchronized(_threads_lock)
@@ -151,31 +186,79 @@ class Aggregate:
         """Get the request session for current thread."""
         return self.request_sessions[threading.get_ident()]
 
-    @synchronized(_hosts_lock)
     def wait_for_host(self, host):
         """Throttle requests to one host."""
-        t = time.time()
-        if host in self.times:
-            due_time = self.times[host]
-            if due_time > t:
-                wait = due_time - t
-                time.sleep(wait)
-                t = time.time()
-        if host in self.maxrated:
-            wait_time_min, wait_time_max = self.wait_time_min, self.wait_time_max
-        else:
-            wait_time_min = max(self.wait_time_min, self.wait_time_min_default)
-            wait_time_max = max(self.wait_time_max, self.wait_time_max_default)
-        log.debug(LOG_CHECK,
-                  "Min wait time: %s Max wait time: %s for host: %s",
-                  wait_time_min, wait_time_max, host)
-        wait_time = random.uniform(wait_time_min, wait_time_max)
-        self.times[host] = t + wait_time
-
-    @synchronized(_hosts_lock)
+        self.host_scheduler.wait_for_host(host)
+
+    async def wait_for_host_async(self, host):
+        """Throttle requests to one host in an asyncio event loop."""
+        await self.host_scheduler.wait_for_host_async(host)
+
+    def release_host(self, host, status=None, latency=None, timeout=False):
+        """Finish a request to a host and adapt its request rate to the
+        response."""
+        self.host_scheduler.release(
+            host, status=status, latency=latency, timeout=timeout
+        )
+
+    def get_connection_key(self, url_data):
+        """Return the key of the connection needed to check given URL
+        data, or None if its connections are not limited."""
+        if self.host_scheduler.connection_limits is None:
+            return None
+        return scheduler.get_connection_key(url_data)
+
+    def try_acquire_connection(self, key):
+        """Count a connection with given key if the connection limits
+        allow it, without waiting. The connection is released with
+        release_connection().
+
+        @return: True if the connection has been counted, else False
+        """
+        if key is None:
+            return True
+        return self.host_scheduler.connection_limits.try_acquire(key)
+
+    async def acquire_connection_async(self, url_data):
+        """Wait until the connection limits allow checking given URL data
+        in an asyncio event loop.
+
+        @return: key to release the connection with release_connection()
+        """
+        limits = self.host_scheduler.connection_limits
+        if limits is None:
+            return None
+        key = scheduler.get_connection_key(url_data)
+        await limits.acquire_async(key)
+        return key
+
+    def release_connection(self, key):
+        """Release a connection acquired for checking an URL."""
+        if key is not None:
+            self.host_scheduler.connection_limits.release(key)
+
+    def allows_head_for_host(self, host):
+        """Return True if HEAD requests can be sent to a host."""
+        return host not in self.get_only_hosts
+
+    def set_get_only_for_host(self, host):
+        """Remember that a host does not support HEAD requests."""
+        self.get_only_hosts.add(host)
+
+    def get_link_matcher(self):
+        """Return the matcher of the extern and intern link patterns,
+        compiled again when patterns have been added."""
+        externlinks = self.config["externlinks"]
+        internlinks = self.config["internlinks"]
+        matcher = self.link_matcher
+        if matcher is None or not matcher.is_current(externlinks, internlinks):
+            matcher = linkmatch.LinkMatcher(externlinks, internlinks)
+            self.link_matcher = matcher
+        return matcher
+
     def set_maxrated_for_host(self, host):
         """Remove the limit on the maximum request rate for a host."""
-        self.maxrated[host] = True
+        self.host_scheduler.set_maxrated(host)
 
     @synchronized(_threads_lock)
     def print_active_threads(self):
@@ -243,6 +326,12 @@ class Aggregate:
             t.stop()
         for t in self.threads:
             t.join(timeout=1.0)
+        if self.workers is not None:
+            self.workers.close()
+            self.workers = None
+        if self.checkpoint is not None:
+            # the state of finished and unfinished URLs
+            self.checkpoint.write(self)
 
     @synchronized(_threads_lock)
     def is_finished(self):
@@ -259,7 +348,13 @@ class Aggregate:
         """Print ending output to log."""
         kwargs.update(
             dict(
-                downloaded_bytes=self.downloaded_bytes, num_urls=len(self.result_cache),
+                downloaded_bytes=self.downloaded_bytes,
+                num_urls=self.result_cache.num_keys,
             )
         )
         self.logger.end_log_output(**kwargs)
+        httppool.log_stats()
+        self.http_adapter.close()
+        self.result_cache.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
@@ -16,11 +16,18 @@
 """
 URL checking functions.
 """
-import copy
+import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
 from . import task
+from .scheduler import ConnectionLimits
 from ..cache import urlqueue
-from .. import parser
+from ..cache.results import Document
+from ..checker import PendingUrl
+from ..checker.urlbase import UrlDataOccurrence
+from ..checker.const import WARN_URL_ANCHOR_NOT_FOUND
+from ..plugins import anchorcheck
+from .. import log, LOG_CHECK, parser
 
 # Interval in which each check thread looks if it's stopped.
 QUEUE_POLL_INTERVALL_SECS = 1.0
@@ -36,46 +43,186 @@ def check_urls(urlqueue, logger):
             urlqueue.task_done(url_data)
 
 
+def get_url_data(url_data):
+    """Return the checker object of a queued URL, constructing it for
+    pending links.
+
+    @return: the checker object, or None if the pending link turned out
+      to be a duplicate of another queued URL
+    """
+    if not isinstance(url_data, PendingUrl):
+        return url_data
+    pending_key = url_data.cache_url
+    url_data = url_data.get_url_data()
+    if not url_data.aggregate.urlqueue.claim(url_data, pending_key):
+        return None
+    return url_data
+
+
 def check_url(url_data, logger):
     """Check a single URL with logging."""
+    url_data = get_url_data(url_data)
+    if url_data is None:
+        return
     if url_data.has_result:
         logger.log_url(url_data.to_wire())
-    else:
-        cache = url_data.aggregate.result_cache
-        key = url_data.cache_url
-        result = cache.get_result(key)
-        if result is None:
+        return
+    result = get_cached_result(url_data)
+    if result is not None:
+        log_cached_result(url_data, result, logger)
+        return
+    aggregate = url_data.aggregate
+    connection = aggregate.get_connection_key(url_data)
+    if not aggregate.try_acquire_connection(connection):
+        # check other URLs until a connection is free
+        requeue_url(url_data)
+        return
+    try:
+        if aggregate.workers is not None:
+            aggregate.workers.check_url(url_data, logger)
+        else:
             # check
             check_start = time.time()
             try:
                 url_data.check()
-                do_parse = url_data.check_content()
-                url_data.checktime = time.time() - check_start
-                # Add result to cache
-                result = url_data.to_wire()
-                cache.add_result(key, result)
-                for alias in url_data.aliases:
-                    # redirect aliases
-                    cache.add_result(alias, result)
-                logger.log_url(result)
-                # parse content recursively
-                # XXX this could add new warnings which should be cached.
-                if do_parse:
-                    parser.parse_url(url_data)
+                finish_check(url_data, logger, check_start)
             finally:
                 # close/release possible open connection
                 url_data.close_connection()
-        else:
-            # copy data from cache and adjust it
-            result = copy.copy(result)
-            result.parent_url = url_data.parent_url
-            result.base_ref = url_data.base_ref or ""
-            result.base_url = url_data.base_url or ""
-            result.line = url_data.line
-            result.column = url_data.column
-            result.level = url_data.recursion_level
-            result.name = url_data.name
-            logger.log_url(result)
+                url_data.free_content()
+    finally:
+        aggregate.release_connection(connection)
+
+
+async def check_url_async(url_data, logger):
+    """Check a single URL allowing an asynchronous check with logging."""
+    result = get_cached_result(url_data)
+    if result is not None:
+        log_cached_result(url_data, result, logger)
+        return
+    aggregate = url_data.aggregate
+    connection = await aggregate.acquire_connection_async(url_data)
+    check_start = time.time()
+    try:
+        await url_data.check_async()
+        finish_check(url_data, logger, check_start)
+    finally:
+        url_data.close_connection()
+        url_data.free_content()
+        aggregate.release_connection(connection)
+
+
+def get_cached_result(url_data):
+    """Return the cached or stored result for an URL, or None."""
+    cache = url_data.aggregate.result_cache
+    key = url_data.cache_url
+    result = cache.get_result(key)
+    if result is None and not url_data.allows_simple_recursion():
+        # stored results are only used for URLs that are not parsed
+        result = cache.get_stored_result(key)
+    if result is None:
+        result = get_document_result(url_data)
+        if result is not None:
+            cache.add_result(key, result)
+    return result
+
+
+def log_cached_result(url_data, result, logger):
+    """Log a cached result for the occurrence of the URL."""
+    logger.log_url(UrlDataOccurrence(
+        result,
+        parent_url=url_data.parent_url,
+        base_ref=url_data.base_ref or "",
+        base_url=url_data.base_url or "",
+        line=url_data.line,
+        column=url_data.column,
+        level=url_data.recursion_level,
+        name=url_data.name,
+    ))
+
+
+def finish_check(url_data, logger, check_start):
+    """Check the content of an URL whose connection has been checked.
+    Then cache and log the result and parse the content."""
+    if url_data.retry_delay is not None:
+        # check again later instead of using the result
+        retry_url(url_data)
+        return
+    cache = url_data.aggregate.result_cache
+    key = url_data.cache_url
+    do_parse = url_data.check_content()
+    url_data.checktime = time.time() - check_start
+    # Add result to cache
+    result = url_data.to_wire()
+    cache.add_result(key, result)
+    for alias in url_data.aliases:
+        # redirect aliases
+        cache.add_result(alias, result)
+    logger.log_url(result)
+    # parse content recursively
+    # XXX this could add new warnings which should be cached.
+    if do_parse:
+        parser.parse_url(url_data)
+    validators = url_data.get_validators()
+    if validators is not None:
+        # remember the page for revalidation in later runs
+        cache.add_page(key, *validators, result, url_data.found_links)
+    if url_data.document_anchors is not None:
+        add_document(url_data, result, do_parse)
+
+
+def requeue_url(url_data):
+    """Queue an URL again whose connection limits do not allow checking
+    it now."""
+    log.debug(LOG_CHECK, "No free connection for %s, queueing it again", url_data)
+    url_data.aggregate.urlqueue.requeue(url_data, ConnectionLimits.poll_seconds)
+
+
+def retry_url(url_data):
+    """Queue a new check of an URL after its retry delay."""
+    url_data.aggregate.urlqueue.requeue(
+        url_data.get_retry_url(), url_data.retry_delay
+    )
+
+
+def add_document(url_data, result, parsed):
+    """Cache the result and anchors of the document of an URL with anchor
+    for other URLs of the same document."""
+    result = result.replace(warnings=[
+        warning for warning in result.warnings
+        if warning[0] != WARN_URL_ANCHOR_NOT_FOUND
+    ])
+    # the links of the document need not be parsed again when the
+    # recursion was limited by the content and not by the URL
+    parsed = parsed or url_data.allows_simple_recursion()
+    document = Document(result, url_data.document_anchors, parsed)
+    url_data.aggregate.result_cache.add_document(url_data.document_url, document)
+
+
+def get_document_result(url_data):
+    """Return the result for an URL with anchor whose document has been
+    checked with another anchor, or None. The anchor is checked against
+    the cached anchors of the document."""
+    if not url_data.anchor:
+        return None
+    cache = url_data.aggregate.result_cache
+    document = cache.get_document(url_data.document_url)
+    if document is None:
+        return None
+    if not document.parsed and url_data.allows_simple_recursion():
+        # the links of the document have not been queued yet
+        return None
+    anchorcheck.check_anchor(url_data, document.anchors)
+    result = document.result
+    return result.replace(
+        url=url_data.url,
+        cache_url=url_data.cache_url,
+        title=url_data.get_title(),
+        warnings=result.warnings + [
+            warning for warning in url_data.warnings
+            if warning not in result.warnings
+        ],
+    )
 
 
 class Checker(task.LoggedCheckedTask):
@@ -114,3 +261,128 @@ class Checker(task.LoggedCheckedTask):
         """Check one URL data instance."""
         self.name = "CheckThread-%s" % (url_data.url or "")
         check_url(url_data, self.logger)
+
+
+class AsyncChecker(task.LoggedCheckedTask):
+    """URL check thread running an asyncio event loop. URLs allowing an
+    asynchronous check are checked concurrently in the event loop, the
+    other URLs are checked in a pool of threads."""
+
+    def __init__(
+        self, urlqueue, logger, add_request_session, max_checks, num_threads
+    ):
+        """Store URL queue, logger and the limits of concurrent checks.
+
+        @param max_checks: maximum number of URLs checked at the same time
+        @param num_threads: number of threads checking the other URLs
+        """
+        super().__init__(logger)
+        self.urlqueue = urlqueue
+        self.origname = self.name
+        self.add_request_session = add_request_session
+        self.max_checks = max_checks
+        self.num_threads = num_threads
+        # the running event loop and the event waking it when stopped
+        self.loop = None
+        self.wakeup = None
+
+    def stop(self):
+        """Set the stop event and wake the event loop."""
+        super().stop()
+        if self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                # the event loop has been closed
+                pass
+
+    def run_checked(self):
+        """Check URLs in the queue."""
+        # the event loop sends requests with the session of this thread
+        self.add_request_session()
+        asyncio.run(self.check_urls())
+
+    async def check_urls(self):
+        """Start checks of queued URLs until the thread is stopped."""
+        loop = asyncio.get_running_loop()
+        # threads for DNS lookups and robots.txt downloads
+        loop.set_default_executor(
+            ThreadPoolExecutor(self.num_threads, initializer=self.add_request_session)
+        )
+        executor = ThreadPoolExecutor(
+            self.num_threads, initializer=self.add_request_session
+        )
+        # thread waiting for queued URLs while the loop has room for checks
+        get_executor = ThreadPoolExecutor(1)
+        getter = get_future = None
+        self.wakeup = asyncio.Event()
+        self.loop = loop
+        waker = loop.create_task(self.wakeup.wait())
+        tasks = set()
+        try:
+            while not self.stopped(0):
+                while len(tasks) < self.max_checks:
+                    try:
+                        url_data = self.urlqueue.get(timeout=0)
+                    except urlqueue.Empty:
+                        break
+                    tasks.add(loop.create_task(self.check_url(url_data, executor)))
+                if getter is None and len(tasks) < self.max_checks:
+                    get_future = get_executor.submit(
+                        self.urlqueue.get, QUEUE_POLL_INTERVALL_SECS
+                    )
+                    getter = asyncio.wrap_future(get_future)
+                self.name = (
+                    "CheckThread-%d URLs" % len(tasks) if tasks else self.origname
+                )
+                done, pending = await asyncio.wait(
+                    tasks | {getter, waker} - {None},
+                    timeout=QUEUE_POLL_INTERVALL_SECS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                tasks = pending - {getter, waker}
+                if getter in done:
+                    try:
+                        url_data = getter.result()
+                    except urlqueue.Empty:
+                        pass
+                    else:
+                        tasks.add(loop.create_task(self.check_url(url_data, executor)))
+                    getter = get_future = None
+        finally:
+            self.loop = None
+            waker.cancel()
+            if get_future is not None:
+                # an URL got after the loop ended is not checked but must
+                # be marked as done; waiting for the get() call would delay
+                # the stop by up to its timeout
+                get_future.add_done_callback(self.get_done)
+            executor.shutdown(wait=False)
+            get_executor.shutdown(wait=False)
+
+    def get_done(self, future):
+        """Mark an URL got from the queue after the event loop ended as
+        done."""
+        if not future.cancelled() and future.exception() is None:
+            self.urlqueue.task_done(future.result())
+
+    async def check_url(self, queued_url, executor):
+        """Check one URL in the event loop if possible, else in the
+        given thread pool."""
+        try:
+            url_data = get_url_data(queued_url)
+            if url_data is None:
+                return
+            if (
+                not url_data.has_result
+                and url_data.aggregate.workers is None
+                and url_data.allows_async_check()
+            ):
+                await check_url_async(url_data, self.logger)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(executor, check_url, url_data, self.logger)
+        except Exception:
+            self.internal_error()
+        finally:
+            self.urlqueue.task_done(queued_url)
@@ -0,0 +1,314 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Write checkpoints of the check state to resume interrupted runs.
+
+A checkpoint file is an SQLite database with the queued URLs, the
+results, the parsed robots.txt files and the log statistics. Checker
+threads only record their changes in memory; a checkpoint thread writes
+the changes since the last checkpoint in one transaction, so the file
+always holds the state of a complete checkpoint.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+from .. import log, LOG_CHECK, LinkCheckerError, robotparser2, url as urlutil
+from ..cache.persistent import dump_result, load_result
+from ..checker import PendingUrl
+from . import console, task
+
+# SQLite application id marking checkpoint files ("LCcp")
+APPLICATION_ID = 0x4C436370
+
+
+def dump_url(url_data):
+    """Return the fields of a queued URL needed to queue it again."""
+    if isinstance(url_data, PendingUrl):
+        parent_content_type = url_data.parent_content_type
+        url_encoding = url_data.url_encoding
+    else:
+        parent_content_type = None
+        url_encoding = url_data.encoding
+    return [
+        url_data.base_url,
+        url_data.recursion_level,
+        url_data.parent_url,
+        url_data.base_ref,
+        url_data.line,
+        url_data.column,
+        url_data.page,
+        url_data.name,
+        parent_content_type,
+        url_encoding,
+    ]
+
+
+def load_url(key, fields, aggregate):
+    """Return the pending link for the stored fields of a queued URL."""
+    base_url, recursion_level = fields[:2]
+    split = urllib.parse.urlsplit(key)
+    return PendingUrl(
+        base_url,
+        recursion_level,
+        aggregate,
+        *fields[2:],
+        key,
+        split.scheme,
+        urlutil.url_host_key(split),
+    )
+
+
+def dump_robots_txt(rp):
+    """Serialize the lines and flags of a parsed robots.txt file to a
+    JSON string, without its session and credentials."""
+    return json.dumps(
+        dict(lines=rp.lines, allow_all=rp.allow_all, disallow_all=rp.disallow_all)
+    )
+
+
+def load_robots_txt(roboturl, text):
+    """Parse a robots.txt file serialized by dump_robots_txt() again."""
+    data = json.loads(text)
+    rp = robotparser2.RobotFileParser(None, url=roboturl)
+    rp.parse(data["lines"])
+    rp.allow_all = data["allow_all"]
+    rp.disallow_all = data["disallow_all"]
+    return rp
+
+
+class Checkpoint:
+    """Record the changes of the check state and write them to a
+    checkpoint file."""
+
+    def __init__(self, filename, resume=False):
+        """Open the checkpoint file. Unless resuming, the state of an
+        earlier run is removed.
+
+        @param filename: name of the SQLite database file
+        @param resume: if True, keep the state of an earlier run
+        """
+        self.filename = os.path.expanduser(filename)
+        # lock for the changes since the last checkpoint
+        self.lock = threading.Lock()
+        # lock for the database connection
+        self.write_lock = threading.Lock()
+        self.reset_changes()
+        # the log statistics of a resumed run, restored when logging starts
+        self.log_stats = {}
+        self.connection = sqlite3.connect(self.filename, check_same_thread=False)
+        try:
+            self.check_file()
+        except LinkCheckerError:
+            self.connection.close()
+            raise
+        if not resume:
+            for table in ("urls", "results", "robots", "state"):
+                self.connection.execute("DROP TABLE IF EXISTS %s" % table)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS urls (key TEXT PRIMARY KEY, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS robots (url TEXT PRIMARY KEY, data TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, data TEXT)"
+        )
+        self.connection.commit()
+
+    def check_file(self):
+        """Mark the database as checkpoint file. Other databases, for
+        example a result cache file, are refused so their tables are
+        not dropped.
+
+        @raises: LinkCheckerError if the file is no checkpoint file
+        """
+        try:
+            application_id = self.connection.execute(
+                "PRAGMA application_id"
+            ).fetchone()[0]
+            num_tables = self.connection.execute(
+                "SELECT COUNT(*) FROM sqlite_master"
+            ).fetchone()[0]
+        except sqlite3.DatabaseError as msg:
+            raise LinkCheckerError(
+                _("Could not open checkpoint file %(filename)s: %(msg)s")
+                % {"filename": self.filename, "msg": msg}
+            )
+        if application_id != APPLICATION_ID and num_tables:
+            raise LinkCheckerError(
+                _("%(filename)s is not a checkpoint file")
+                % {"filename": self.filename}
+            )
+        self.connection.execute("PRAGMA application_id = %d" % APPLICATION_ID)
+
+    def reset_changes(self):
+        """Forget the recorded changes."""
+        # mapping {cache key -> fields of queued URL}
+        self.queued = {}
+        # cache keys of finished URLs
+        self.done = set()
+        # mapping {cache key -> result}
+        self.results = {}
+        # mapping {robots.txt URL -> parsed robots.txt}
+        self.robots = {}
+
+    def attach(self, aggregate):
+        """Record the changes of the URL queue, the result cache and the
+        robots.txt cache of given aggregate."""
+        self.result_cache = aggregate.result_cache
+        aggregate.urlqueue.checkpoint = self
+        aggregate.result_cache.add_listener(self.add_result)
+        aggregate.robots_txt.add_listener(self.add_robots_txt)
+        aggregate.checkpoint = self
+
+    def url_queued(self, url_data):
+        """Record a queued URL."""
+        key = url_data.cache_url
+        if key is None:
+            return
+        fields = dump_url(url_data)
+        with self.lock:
+            self.done.discard(key)
+            self.queued[key] = fields
+
+    def url_done(self, url_data):
+        """Record a finished URL."""
+        key = url_data.cache_url
+        if key is None:
+            return
+        with self.lock:
+            if self.queued.pop(key, None) is None:
+                self.done.add(key)
+
+    def add_result(self, key):
+        """Record a result stored in the result cache."""
+        result = self.result_cache.peek_result(key)
+        if result is None:
+            return
+        with self.lock:
+            self.results[key] = result
+
+    def add_robots_txt(self, roboturl, rp):
+        """Record a parsed robots.txt file."""
+        with self.lock:
+            self.robots[roboturl] = rp
+
+    def write(self, aggregate):
+        """Write the changes since the last checkpoint and the current
+        log statistics."""
+        with self.lock:
+            queued, done = self.queued, self.done
+            results, robots = self.results, self.robots
+            self.reset_changes()
+        state = [
+            ("logger%d" % num, json.dumps(vars(logger.stats)))
+            for num, logger in enumerate(aggregate.logger.loggers)
+        ]
+        state.append(("downloaded_bytes", json.dumps(aggregate.downloaded_bytes)))
+        with self.write_lock:
+            if self.connection is None:
+                return
+            start = time.time()
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?)",
+                ((key, json.dumps(fields)) for key, fields in queued.items()),
+            )
+            self.connection.executemany(
+                "DELETE FROM urls WHERE key = ?", ((key,) for key in done)
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?)",
+                ((key, dump_result(result)) for key, result in results.items()),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO robots VALUES (?, ?)",
+                ((url, dump_robots_txt(rp)) for url, rp in robots.items()),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO state VALUES (?, ?)", state
+            )
+            self.connection.commit()
+            log.debug(
+                LOG_CHECK,
+                "checkpoint with %d queued, %d finished URLs written in %.3f seconds",
+                len(queued), len(done), time.time() - start,
+            )
+
+    def restore(self, aggregate):
+        """Restore the results, robots.txt files and queued URLs of the
+        last checkpoint into given aggregate."""
+        with self.write_lock:
+            rows = self.connection.execute("SELECT key, data FROM results")
+            for key, data in rows:
+                aggregate.result_cache.add_result(key, load_result(data))
+            rows = self.connection.execute("SELECT url, data FROM robots")
+            for url, data in rows:
+                aggregate.robots_txt.add_robots_txt(url, load_robots_txt(url, data))
+            rows = self.connection.execute("SELECT name, data FROM state")
+            for name, data in rows:
+                if name == "downloaded_bytes":
+                    aggregate.downloaded_bytes = json.loads(data)
+                else:
+                    self.log_stats[name] = json.loads(data)
+            rows = self.connection.execute("SELECT key, data FROM urls").fetchall()
+        for key, data in rows:
+            aggregate.urlqueue.put(load_url(key, json.loads(data), aggregate))
+        log.debug(LOG_CHECK, "resuming with %d queued URLs", len(rows))
+
+    def restore_log_stats(self, loggers):
+        """Continue the log statistics of the resumed run. Called after
+        the loggers have started their output."""
+        for num, logger in enumerate(loggers):
+            stats = self.log_stats.get("logger%d" % num)
+            if stats is not None:
+                vars(logger.stats).update(stats)
+
+    def close(self):
+        """Close the checkpoint file."""
+        with self.write_lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class Checkpointer(task.CheckedTask):
+    """Thread writing checkpoints periodically."""
+
+    def __init__(self, aggregate, wait_seconds):
+        """Store the aggregate and the checkpoint interval.
+
+        @param wait_seconds: seconds between two checkpoints
+        """
+        super().__init__()
+        self.aggregate = aggregate
+        self.wait_seconds = wait_seconds
+
+    def run_checked(self):
+        """Write checkpoints until the thread is stopped."""
+        self.name = "Checkpoint"
+        while not self.stopped(self.wait_seconds):
+            self.aggregate.checkpoint.write(self.aggregate)
+
+    def internal_error(self):
+        """Print an internal error on the console."""
+        console.internal_error()
@@ -33,8 +33,16 @@ class StatusLogger:
         """Save file descriptor for logging."""
         self.fd = fd
 
-    def log_status(self, checked, in_progress, queue, duration, num_urls):
-        """Write status message to file descriptor."""
+    def log_status(
+        self, checked, in_progress, queue, duration, num_urls, cache_status,
+        connection_stats,
+    ):
+        """Write status message to file descriptor.
+
+        @param cache_status: tuple (cache hits, cache misses, evictions)
+        @param connection_stats: counters of the HTTP connection pool, as
+          returned by httppool.PoolStats.get()
+        """
         msg = _n("%2d thread active", "%2d threads active", in_progress) % in_progress
         self.write("%s, " % msg)
         msg = _n("%5d link queued", "%5d links queued", queue) % queue
@@ -43,6 +51,13 @@ class StatusLogger:
         self.write("%s" % msg)
         msg = _n("%3d URL", "%3d URLs", num_urls) % num_urls
         self.write(" in %s checked, " % msg)
+        hits, misses, evictions = cache_status
+        msg = _("cache %d hits, %d misses, %d evicted") % (hits, misses, evictions)
+        self.write("%s, " % msg)
+        msg = _("%d reused connections, %d resumed TLS sessions") % (
+            connection_stats["reused"], connection_stats["tls_resumed"]
+        )
+        self.write("%s, " % msg)
         msg = _("runtime %s") % strformat.strduration_long(duration)
         self.writeln(msg)
         self.flush()
@@ -0,0 +1,312 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Check URLs in worker processes.
+
+The main process keeps the URL queue, the result cache and the loggers.
+Its checker threads send each URL to the worker process of the URL host
+and wait for the compact result and the links found in the content.
+Since all URLs of one host go to the same worker, request throttling
+and robots.txt caching per host stay within one process.
+"""
+import concurrent.futures
+import copy
+import itertools
+import multiprocessing
+import signal
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from .. import log, LOG_CHECK, LinkCheckerError, parser, plugins
+from ..cache import results, robots_txt
+from ..cache.urlqueue import get_host_key
+from ..checker.urlbase import UrlBase
+from . import checker, scheduler
+
+# Number of seconds to wait for a reply before looking if the
+# worker process is still alive.
+WORKER_POLL_SECS = 1.0
+
+# URL to check, with the URL data state without its aggregate
+Task = namedtuple("Task", "task_id klass state stored_page")
+
+# Outcome of checking one URL in a worker process:
+# - result: the to_wire() result
+# - aliases: the redirect aliases of the URL
+# - links: argument lists of add_url() for the links found in the content
+# - content_encoding: the encoding of the content the links were found in
+# - validators: tuple (ETag, Last-Modified) for revalidation or None
+# - anchors: the anchors of the document or None
+# - parsed: True if the content has been parsed for links
+# - downloaded: number of downloaded bytes
+# - retry_delay: seconds to wait before checking the URL again, or None
+Reply = namedtuple(
+    "Reply",
+    "result aliases links content_encoding validators anchors parsed downloaded "
+    "retry_delay",
+)
+
+Worker = namedtuple("Worker", "process tasks")
+
+
+def get_worker_config(config):
+    """Return a copy of the configuration for worker processes. The
+    loggers and the result cache file are only used by the main process."""
+    worker_config = copy.copy(config)
+    worker_config["logger"] = None
+    worker_config["fileoutput"] = []
+    worker_config["resultcachefile"] = None
+    worker_config.status_logger = None
+    return worker_config
+
+
+class WorkerPool:
+    """Check URLs in worker processes, sharded by host."""
+
+    def __init__(self, config, cookies, num_processes, num_threads):
+        """Start the worker processes and the thread receiving their replies.
+
+        @param config: the configuration of the main process
+        @param cookies: the cookies of the login URL or None
+        @param num_processes: number of worker processes
+        @param num_threads: number of checking threads per worker process
+        """
+        # spawned processes don't inherit the threads and the open
+        # connections of the main process
+        context = multiprocessing.get_context("spawn")
+        self.num_threads = num_threads
+        self.replies = context.Queue()
+        # mapping {task id -> future waiting for the reply}
+        self.futures = {}
+        self.task_ids = itertools.count()
+        worker_config = get_worker_config(config)
+        self.workers = []
+        for dummy in range(num_processes):
+            tasks = context.Queue()
+            process = context.Process(
+                target=worker_main,
+                args=(worker_config, cookies, tasks, self.replies, num_threads),
+                daemon=True,
+            )
+            process.start()
+            self.workers.append(Worker(process, tasks))
+        self.receiver = threading.Thread(target=self.receive_replies, daemon=True)
+        self.receiver.start()
+
+    def get_worker(self, url_data):
+        """Return the worker checking the URLs of the host of given URL."""
+        return self.workers[hash(get_host_key(url_data)) % len(self.workers)]
+
+    def check(self, url_data):
+        """Send the URL to its worker process and wait for the reply.
+
+        @return: the reply of the worker
+        @rtype: Reply
+        """
+        worker = self.get_worker(url_data)
+        stored_page = None
+        if (
+            url_data.aggregate.config["revalidate"]
+            and url_data.allows_simple_recursion()
+        ):
+            cache = url_data.aggregate.result_cache
+            stored_page = cache.get_page(url_data.cache_url)
+        state = url_data.get_state()
+        del state["aggregate"]
+        task_id = next(self.task_ids)
+        future = concurrent.futures.Future()
+        self.futures[task_id] = future
+        worker.tasks.put(Task(task_id, url_data.__class__, state, stored_page))
+        while True:
+            try:
+                return future.result(timeout=WORKER_POLL_SECS)
+            except concurrent.futures.TimeoutError:
+                if not worker.process.is_alive():
+                    self.futures.pop(task_id, None)
+                    raise LinkCheckerError(
+                        "worker process %d exited with code %s"
+                        % (worker.process.pid, worker.process.exitcode)
+                    )
+
+    def check_url(self, url_data, logger):
+        """Check a single URL in a worker process, then cache and log its
+        result and queue the links found in its content."""
+        aggregate = url_data.aggregate
+        cache = aggregate.result_cache
+        key = url_data.cache_url
+        reply = self.check(url_data)
+        if reply.retry_delay is not None:
+            url_data.retry_delay = reply.retry_delay
+            checker.retry_url(url_data)
+            return
+        result = reply.result
+        cache.add_result(key, result)
+        for alias in reply.aliases:
+            # redirect aliases
+            cache.add_result(alias, result)
+        logger.log_url(result)
+        aggregate.add_downloaded_bytes(reply.downloaded)
+        if reply.links:
+            # the links are relative to the checked URL and its content
+            url_data.url = result.url
+            url_data.content_type = result.content_type
+            url_data.content_encoding = reply.content_encoding
+            for args in reply.links:
+                # the links were recorded after changes by subclasses
+                # of UrlBase, like the local webroot of file URLs
+                UrlBase.add_url(url_data, *args)
+        if reply.validators is not None:
+            # remember the page for revalidation in later runs
+            cache.add_page(key, *reply.validators, result, reply.links)
+        if reply.anchors is not None:
+            url_data.document_anchors = reply.anchors
+            checker.add_document(url_data, result, reply.parsed)
+
+    def receive_replies(self):
+        """Pass the replies of the worker processes to the waiting
+        checker threads."""
+        while True:
+            message = self.replies.get()
+            if message is None:
+                break
+            task_id, reply, error = message
+            future = self.futures.pop(task_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(
+                    LinkCheckerError("Error in worker process:\n%s" % error)
+                )
+            else:
+                future.set_result(reply)
+
+    def close(self, timeout=1.0):
+        """Stop the worker processes. Processes that are still checking
+        URLs after the given number of seconds are terminated."""
+        for worker in self.workers:
+            for dummy in range(self.num_threads):
+                worker.tasks.put(None)
+        endtime = time.time() + timeout
+        for worker in self.workers:
+            worker.process.join(timeout=max(0.0, endtime - time.time()))
+            if worker.process.is_alive():
+                log.debug(LOG_CHECK, "terminating worker %d", worker.process.pid)
+                worker.process.terminate()
+                worker.process.join()
+        self.replies.put(None)
+        self.receiver.join()
+
+
+class PageCache(results.ResultCache):
+    """Result cache of a worker process, returning the stored pages
+    sent along with the URLs to check."""
+
+    def __init__(self, result_cache_size):
+        """Initialize the stored pages."""
+        super().__init__(result_cache_size)
+        # mapping {cache key -> stored page}
+        self.pages = {}
+
+    def get_page(self, key):
+        """Return and forget the stored page sent for the key."""
+        return self.pages.pop(key, None)
+
+
+def worker_main(config, cookies, tasks, replies, num_threads):
+    """Check the URLs of given task queue in several threads until each
+    thread got a None task."""
+    from .aggregator import Aggregate
+
+    # the main process handles interrupts and stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    aggregate = Aggregate(
+        config,
+        None,
+        robots_txt.RobotsTxt(config["useragent"]),
+        plugins.PluginManager(config),
+        PageCache(config["resultcachesize"]),
+        scheduler.HostScheduler(
+            config["maxrequestspersecond"], config["adaptivehostrate"]
+        ),
+    )
+    aggregate.cookies = cookies
+    threads = []
+    for dummy in range(num_threads):
+        t = threading.Thread(target=check_tasks, args=(aggregate, tasks, replies))
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+
+def check_tasks(aggregate, tasks, replies):
+    """Check URLs of the task queue and put the replies in the reply
+    queue until a None task is received."""
+    aggregate.add_request_session()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        try:
+            replies.put((task.task_id, check_task(aggregate, task), None))
+        except Exception:
+            replies.put((task.task_id, None, traceback.format_exc()))
+
+
+def check_task(aggregate, task):
+    """Check the URL of a task like checker.check_url() does, recording
+    the links found in the content instead of queueing them.
+
+    @return: the reply for the main process
+    @rtype: Reply
+    """
+    url_data = task.klass.__new__(task.klass)
+    url_data.set_state(task.state)
+    url_data.aggregate = aggregate
+    if task.stored_page is not None:
+        aggregate.result_cache.pages[url_data.cache_url] = task.stored_page
+    check_start = time.time()
+    try:
+        url_data.check()
+        if url_data.retry_delay is not None:
+            return Reply(None, [], [], None, None, None, False, 0, url_data.retry_delay)
+        do_parse = url_data.check_content()
+        url_data.checktime = time.time() - check_start
+        result = url_data.to_wire()
+        # links are recorded for revalidation only when the URL
+        # allows it, see HttpUrl.check_connection()
+        revalidate = url_data.found_links is not None
+        if not revalidate:
+            url_data.found_links = []
+        if do_parse:
+            parser.parse_url(url_data)
+        return Reply(
+            result,
+            url_data.aliases,
+            url_data.found_links,
+            url_data.content_encoding,
+            url_data.get_validators() if revalidate else None,
+            url_data.document_anchors,
+            do_parse,
+            url_data.size if url_data.data else 0,
+            None,
+        )
+    finally:
+        # close/release possible open connection
+        url_data.close_connection()
+        url_data.free_content()
@@ -0,0 +1,361 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Schedule requests to hosts.
+"""
+import asyncio
+import collections
+import random
+import threading
+import time
+
+from .. import log, LOG_CHECK
+from ..decorators import synchronized
+from ..lock import get_lock
+
+# lock object
+hosts_lock = get_lock("scheduler_hosts_lock")
+connections_lock = get_lock("scheduler_connections_lock")
+
+
+def get_url_host(url_data):
+    """Return the host to throttle requests of given URL data for,
+    or None if requests for this URL are not throttled."""
+    if url_data.has_result or not url_data.host_key:
+        return None
+    if url_data.scheme not in ("http", "https"):
+        return None
+    return url_data.host_key
+
+
+def get_connection_key(url_data):
+    """Return tuple (scheme, host) of the connection needed to check given
+    URL data, or None if its connections are not limited."""
+    if url_data.has_result or not url_data.host_key:
+        return None
+    if url_data.scheme not in ("http", "https", "ftp"):
+        return None
+    return (url_data.scheme, url_data.host_key)
+
+
+class ConnectionLimits:
+    """
+    Thread-safe limits of concurrent connections per URL scheme and per
+    host. The limits work like counting semaphores, but the counters can
+    be inspected so URL queues can prefer URLs whose connections are free.
+    """
+
+    # seconds to wait before trying again to get a connection in an
+    # asyncio event loop
+    poll_seconds = 0.05
+
+    def __init__(self, scheme_limits, host_limit):
+        """Initialize the connection counters.
+
+        @param scheme_limits: mapping {scheme -> maximum number of
+          connections}, where 0 means no limit
+        @param host_limit: maximum number of connections to one host,
+          0 means no limit
+        """
+        self.scheme_limits = {
+            scheme: limit for scheme, limit in scheme_limits.items() if limit
+        }
+        self.host_limit = host_limit
+        # number of open connections per scheme and per host
+        self.schemes = collections.Counter()
+        self.hosts = collections.Counter()
+        self.released = threading.Condition(connections_lock)
+
+    def is_limited(self):
+        """Return True if any connection limit is set."""
+        return bool(self.scheme_limits or self.host_limit)
+
+    def is_free(self, key):
+        """Return True if a connection for key can be opened without
+        waiting. This is not thread-safe and is likely to change before
+        the returned value is used."""
+        if key is None:
+            return True
+        scheme, host = key
+        limit = self.scheme_limits.get(scheme)
+        if limit and self.schemes[scheme] >= limit:
+            return False
+        return not self.host_limit or self.hosts[host] < self.host_limit
+
+    def try_acquire(self, key):
+        """Count a connection for key if the limits allow it.
+
+        @return: True if the connection has been counted, else False
+        """
+        if key is None:
+            return True
+        with self.released:
+            if not self.is_free(key):
+                return False
+            scheme, host = key
+            self.schemes[scheme] += 1
+            self.hosts[host] += 1
+            return True
+
+    def acquire(self, key):
+        """Count a connection for key, waiting until the limits allow it."""
+        if key is None:
+            return
+        with self.released:
+            while not self.is_free(key):
+                self.released.wait()
+            scheme, host = key
+            self.schemes[scheme] += 1
+            self.hosts[host] += 1
+
+    async def acquire_async(self, key):
+        """Count a connection for key in an asyncio event loop, waiting
+        until the limits allow it."""
+        while not self.try_acquire(key):
+            await asyncio.sleep(self.poll_seconds)
+
+    def release(self, key):
+        """Release a connection counted with acquire()."""
+        if key is None:
+            return
+        scheme, host = key
+        with self.released:
+            self.schemes[scheme] -= 1
+            if not self.schemes[scheme]:
+                del self.schemes[scheme]
+            self.hosts[host] -= 1
+            if not self.hosts[host]:
+                del self.hosts[host]
+            self.released.notify_all()
+
+
+class HostState:
+    """Adaptive request rate and concurrency of one host."""
+
+    __slots__ = ("rate", "limit", "active", "latency")
+
+    def __init__(self, rate):
+        """Initialize the state with given request rate."""
+        # requests per second
+        self.rate = rate
+        # maximum number of concurrent requests
+        self.limit = 1.0
+        # number of requests in progress
+        self.active = 0
+        # moving average of the response latency in seconds, or None
+        self.latency = None
+
+
+class HostScheduler:
+    """
+    Thread-safe per-host politeness scheduler.
+    Each host has a due time for its next request. A thread reserves a
+    time slot for a host while holding the lock and waits for the slot
+    without holding it, so throttling one host never blocks requests
+    to other hosts.
+
+    In adaptive mode each host also has a request rate and a limit of
+    concurrent requests. Both increase additively while the host responds
+    fast and healthy, and decrease multiplicatively on congestion, i.e.
+    on 429 or 503 responses, timeouts or rising latency.
+    """
+
+    wait_time_min_default = 0.1
+    wait_time_max_default = 0.6
+    # seconds to wait before asking again for a host at its concurrency
+    # limit in an asyncio event loop
+    poll_seconds = 0.05
+    # adaptive mode: rate increase per healthy response in requests per second
+    rate_increase = 0.5
+    # adaptive mode: minimum rate in requests per second
+    rate_min = 0.1
+    # adaptive mode: maximum number of concurrent requests to one host
+    limit_max = 10
+    # adaptive mode: factor to decrease rate and concurrency on congestion
+    decrease_factor = 0.5
+    # adaptive mode: responses slower than this factor times the average
+    # latency indicate congestion
+    latency_factor = 2.0
+    # adaptive mode: weight of a new latency in the moving average
+    latency_weight = 0.2
+    # HTTP status codes indicating congestion
+    congestion_status = (429, 503)
+
+    def __init__(self, requests_per_second, adaptive=False, connection_limits=None):
+        """Initialize per-host due times.
+
+        @param requests_per_second: maximum number of requests per second
+          to one host
+        @param adaptive: if True, adapt the rate and concurrency of each
+          host to its responses
+        @param connection_limits: if not None, URLs are only due when
+          their connection limits allow a new connection
+        @type connection_limits: ConnectionLimits or None
+        """
+        self.wait_time_min = 1.0 / requests_per_second
+        self.wait_time_max = 6 * self.wait_time_min
+        self.adaptive = adaptive
+        # mapping {host -> time of next allowed request}
+        self.due_times = {}
+        # hosts without a limit on the maximum request rate
+        self.maxrated = set()
+        # adaptive mode: mapping {host -> HostState}
+        self.states = {}
+        self.connection_limits = connection_limits
+        # notified when a request has been released in adaptive mode
+        self.released = threading.Condition(hosts_lock)
+
+    def get_wait_time(self, host):
+        """Return number of seconds until the next request to host is due.
+        This is not thread-safe and is likely to change before the
+        returned value is used."""
+        return max(0.0, self.due_times.get(host, 0.0) - time.time())
+
+    def is_due(self, url_data):
+        """Return True if the URL data can be checked without waiting."""
+        if self.connection_limits is not None and not self.connection_limits.is_free(
+            get_connection_key(url_data)
+        ):
+            return False
+        host = get_url_host(url_data)
+        if host is None:
+            return True
+        state = self.states.get(host)
+        if state is not None and state.active >= int(state.limit):
+            return False
+        return self.get_wait_time(host) <= 0.0
+
+    def wait_for_host(self, host):
+        """Throttle requests to one host. Waits for the reserved time slot
+        without holding the scheduler lock. A host at its limit of
+        concurrent requests is asked again when a request is released."""
+        with self.released:
+            wait = self._reserve(host)
+            while wait is None:
+                self.released.wait()
+                wait = self._reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def wait_for_host_async(self, host):
+        """Throttle requests to one host in an asyncio event loop."""
+        wait = self.reserve(host)
+        while wait is None:
+            await asyncio.sleep(self.poll_seconds)
+            wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @synchronized(hosts_lock)
+    def reserve(self, host):
+        """Reserve the next time slot for a request to host. In adaptive
+        mode the request must be released with release() after the
+        response.
+
+        @return: number of seconds to wait until the slot is due, or None
+          if the host has reached its limit of concurrent requests
+        @rtype: float or None
+        """
+        return self._reserve(host)
+
+    def _reserve(self, host):
+        """Reserve the next time slot for a request to host.
+        Not thread-safe!"""
+        t = time.time()
+        due_time = max(t, self.due_times.get(host, t))
+        if self.adaptive:
+            state = self.get_state(host)
+            if state.active >= int(state.limit):
+                return None
+            state.active += 1
+            interval = random.uniform(0.5, 1.5) / state.rate
+            log.debug(LOG_CHECK,
+                      "Rate: %.2f Concurrency: %d/%d for host: %s",
+                      state.rate, state.active, int(state.limit), host)
+            self.due_times[host] = due_time + interval
+            return due_time - t
+        if host in self.maxrated:
+            wait_time_min, wait_time_max = self.wait_time_min, self.wait_time_max
+        else:
+            wait_time_min = max(self.wait_time_min, self.wait_time_min_default)
+            wait_time_max = max(self.wait_time_max, self.wait_time_max_default)
+        log.debug(LOG_CHECK,
+                  "Min wait time: %s Max wait time: %s for host: %s",
+                  wait_time_min, wait_time_max, host)
+        self.due_times[host] = due_time + random.uniform(wait_time_min, wait_time_max)
+        return due_time - t
+
+    def get_state(self, host):
+        """Return the adaptive state of host, starting new hosts at the
+        average rate of the non-adaptive mode."""
+        state = self.states.get(host)
+        if state is None:
+            wait_time = (
+                max(self.wait_time_min, self.wait_time_min_default)
+                + max(self.wait_time_max, self.wait_time_max_default)
+            ) / 2
+            state = self.states[host] = HostState(self.get_max_rate(host, wait_time))
+        return state
+
+    def get_max_rate(self, host, wait_time=None):
+        """Return the maximum request rate for host, limited by the given
+        minimum wait time."""
+        if wait_time is None:
+            if host in self.maxrated:
+                wait_time = self.wait_time_min
+            else:
+                wait_time = max(self.wait_time_min, self.wait_time_min_default)
+        return min(1.0 / self.wait_time_min, 1.0 / wait_time)
+
+    @synchronized(hosts_lock)
+    def release(self, host, status=None, latency=None, timeout=False):
+        """Finish a request reserved with reserve() and adapt the rate and
+        concurrency of the host to its response. Does nothing unless in
+        adaptive mode.
+
+        @param status: HTTP status code of the response, or None if the
+          request failed
+        @param latency: seconds until the response headers were received
+        @param timeout: True if the request timed out
+        """
+        if not self.adaptive:
+            return
+        state = self.states.get(host)
+        if state is None or state.active <= 0:
+            return
+        state.active -= 1
+        self.released.notify_all()
+        slow = False
+        if latency is not None:
+            if state.latency is None:
+                state.latency = latency
+            else:
+                slow = latency > self.latency_factor * state.latency
+                state.latency += self.latency_weight * (latency - state.latency)
+        if timeout or slow or status in self.congestion_status:
+            state.rate = max(self.rate_min, state.rate * self.decrease_factor)
+            state.limit = max(1.0, state.limit * self.decrease_factor)
+            log.debug(LOG_CHECK,
+                      "Decrease rate to %.2f and concurrency to %d for host %s",
+                      state.rate, int(state.limit), host)
+        elif status is not None:
+            state.rate = min(self.get_max_rate(host), state.rate + self.rate_increase)
+            state.limit = min(self.limit_max, state.limit + 1.0 / state.limit)
+
+    @synchronized(hosts_lock)
+    def set_maxrated(self, host):
+        """Remove the limit on the maximum request rate for a host."""
+        self.maxrated.add(host)
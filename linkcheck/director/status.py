@@ -16,6 +16,7 @@
 """Status message handling"""
 import time
 from . import task
+from .. import httppool
 
 
 class Status(task.LoggedCheckedTask):
@@ -54,5 +55,9 @@ class Status(task.LoggedCheckedTask):
         """Log a status message."""
         duration = time.time() - self.start_time
         checked, in_progress, queue = self.aggregator.urlqueue.status()
-        num_urls = len(self.aggregator.result_cache)
-        self.logger.log_status(checked, in_progress, queue, duration, num_urls)
+        num_urls = self.aggregator.result_cache.num_keys
+        cache_status = self.aggregator.result_cache.status()
+        self.logger.log_status(
+            checked, in_progress, queue, duration, num_urls, cache_status,
+            httppool.stats.get(),
+        )
@@ -39,6 +39,15 @@ hasattr(bs4.builder, "XMLParsedAsHTMLWarning") and warnings.simplefilter(
 )
 
 
+def detect_encoding(markup, from_encoding=None):
+    """Return the encoding Beautiful Soup would use to parse markup,
+    or None if it cannot be detected."""
+    try_encodings = [from_encoding] if from_encoding else []
+    return bs4.dammit.UnicodeDammit(
+        markup, try_encodings, is_html=True
+    ).original_encoding
+
+
 def make_soup(markup, from_encoding=None):
     return bs4.BeautifulSoup(
         markup, "html.parser", from_encoding=from_encoding, multi_valued_attributes=None
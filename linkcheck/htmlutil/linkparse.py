@@ -17,6 +17,7 @@
 Find link tags in HTML text.
 """
 
+from html.parser import HTMLParser
 import re
 
 from .srcsetparse import parse_srcset
@@ -78,6 +79,9 @@ WmlTags = {
 }
 
 
+# match for robots meta element content attribute
+nofollow_re = re.compile(r"\bnofollow\b", re.IGNORECASE)
+
 # matcher for <meta http-equiv=refresh> tags
 refresh_re = re.compile(r"(?i)^\d+;\s*url=(?P<url>.+)$")
 
@@ -91,6 +95,22 @@ swf_url_re = re.compile(b"(?i)%s" % urlutil.safe_url_pattern.encode('ascii'))
 
 c_comment_re = re.compile(r"/\*.*?\*/", re.DOTALL)
 
+# elements without content and end tag
+VoidTags = frozenset((
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr',
+))
+
+# elements whose content is not part of the text of enclosing elements
+NoTextTags = frozenset(('rp', 'rt', 'script', 'style', 'template'))
+
+# elements of the document head and the elements enclosing it
+HeadTags = frozenset((
+    'base', 'head', 'html', 'link', 'meta', 'noscript', 'script', 'style',
+    'template', 'title',
+))
+
 
 def strip_c_comments(text):
     """Remove C/CSS-style comments from text. Note that this method also
@@ -214,16 +234,178 @@ class LinkFinder:
         self.callback(url, line=lineno, column=column, name=name, base=base)
 
 
-def find_links(soup, callback, tags):
-    """Parse into content and search for URLs to check.
+class ElementParser(HTMLParser):
+    """Parse HTML and call a handler with the arguments (tag, attrs,
+    element_text, lineno, column) for each element in document order,
+    without building a document tree.
+    The stripped text content is only collected for elements in
+    text_tags, for all other elements element_text is empty. Elements
+    inside such an element are reported after its end tag is found."""
+
+    def __init__(self, handler, text_tags=("a",)):
+        """Initialize the parser state."""
+        super().__init__(convert_charrefs=True)
+        self.handler = handler
+        self.text_tags = text_tags
+        # stack of open elements as tuples (tag, element)
+        self.open_elements = []
+        # elements not yet passed to the handler, as lists
+        # [tag, attrs, text parts or None, lineno, column]
+        self.pending = []
+        # text parts of open elements collecting text
+        self.open_texts = []
+        # number of open elements whose content is not text
+        self.no_text_level = 0
+
+    def handle_starttag(self, tag, attrs):
+        """Store element and report it if no preceding element waits
+        for its text."""
+        lineno, column = self.getpos()
+        attrs = {name: "" if value is None else value for name, value in attrs}
+        text = [] if tag in self.text_tags else None
+        element = [tag, attrs, text, lineno, column + 1]
+        self.pending.append(element)
+        if tag in VoidTags:
+            self.flush()
+            return
+        self.open_elements.append((tag, element))
+        if text is not None:
+            self.open_texts.append(text)
+        if tag in NoTextTags:
+            self.no_text_level += 1
+        self.flush()
+
+    def handle_endtag(self, tag):
+        """Close the most recent open element with the given tag and all
+        elements opened after it. End tags without open element are
+        ignored."""
+        for pos in range(len(self.open_elements) - 1, -1, -1):
+            if self.open_elements[pos][0] == tag:
+                break
+        else:
+            return
+        for _tag, element in reversed(self.open_elements[pos:]):
+            self.close_element(element)
+        del self.open_elements[pos:]
+        self.flush()
+
+    def close_element(self, element):
+        """Finish the text of an element."""
+        tag, text = element[0], element[2]
+        if text is not None:
+            self.open_texts.pop()
+            element[2] = "".join(text).strip()
+        if tag in NoTextTags:
+            self.no_text_level -= 1
+
+    def handle_data(self, data):
+        """Add text to all open elements collecting text."""
+        if not self.no_text_level:
+            for text in self.open_texts:
+                text.append(data)
+
+    def flush(self):
+        """Report pending elements whose text is complete."""
+        num = 0
+        for tag, attrs, text, lineno, column in self.pending:
+            if isinstance(text, list):
+                break
+            self.handler(tag, attrs, text or "", lineno, column)
+            num += 1
+        del self.pending[:num]
+
+    def close(self):
+        """Parse remaining data and close all open elements."""
+        super().close()
+        for _tag, element in reversed(self.open_elements):
+            self.close_element(element)
+        self.open_elements = []
+        self.flush()
+
+
+def find_links(text, callback, tags):
+    """Parse HTML text and search for URLs to check.
     When a URL is found it is passed to the supplied callback.
     """
     lf = LinkFinder(callback, tags)
-    for element in soup.find_all(True):
-        lf.html_element(
-            element.name,
-            element.attrs,
-            element.text.strip(),
-            element.sourceline,
-            None if element.sourcepos is None else element.sourcepos + 1,
-        )
+    parser = ElementParser(lf.html_element)
+    parser.feed(text)
+    parser.close()
+
+
+class DocumentAnalysis:
+    """Results of a single pass over an HTML document.
+    Links and anchors are lists of tuples (url, line, column, name, base).
+    The anchors list stays empty when anchors are not collected.
+    """
+
+    def __init__(self):
+        """Initialize empty results."""
+        self.links = []
+        self.anchors = []
+        # flag if a robots meta element forbids following the links
+        self.nofollow = False
+
+
+class DocumentAnalyzer:
+    """Analyze an HTML document like analyze(), with the text fed in
+    parts. The links found so far are in analysis.links while the rest
+    of the document is still to be fed."""
+
+    def __init__(self, tags=LinkTags, anchors=True):
+        """Initialize the empty analysis and the parser. Anchors are only
+        collected if the anchors flag is set."""
+        self.analysis = DocumentAnalysis()
+        self.link_finder = LinkFinder(self.add_link, tags)
+        if anchors:
+            self.anchor_finder = LinkFinder(self.add_anchor, AnchorTags)
+        else:
+            self.anchor_finder = None
+        self.parser = ElementParser(self.html_element)
+        # flag if an element not allowed in the document head was found;
+        # robots meta elements must be in the head, so the nofollow flag
+        # does not change after that
+        self.head_done = False
+
+    def add_link(self, url, line, column, name, base):
+        """Store a found link."""
+        self.analysis.links.append((url, line, column, name, base))
+
+    def add_anchor(self, url, line, column, name, base):
+        """Store a found anchor."""
+        self.analysis.anchors.append((url, line, column, name, base))
+
+    def html_element(self, tag, attrs, element_text, lineno, column):
+        """Search the element for links, anchors and robots meta data."""
+        self.link_finder.html_element(tag, attrs, element_text, lineno, column)
+        if self.anchor_finder is not None:
+            self.anchor_finder.html_element(
+                tag, attrs, element_text, lineno, column
+            )
+        if (
+            tag == "meta"
+            and attrs.get("name") == "robots"
+            and nofollow_re.search(attrs.get("content", ""))
+        ):
+            self.analysis.nofollow = True
+        if tag not in HeadTags:
+            self.head_done = True
+
+    def feed(self, text):
+        """Parse the next part of the HTML text."""
+        self.parser.feed(text)
+
+    def close(self):
+        """Parse the remaining text and return the DocumentAnalysis."""
+        self.parser.close()
+        self.head_done = True
+        return self.analysis
+
+
+def analyze(text, tags=LinkTags, anchors=True):
+    """Parse HTML text once and return its DocumentAnalysis with the
+    links in the given tags, the anchors if the anchors flag is set and
+    the robots meta flag."""
+    analyzer = DocumentAnalyzer(tags, anchors=anchors)
+    analyzer.feed(text)
+    return analyzer.close()
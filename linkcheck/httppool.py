@@ -0,0 +1,244 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Shared pool of HTTP connections for the request sessions of all threads.
+
+Each checker thread has its own requests session, but all sessions use
+one transport adapter, so keep-alive connections opened by one thread are
+reused by the others. HTTPS connections resume the TLS sessions of earlier
+connections to the same server to skip full handshakes.
+"""
+import collections
+import os
+import ssl
+import threading
+
+import requests.adapters
+import urllib3.connection
+import urllib3.connectionpool
+
+from . import log, LOG_CHECK
+
+# number of connection pools, i.e. of hosts with kept-alive connections
+NUM_POOLS = 100
+# number of TLS sessions kept for resumption
+NUM_TLS_SESSIONS = 1000
+
+
+class PoolStats:
+    """Thread-safe counters of the connection pool."""
+
+    names = ("requests", "connections", "tls_handshakes", "tls_resumed")
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.lock = threading.Lock()
+        self.counters = collections.Counter()
+
+    def count(self, name):
+        """Increase the counter with given name."""
+        with self.lock:
+            self.counters[name] += 1
+
+    def get(self):
+        """Return a dictionary with the counters and the number of
+        requests sent over reused connections."""
+        with self.lock:
+            stats = {name: self.counters[name] for name in self.names}
+        stats["reused"] = max(0, stats["requests"] - stats["connections"])
+        return stats
+
+
+# counters of the connections of all adapters
+stats = PoolStats()
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """SSL context resuming the TLS session of the last connection to the
+    same server. With TLS 1.3 the server sends the session after the
+    handshake, so the session is stored again when the connection is
+    released to its pool or closed."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the stored TLS sessions."""
+        super().__init__()
+        self.sessions_lock = threading.Lock()
+        # mapping {server hostname -> TLS session}, least recently used first
+        self.sessions = collections.OrderedDict()
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        """Wrap socket, resuming the stored TLS session of the server."""
+        if session is None and server_hostname is not None:
+            with self.sessions_lock:
+                session = self.sessions.get(server_hostname)
+        ssl_sock = super().wrap_socket(
+            sock, *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        self.store_session(ssl_sock)
+        return ssl_sock
+
+    def store_session(self, ssl_sock):
+        """Store the TLS session of a socket wrapped by this context."""
+        server_hostname = ssl_sock.server_hostname
+        session = ssl_sock.session
+        if server_hostname is None or session is None:
+            return
+        with self.sessions_lock:
+            self.sessions[server_hostname] = session
+            self.sessions.move_to_end(server_hostname)
+            if len(self.sessions) > NUM_TLS_SESSIONS:
+                self.sessions.popitem(last=False)
+
+
+def store_tls_session(conn):
+    """Store the TLS session of an HTTPS connection in the context which
+    resumes it."""
+    sock = conn.sock
+    context = getattr(sock, "context", None)
+    if isinstance(context, ResumingSSLContext):
+        context.store_session(sock)
+
+
+def get_ssl_context(verify):
+    """Return a new SSL context resuming TLS sessions for the verify option
+    of requests. The certificate verification mode is set by urllib3 for
+    each connection.
+
+    @param verify: False to not verify certificates, True or the file
+      or directory name of CA certificates to verify them
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= ssl.OP_NO_COMPRESSION
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context.load_verify_locations(capath=verify)
+    elif isinstance(verify, str):
+        context.load_verify_locations(cafile=verify)
+    else:
+        context.load_default_certs()
+    return context
+
+
+class HTTPConnection(urllib3.connection.HTTPConnection):
+    """HTTP connection counting connects and requests."""
+
+    def connect(self):
+        """Connect and count the new connection."""
+        super().connect()
+        stats.count("connections")
+
+    def request(self, *args, **kwargs):
+        """Send a request and count it."""
+        stats.count("requests")
+        return super().request(*args, **kwargs)
+
+
+class HTTPSConnection(urllib3.connection.HTTPSConnection):
+    """HTTPS connection counting connects, TLS handshakes and requests."""
+
+    def connect(self):
+        """Connect and count the new connection and its TLS handshake."""
+        super().connect()
+        stats.count("connections")
+        if getattr(self.sock, "session_reused", False):
+            stats.count("tls_resumed")
+        else:
+            stats.count("tls_handshakes")
+
+    def request(self, *args, **kwargs):
+        """Send a request and count it."""
+        stats.count("requests")
+        return super().request(*args, **kwargs)
+
+    def close(self):
+        """Store the TLS session and close the connection."""
+        store_tls_session(self)
+        super().close()
+
+
+class HTTPConnectionPool(urllib3.connectionpool.HTTPConnectionPool):
+    """Pool of counting HTTP connections."""
+
+    ConnectionCls = HTTPConnection
+
+
+class HTTPSConnectionPool(urllib3.connectionpool.HTTPSConnectionPool):
+    """Pool of counting HTTPS connections."""
+
+    ConnectionCls = HTTPSConnection
+
+    def _put_conn(self, conn):
+        """Store the TLS session of a released connection and put the
+        connection back into the pool."""
+        if conn is not None:
+            store_tls_session(conn)
+        super()._put_conn(conn)
+
+
+class PoolAdapter(requests.adapters.HTTPAdapter):
+    """Thread-safe transport adapter shared by the request sessions of
+    all threads."""
+
+    def __init__(self, pool_maxsize):
+        """Initialize the connection pools and the SSL contexts.
+
+        @param pool_maxsize: number of kept-alive connections per host
+        """
+        self.ssl_contexts_lock = threading.Lock()
+        # mapping {verify option -> SSL context}
+        self.ssl_contexts = {}
+        super().__init__(pool_connections=NUM_POOLS, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Initialize the pool manager with the counting pools."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": HTTPConnectionPool,
+            "https": HTTPSConnectionPool,
+        }
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        """Add the SSL context resuming TLS sessions to the pool
+        attributes of HTTPS requests. Used by requests >= 2.32 only, older
+        versions do not resume TLS sessions."""
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
+        )
+        if host_params["scheme"] == "https":
+            pool_kwargs["ssl_context"] = self.get_ssl_context(verify)
+        return host_params, pool_kwargs
+
+    def get_ssl_context(self, verify):
+        """Return the shared SSL context for the verify option."""
+        with self.ssl_contexts_lock:
+            context = self.ssl_contexts.get(verify)
+            if context is None:
+                context = self.ssl_contexts[verify] = get_ssl_context(verify)
+            return context
+
+
+def log_stats():
+    """Log the connection counters."""
+    log.debug(
+        LOG_CHECK,
+        "%(requests)d HTTP requests, %(reused)d over reused connections, "
+        "%(connections)d connections, %(tls_handshakes)d TLS handshakes, "
+        "%(tls_resumed)d resumed TLS sessions",
+        stats.get(),
+    )
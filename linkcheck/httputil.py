@@ -13,6 +13,12 @@
 # You should have received a copy of the GNU General Public License along
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+HTTP utility functions.
+"""
+import email.utils
+import time
+
 
 def x509_to_dict(x509):
     """Parse a x509 pyopenssl object to a dictionary with keys
@@ -51,3 +57,28 @@ def get_content_type(headers):
         # split off not needed extension info
         ptype = ptype.split(';')[0]
     return ptype.strip().lower()
+
+
+def get_retry_after(headers, now=None):
+    """
+    Get the number of seconds to wait from the Retry-After header value,
+    given either as delay seconds or as HTTP-date.
+
+    @param now: the current time in seconds since the epoch, default is
+      the current system time
+    @return: non-negative number of seconds, or None if the header is
+      missing or invalid
+    @rtype: float or None
+    """
+    value = headers.get('Retry-After', '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(0.0, date.timestamp() - now)
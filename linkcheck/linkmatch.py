@@ -0,0 +1,159 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Match URLs against the extern and intern link patterns.
+
+The patterns are tried in order and the first matching pattern decides.
+Patterns matching a literal URL prefix, like the intern patterns of the
+start URLs, are looked up in a table of prefixes. The other patterns are
+combined into one regular expression telling if any of them matches
+before they are tried one by one.
+"""
+import re
+
+# maximum number of literal prefixes of one pattern
+MAX_PREFIXES = 16
+
+# alternatives of literal text, as produced by get_intern_pattern()
+AlternativeTokens = {
+    "https?": ("http", "https"),
+    r"(www\.|)": ("www.", ""),
+}
+
+token_re = re.compile(
+    r"(?P<alternative>https\?|\(www\\\.\|\))"
+    r"|\\(?P<escaped>[^0-9A-Za-z])"
+    r"|(?P<char>[^\\.^$*+?{}\[\]|()])"
+)
+
+# pattern parts which cannot be combined with other patterns
+uncombinable_re = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]")
+
+# quantifiers changing the meaning of the preceding literal character
+Quantifiers = frozenset("?*+{")
+
+
+def get_prefixes(regex):
+    """Return the literal URL prefixes a compiled pattern matches, or
+    None if the pattern is no such prefix pattern."""
+    if regex.flags & ~re.UNICODE:
+        return None
+    pattern = regex.pattern
+    if not pattern.startswith("^"):
+        return None
+    prefixes = [""]
+    pos = 1
+    while pos < len(pattern):
+        mo = token_re.match(pattern, pos)
+        if mo is None:
+            return None
+        pos = mo.end()
+        if mo.group("alternative"):
+            values = AlternativeTokens[mo.group("alternative")]
+            prefixes = [prefix + value for prefix in prefixes for value in values]
+            if len(prefixes) > MAX_PREFIXES:
+                return None
+            continue
+        if pattern[pos:pos + 1] in Quantifiers:
+            return None
+        char = mo.group("escaped") or mo.group("char")
+        prefixes = [prefix + char for prefix in prefixes]
+    return prefixes
+
+
+class LinkMatcher:
+    """Find the first extern or intern link pattern matching an URL."""
+
+    def __init__(self, externlinks, internlinks):
+        """Compile the lists of extern and intern link patterns, as
+        returned by get_link_pat()."""
+        self.externlinks = externlinks
+        self.internlinks = internlinks
+        self.entries = list(externlinks) + list(internlinks)
+        self.num_extern = len(externlinks)
+        self.num_intern = len(internlinks)
+        # mapping {literal prefix -> index of first entry}
+        self.prefixes = {}
+        # indexes of the entries which are always tried
+        self.always = []
+        # indexes of the entries in the combined pattern
+        combined = []
+        for index, entry in enumerate(self.entries):
+            regex = entry["pattern"]
+            prefixes = None if entry["negate"] else get_prefixes(regex)
+            if prefixes is not None:
+                for prefix in prefixes:
+                    self.prefixes.setdefault(prefix, index)
+            elif (
+                entry["negate"]
+                or regex.flags & ~re.UNICODE
+                or uncombinable_re.search(regex.pattern)
+            ):
+                self.always.append(index)
+            else:
+                combined.append(index)
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        self.combined = None
+        if combined:
+            try:
+                self.combined = re.compile(
+                    "|".join(
+                        "(?:%s)" % self.entries[index]["pattern"].pattern
+                        for index in combined
+                    )
+                )
+            except re.error:
+                # for example duplicate group names
+                self.always = sorted(self.always + combined)
+                combined = []
+        # indexes of the entries tried if the combined pattern matches
+        self.tried = sorted(self.always + combined)
+
+    def is_current(self, externlinks, internlinks):
+        """Check if the matcher has compiled the given pattern lists.
+        The pattern lists are only appended to."""
+        return (
+            externlinks is self.externlinks
+            and internlinks is self.internlinks
+            and len(externlinks) == self.num_extern
+            and len(internlinks) == self.num_intern
+        )
+
+    def match(self, url):
+        """Return the first pattern entry matching the URL as tuple
+        (is_extern, entry), or None if no pattern matches. Negated
+        entries match URLs not matching their pattern."""
+        first = len(self.entries)
+        for length in self.prefix_lengths:
+            if length > len(url):
+                break
+            index = self.prefixes.get(url[:length])
+            if index is not None and index < first:
+                first = index
+        if self.combined is not None and self.combined.search(url):
+            tried = self.tried
+        else:
+            tried = self.always
+        for index in tried:
+            if index >= first:
+                break
+            entry = self.entries[index]
+            if bool(entry["pattern"].search(url)) != entry["negate"]:
+                first = index
+                break
+        if first == len(self.entries):
+            return None
+        return first < self.num_extern, self.entries[first]
@@ -49,7 +49,8 @@ def parse_html(url_data):
     """Parse into HTML content and search for URLs to check.
     Found URLs are added to the URL queue.
     """
-    linkparse.find_links(url_data.get_soup(), url_data.add_url, linkparse.LinkTags)
+    for url, line, column, name, base in url_data.get_analysis().links:
+        url_data.add_url(url, line=line, column=column, name=name, base=base)
 
 
 def parse_opera(url_data):
@@ -118,7 +119,7 @@ def parse_wml(url_data):
     """Parse into WML content and search for URLs to check.
     Found URLs are added to the URL queue.
     """
-    linkparse.find_links(url_data.get_soup(), url_data.add_url, linkparse.WmlTags)
+    linkparse.find_links(url_data.get_content(), url_data.add_url, linkparse.WmlTags)
 
 
 def parse_firefox(url_data):
@@ -20,7 +20,7 @@ import urllib.parse
 
 from . import _ContentPlugin
 from .. import log, LOG_PLUGIN
-from ..htmlutil import linkparse
+from ..checker.const import WARN_URL_ANCHOR_NOT_FOUND
 
 
 class AnchorCheck(_ContentPlugin):
@@ -33,41 +33,30 @@ class AnchorCheck(_ContentPlugin):
     def check(self, url_data):
         """Check content for invalid anchors."""
         log.debug(LOG_PLUGIN, "checking content for invalid anchors")
-        url_anchor_check = UrlAnchorCheck()
-        linkparse.find_links(
-            url_data.get_soup(), url_anchor_check.add_anchor, linkparse.AnchorTags)
-        url_anchor_check.check_anchor(url_data)
-
-
-class UrlAnchorCheck:
-    """Class to thread-safely handle collecting anchors for a URL"""
-
-    def __init__(self):
-        # list of parsed anchors
-        self.anchors = []
-
-    def add_anchor(self, url, line, column, name, base):
-        """Add anchor URL."""
-        self.anchors.append((url, line, column, name, base))
-
-    def check_anchor(self, url_data):
-        """If URL is valid, parseable and has an anchor, check it.
-        A warning is logged and True is returned if the anchor is not found.
-        """
-        decoded_anchor = urllib.parse.unquote(
-            url_data.anchor, encoding=url_data.encoding)
-        log.debug(LOG_PLUGIN, "checking anchor %r (decoded: %r) in %s",
-                  url_data.anchor, decoded_anchor, self.anchors)
-        if any(x for x in self.anchors if x[0] == decoded_anchor):
-            return
-        if self.anchors:
-            anchornames = sorted({f"`{x[0]}'" for x in self.anchors})
-            anchors = ", ".join(anchornames)
-        else:
-            anchors = "-"
-        args = {"name": url_data.anchor, "decoded": decoded_anchor, "anchors": anchors}
-        msg = "{} {}".format(
-            _("Anchor `%(name)s' (decoded: `%(decoded)s') not found.") % args,
-            _("Available anchors: %(anchors)s.") % args,
-        )
-        url_data.add_warning(msg)
+        anchors = frozenset(x[0] for x in url_data.get_analysis().anchors)
+        # remember the anchors for other URLs of the same document
+        url_data.document_anchors = anchors
+        check_anchor(url_data, anchors)
+
+
+def check_anchor(url_data, anchors):
+    """Check the anchor of the URL against the given set of anchor names.
+    A warning is logged if the anchor is not found.
+    """
+    decoded_anchor = urllib.parse.unquote(
+        url_data.anchor, encoding=url_data.encoding)
+    log.debug(LOG_PLUGIN, "checking anchor %r (decoded: %r) in %s",
+              url_data.anchor, decoded_anchor, anchors)
+    if decoded_anchor in anchors:
+        return
+    if anchors:
+        anchornames = sorted(f"`{x}'" for x in anchors)
+        anchors = ", ".join(anchornames)
+    else:
+        anchors = "-"
+    args = {"name": url_data.anchor, "decoded": decoded_anchor, "anchors": anchors}
+    msg = "{} {}".format(
+        _("Anchor `%(name)s' (decoded: `%(decoded)s') not found.") % args,
+        _("Available anchors: %(anchors)s.") % args,
+    )
+    url_data.add_warning(msg, tag=WARN_URL_ANCHOR_NOT_FOUND)
@@ -54,6 +54,8 @@ class RobotFileParser:
         # list of tuples (sitemap url, line number)
         self.sitemap_urls = []
         self.encoding = None
+        # the parsed lines, to parse them again for a resumed run
+        self.lines = []
 
     def mtime(self):
         """Returns the time the robots.txt file was last fetched.
@@ -143,6 +145,7 @@ class RobotFileParser:
         entry = Entry()
 
         for line in lines:
+            self.lines.append(line)
             line = line.strip()
             linenumber += 1
             if not line:
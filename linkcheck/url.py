@@ -19,6 +19,7 @@ Functions for parsing and matching URL strings.
 
 import os
 import re
+import sys
 import urllib.parse
 
 for scheme in ('ldap', 'irc'):
@@ -171,6 +172,21 @@ def split_netloc(netloc):
     return (userinfo if delim else None), hostport
 
 
+def url_host_key(split):
+    """Return the lowercase host of an urllib.parse.SplitResult with the
+    port if it is not the default port of the scheme, or an empty string
+    for URLs without host. Queued URLs and requests are grouped by host
+    with this key."""
+    host = split.hostname or ""
+    try:
+        port = split.port
+    except ValueError:
+        port = None
+    if port and port != default_ports.get(split.scheme):
+        host = f"{host}:{port}"
+    return sys.intern(host)
+
+
 def url_fix_host(urlparts, encoding):
     """Unquote and fix hostname. Returns is_idn."""
     if not urlparts[1]:
@@ -329,6 +345,9 @@ _relparentdir_ro = re.compile(r"^(?!\.\./)[^/]+/\.\.(/|$)")
 def collapse_segments(path):
     """Remove all redundant segments from the given URL path.
     Precondition: path is an unquoted url path"""
+    if "." not in path and "//" not in path and "\\" not in path:
+        # nothing to collapse
+        return path
     # replace backslashes
     # note: this is _against_ the specification (which would require
     # backslashes to be left alone, and finally quoted with '%5C')
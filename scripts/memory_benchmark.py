@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Report the memory used per queued URL and per URL checker object.
+
+Usage: $0 [number of URLs]
+"""
+import sys
+import tracemalloc
+
+import linkcheck.configuration
+import linkcheck.director
+from linkcheck.checker import get_pending_url, get_url_from, urlbase
+
+PARENT_URL = "http://www.example.com/docs/index.html"
+
+
+def get_links(num):
+    """Return num different relative links like found on pages."""
+    return ["page%d/index.html?id=%d#top" % (num % 100, num) for num in range(num)]
+
+
+def measure(make_objects, links):
+    """Return the allocated bytes per object made from the links."""
+    urlbase.join_url.cache_clear()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = make_objects(links)
+    # the cached joined URLs are no part of the objects
+    urlbase.join_url.cache_clear()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size / len(links)
+
+
+def main(args):
+    num = int(args[0]) if args else 10000
+    config = linkcheck.configuration.Configuration()
+    config["logger"] = config.logger_new("none")
+    aggregate = linkcheck.director.get_aggregate(config)
+    links = get_links(num)
+
+    def queue_links(links):
+        for link in links:
+            aggregate.urlqueue.put(
+                get_pending_url(link, 1, aggregate, parent_url=PARENT_URL)
+            )
+        return aggregate.urlqueue
+
+    def make_checkers(links):
+        return [
+            get_url_from(link, 1, aggregate, parent_url=PARENT_URL) for link in links
+        ]
+
+    print("URLs:", num)
+    print("bytes per queued URL: %d" % measure(queue_links, links))
+    print("bytes per URL checker object: %d" % measure(make_checkers, links))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
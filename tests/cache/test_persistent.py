@@ -0,0 +1,134 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test the persistent result cache.
+"""
+import datetime
+import os
+import pickle
+import tempfile
+import unittest
+
+from linkcheck.cache.persistent import PersistentResultCache
+from linkcheck.checker.urlbase import CompactUrlData, UrlDataOccurrence, urlDataAttr
+
+
+def get_result(url, valid):
+    data = dict.fromkeys(urlDataAttr, "")
+    data.update(
+        url=url,
+        cache_url=url,
+        valid=valid,
+        warnings=[("http-redirected", "Redirected")],
+        info=["Info"],
+        modified=datetime.datetime(2020, 1, 1, 12, 0),
+        size=42,
+    )
+    return CompactUrlData(data)
+
+
+class TestPersistentResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "results.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_cache(self, valid_ttl=1000, invalid_ttl=1000):
+        return PersistentResultCache(self.filename, valid_ttl, invalid_ttl, 100)
+
+    def test_store_load(self):
+        """
+        Test, that stored results are used by a new cache
+        """
+        cache = self.get_cache()
+        cache.add_result("http://example.com/", get_result("http://example.com/", True))
+        cache.add_result("http://example.org/", None)
+        cache.close()
+        cache = self.get_cache()
+        self.assertIsNone(cache.get_result("http://example.com/"))
+        self.assertIsNone(cache.get_stored_result("http://example.org/"))
+        result = cache.get_stored_result("http://example.com/")
+        self.assertEqual(result.url, "http://example.com/")
+        self.assertTrue(result.valid)
+        self.assertEqual(result.size, 42)
+        self.assertEqual(result.warnings, [("http-redirected", "Redirected")])
+        self.assertEqual(result.info, ["Info"])
+        self.assertEqual(result.modified, datetime.datetime(2020, 1, 1, 12, 0))
+        # the stored result is now cached in memory
+        self.assertIs(cache.get_result("http://example.com/"), result)
+        cache.close()
+
+    def test_ttl(self):
+        """
+        Test, that invalid results expire with their own time to live
+        """
+        cache = self.get_cache()
+        cache.add_result("http://example.com/", get_result("http://example.com/", True))
+        cache.add_result(
+            "http://example.net/", get_result("http://example.net/", False)
+        )
+        cache.close()
+        cache = self.get_cache(invalid_ttl=0)
+        self.assertIsNotNone(cache.get_stored_result("http://example.com/"))
+        self.assertIsNone(cache.get_stored_result("http://example.net/"))
+        cache.close()
+
+    def test_page_ttl(self):
+        """
+        Test, that pages stored for revalidation expire like valid results
+        """
+        url = "http://example.com/"
+        links = [["page.html", 1, 2, 0, "name", None]]
+        cache = self.get_cache()
+        cache.add_page(url, '"etag"', None, get_result(url, True), links)
+        cache.close()
+        cache = self.get_cache()
+        page = cache.get_page(url)
+        self.assertEqual(page.etag, '"etag"')
+        self.assertEqual(page.result.url, url)
+        self.assertEqual(page.links, links)
+        cache.close()
+        cache = self.get_cache(valid_ttl=0)
+        self.assertIsNone(cache.get_page(url))
+        num_pages = cache.connection.execute("SELECT COUNT(*) FROM pages").fetchone()
+        self.assertEqual(num_pages, (0,))
+        cache.close()
+
+
+class TestCompactUrlData(unittest.TestCase):
+    def test_shared(self):
+        result = get_result("".join(["http://example.com/", "a"]), True)
+        other = get_result("".join(["http://example.com/", "a"]), True)
+        self.assertIs(result.url, other.url)
+        self.assertRaises(AttributeError, setattr, result, "url", "x")
+        changed = result.replace(url="http://example.com/b")
+        self.assertEqual(changed.url, "http://example.com/b")
+        self.assertEqual(result.url, "http://example.com/a")
+        self.assertEqual(pickle.loads(pickle.dumps(result)).url, result.url)
+
+    def test_occurrence(self):
+        result = get_result("http://example.com/", True)
+        occurrence = UrlDataOccurrence(
+            result, parent_url="http://example.com/parent", base_ref="",
+            base_url="/", line=3, column=4, level=1, name="link",
+        )
+        self.assertEqual(occurrence.parent_url, "http://example.com/parent")
+        self.assertEqual(occurrence.line, 3)
+        self.assertEqual(occurrence.url, "http://example.com/")
+        self.assertEqual(occurrence.size, 42)
+        self.assertRaises(AttributeError, getattr, occurrence, "no_such_attr")
@@ -0,0 +1,121 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+Test the result cache.
+"""
+import unittest
+
+from linkcheck.cache.results import Document, ResultCache, get_size
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """
+        Test, that the least recently used entry is evicted
+        """
+        cache = ResultCache(2)
+        cache.add_result("a", "A")
+        cache.add_result("b", "B")
+        self.assertEqual(cache.get_result("a"), "A")
+        cache.add_result("c", "C")
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.has_result("b"))
+        self.assertTrue(cache.has_result("a"))
+        self.assertTrue(cache.has_result("c"))
+        self.assertEqual(cache.num_keys, 3)
+        # only get_result() counts hits and misses
+        self.assertEqual(cache.status(), (1, 0, 1))
+
+    def test_placeholder_kept(self):
+        """
+        Test, that placeholders are kept as seen keys without evicting
+        results, and are not evicted themselves
+        """
+        cache = ResultCache(1)
+        cache.add_result("a", "A")
+        cache.add_result("b", None)
+        self.assertTrue(cache.has_result("a"))
+        self.assertFalse(cache.has_result("b"))
+        cache.add_result("c", "C")
+        self.assertFalse(cache.mark_seen("b"))
+        self.assertEqual(cache.num_keys, 3)
+
+    def test_mark_seen(self):
+        """
+        Test, that keys stay seen after their results are evicted
+        """
+        cache = ResultCache(1)
+        self.assertTrue(cache.mark_seen("a"))
+        self.assertFalse(cache.mark_seen("a"))
+        cache.add_result("b", "B")
+        cache.add_result("c", "C")
+        self.assertFalse(cache.has_result("b"))
+        self.assertFalse(cache.mark_seen("b"))
+        self.assertTrue(cache.mark_seen(None))
+        self.assertTrue(cache.mark_seen(None))
+        self.assertEqual(cache.num_keys, 3)
+
+    def test_byte_budget(self):
+        """
+        Test, that entries are evicted when the byte budget is exceeded
+        """
+        size = get_size("a") + get_size("A" * 100)
+        cache = ResultCache(100, result_cache_bytes=2 * size)
+        for key in ("a", "b", "c"):
+            cache.add_result(key, key.upper() * 100)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.num_bytes, 2 * size)
+        self.assertEqual(cache.evictions, 1)
+        # an entry larger than the budget is kept until the next add
+        cache.add_result("d", "D" * 1000)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get_result("d"), "D" * 1000)
+
+    def test_document_budget(self):
+        """
+        Test, that documents count in the byte budget and are evicted
+        before results
+        """
+        document = Document("A" * 100, frozenset(["x" * 100]), True)
+        size = get_size("a") + get_size(document)
+        cache = ResultCache(100, result_cache_bytes=2 * size)
+        cache.add_result("a", "A")
+        for url in ("b", "c", "d"):
+            cache.add_document(url, document)
+        self.assertLessEqual(cache.num_bytes, 2 * size)
+        self.assertIsNone(cache.get_document("b"))
+        self.assertEqual(cache.get_document("d"), document)
+        self.assertEqual(cache.get_result("a"), "A")
+        self.assertEqual(cache.evictions, 0)
+
+    def test_get_size(self):
+        """
+        Test, that sizes of lists include their items
+        """
+        self.assertGreater(get_size(["x" * 100]), get_size([]) + 100)
+
+    def test_listener(self):
+        """
+        Test, that listeners are only called for non-empty results
+        """
+        keys = []
+        cache = ResultCache(10)
+        cache.add_listener(keys.append)
+        cache.add_result("a", None)
+        cache.add_result("a", "A")
+        cache.add_result(None, "B")
+        self.assertEqual(keys, ["a"])
@@ -14,15 +14,28 @@
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
+import os
 import unittest
 from collections import namedtuple
 
 import linkcheck.configuration
 from linkcheck.cache.results import ResultCache
-from linkcheck.cache.urlqueue import Empty, NUM_PUTS_CLEANUP, UrlQueue
+from linkcheck.checker import PendingUrl
+from linkcheck.cache.urlqueue import Empty, HostUrlQueue, UrlQueue
 
 UrlData = namedtuple("UrlData", "url cache_url aggregate has_result")
 Aggregate = namedtuple("Aggregate", "result_cache")
+HostUrlData = namedtuple("HostUrlData", "url cache_url aggregate has_result host_key")
+
+
+class DueScheduler:
+    """Host scheduler where the given URLs are due."""
+
+    def __init__(self, due_urls):
+        self.due_urls = due_urls
+
+    def is_due(self, url_data):
+        return url_data.url in self.due_urls
 
 
 class TestUrlQueue(unittest.TestCase):
@@ -131,14 +144,13 @@ class TestUrlQueue(unittest.TestCase):
         with self.assertRaises(Empty):
             self.assertEqual(self.urlqueue.get(0), None)
 
-    def test_cleanup(self):
+    def test_promote(self):
         """
-        Test, that after adding NUM_PUTS_CLEANUP elements
-        the queue is cleaned up.
-        Whether the cleanup is was performed is determined,
-        that element in cache is now on top of the queue.
+        Test, that a queued element is moved to the top of the queue
+        as soon as its result is stored in the cache.
         """
-        for i in range(NUM_PUTS_CLEANUP - 1):
+        self.result_cache.add_listener(self.urlqueue.promote)
+        for i in range(10):
             self.urlqueue.put(
                 UrlData(
                     url="Bar",
@@ -147,14 +159,242 @@ class TestUrlQueue(unittest.TestCase):
                     has_result=False,
                 ),
             )
-        self.assertEqual(self.urlqueue.qsize(), NUM_PUTS_CLEANUP - 1)
+        self.assertEqual(self.urlqueue.qsize(), 10)
+        self.result_cache.add_result("Bar address 2", "asdf")
+        self.assertEqual(self.urlqueue.qsize(), 10)
+        self.assertEqual(self.urlqueue.get().cache_url, "Bar address 2")
+        cache_urls = [self.urlqueue.get(0).cache_url for i in range(9)]
+        self.assertEqual(cache_urls, [
+            "Bar address %s" % i for i in range(10) if i != 2
+        ])
+        self.assertTrue(self.urlqueue.empty())
+
+    def test_get_due_host(self):
+        """
+        Test, that get() prefers URLs whose host is due.
+        """
+        urlqueue = UrlQueue(host_scheduler=DueScheduler({"Foo", "Baz"}))
         urldata = UrlData(
             url="Bar",
-            cache_url="Bar address",
+            cache_url="Bar",
+            aggregate=Aggregate(result_cache=self.result_cache),
+            has_result=False,
+        )
+        urlqueue.put(urldata)
+        urlqueue.put(self.urldata1)
+        urlqueue.put(
+            UrlData(
+                url="Baz",
+                cache_url="Baz",
+                aggregate=Aggregate(result_cache=self.result_cache),
+                has_result=False,
+            )
+        )
+        # self.urldata1 has a result and is put at the beginning
+        self.assertEqual(urlqueue.get(), self.urldata1)
+        self.assertEqual(urlqueue.get().url, "Baz")
+        # no URL is due, so the first one is returned
+        self.assertEqual(urlqueue.get().url, "Bar")
+
+    def test_requeue(self):
+        """
+        Test, that a requeued element is checked again and counts as
+        finished task only once.
+        """
+        urldata = UrlData(
+            url="Bar",
+            cache_url="Bar",
             aggregate=Aggregate(result_cache=self.result_cache),
             has_result=False,
         )
-        self.result_cache.add_result("Bar address 2", "asdf")
         self.urlqueue.put(urldata)
-        self.assertEqual(self.urlqueue.qsize(), NUM_PUTS_CLEANUP)
-        self.assertEqual(self.urlqueue.get().cache_url, "Bar address 2")
+        self.assertEqual(self.urlqueue.get(), urldata)
+        self.urlqueue.requeue(urldata, 0.2)
+        self.urlqueue.task_done(urldata)
+        self.assertEqual(self.urlqueue.status(), (0, 0, 1))
+        with self.assertRaises(Empty):
+            self.urlqueue.get(0)
+        self.assertEqual(self.urlqueue.get(1), urldata)
+        self.urlqueue.task_done(urldata)
+        self.urlqueue.join(timeout=0)
+        self.assertEqual(self.urlqueue.status(), (1, 0, 0))
+
+
+class TestSpillUrlQueue(unittest.TestCase):
+    def setUp(self):
+        config = linkcheck.configuration.Configuration()
+        self.result_cache = ResultCache(config["resultcachesize"])
+        self.aggregate = Aggregate(result_cache=self.result_cache)
+
+    def get_pending_url(self, path):
+        url = "http://example.org%s" % path
+        return PendingUrl(
+            url, 1, self.aggregate, None, None, 1, 2, 0, "", None, None, url,
+            "http", "example.org",
+        )
+
+    def test_spill(self):
+        """
+        Test, that pending links beyond the memory size are spilled
+        and read back in order
+        """
+        urlqueue = UrlQueue(memory_size=2)
+        paths = ["/%d" % i for i in range(5)]
+        for path in paths:
+            urlqueue.put(self.get_pending_url(path))
+        self.assertEqual(urlqueue.qsize(), 5)
+        self.assertEqual(len(urlqueue.queue), 2)
+        self.assertEqual(len(urlqueue.spill_file), 3)
+        # spilled links are known to the result cache
+        urlqueue.put(self.get_pending_url("/4"))
+        self.assertEqual(urlqueue.qsize(), 5)
+        urls = []
+        for path in paths:
+            url_data = urlqueue.get(0)
+            self.assertIs(url_data.aggregate, self.aggregate)
+            self.assertEqual((url_data.line, url_data.column), (1, 2))
+            urls.append(url_data.url)
+        self.assertEqual(urls, ["http://example.org%s" % path for path in paths])
+        self.assertTrue(urlqueue.empty())
+        self.assertEqual(len(urlqueue.spill_file), 0)
+
+    def test_spill_order(self):
+        """
+        Test, that links put while links are spilled are queued after them
+        """
+        urlqueue = HostUrlQueue(memory_size=1)
+        urlqueue.put(self.get_pending_url("/1"))
+        urlqueue.put(self.get_pending_url("/2"))
+        self.assertEqual(urlqueue.get(0).url, "http://example.org/1")
+        urlqueue.put(self.get_pending_url("/3"))
+        self.assertEqual(urlqueue.get(0).url, "http://example.org/2")
+        self.assertEqual(urlqueue.get(0).url, "http://example.org/3")
+        self.assertTrue(urlqueue.empty())
+
+    def test_compact(self):
+        """
+        Test, that read links are removed from the spill file
+        """
+        urlqueue = UrlQueue(memory_size=1)
+        urlqueue.spill_file.compact_bytes = 1
+        for i in range(4):
+            urlqueue.put(self.get_pending_url("/%d" % i))
+        spill_file = urlqueue.spill_file
+        size = spill_file.file.seek(0, os.SEEK_END)
+        urls = [urlqueue.get(0).url for dummy in range(3)]
+        # the unread link is at the start of the new file
+        self.assertEqual(spill_file.read_pos, 0)
+        self.assertLess(spill_file.file.seek(0, os.SEEK_END), size)
+        urlqueue.put(self.get_pending_url("/4"))
+        urls.extend(urlqueue.get(0).url for dummy in range(2))
+        self.assertEqual(urls, ["http://example.org/%d" % i for i in range(5)])
+        self.assertTrue(urlqueue.empty())
+
+    def test_shutdown(self):
+        """
+        Test, that shutdown removes the spilled links
+        """
+        urlqueue = UrlQueue(memory_size=1)
+        urlqueue.put(self.get_pending_url("/1"))
+        urlqueue.put(self.get_pending_url("/2"))
+        urlqueue.do_shutdown()
+        self.assertTrue(urlqueue.empty())
+        self.assertEqual(len(urlqueue.spill_file), 0)
+
+
+class TestHostUrlQueue(unittest.TestCase):
+    def setUp(self):
+        config = linkcheck.configuration.Configuration()
+        self.result_cache = ResultCache(config["resultcachesize"])
+        self.urlqueue = HostUrlQueue()
+
+    def get_url_data(self, host, path, has_result=False):
+        url = f"http://{host}{path}"
+        return HostUrlData(
+            url=url,
+            cache_url=url,
+            aggregate=Aggregate(result_cache=self.result_cache),
+            has_result=has_result,
+            host_key=host,
+        )
+
+    def test_round_robin(self):
+        """
+        Test, that URLs of different hosts are dispatched in turn
+        """
+        for path in ("/1", "/2", "/3"):
+            self.urlqueue.put(self.get_url_data("a.example", path))
+        self.urlqueue.put(self.get_url_data("b.example", "/1"))
+        self.urlqueue.put(self.get_url_data("c.example", "/1"))
+        self.assertEqual(self.urlqueue.qsize(), 5)
+        urls = [self.urlqueue.get(0).url for i in range(5)]
+        self.assertEqual(urls, [
+            "http://a.example/1",
+            "http://b.example/1",
+            "http://c.example/1",
+            "http://a.example/2",
+            "http://a.example/3",
+        ])
+        self.assertTrue(self.urlqueue.empty())
+        with self.assertRaises(Empty):
+            self.urlqueue.get(0)
+
+    def test_has_result_first(self):
+        """
+        Test, that URLs with result are dispatched first
+        """
+        self.urlqueue.put(self.get_url_data("a.example", "/1"))
+        url_data = self.get_url_data("b.example", "/1", has_result=True)
+        self.urlqueue.put(url_data)
+        self.assertEqual(self.urlqueue.get(0), url_data)
+
+    def test_promote(self):
+        """
+        Test, that URLs are dispatched first once their result is known
+        """
+        self.result_cache.add_listener(self.urlqueue.promote)
+        self.urlqueue.put(self.get_url_data("a.example", "/1"))
+        self.urlqueue.put(self.get_url_data("b.example", "/1"))
+        self.urlqueue.put(self.get_url_data("b.example", "/2"))
+        self.result_cache.add_result("http://b.example/1", "asdf")
+        self.assertEqual(self.urlqueue.qsize(), 3)
+        urls = [self.urlqueue.get(0).url for i in range(3)]
+        self.assertEqual(urls, [
+            "http://b.example/1",
+            "http://a.example/1",
+            "http://b.example/2",
+        ])
+        self.assertTrue(self.urlqueue.empty())
+
+    def test_due_host(self):
+        """
+        Test, that hosts which are due are preferred
+        """
+        self.urlqueue = HostUrlQueue(
+            host_scheduler=DueScheduler({"http://b.example/1"})
+        )
+        self.urlqueue.put(self.get_url_data("a.example", "/1"))
+        self.urlqueue.put(self.get_url_data("b.example", "/1"))
+        self.assertEqual(self.urlqueue.get(0).url, "http://b.example/1")
+        self.assertEqual(self.urlqueue.get(0).url, "http://a.example/1")
+
+    def test_task_done_join(self):
+        """
+        Test, that join() returns after all tasks are done
+        """
+        self.urlqueue.put(self.get_url_data("a.example", "/1"))
+        self.urlqueue.put(self.get_url_data("b.example", "/1"))
+        for i in range(2):
+            self.urlqueue.task_done(self.urlqueue.get(0))
+        self.urlqueue.join(timeout=1)
+        self.assertEqual(self.urlqueue.status(), (2, 0, 0))
+
+    def test_shutdown(self):
+        """
+        Test, that shutdown removes all queued URLs
+        """
+        self.urlqueue.put(self.get_url_data("a.example", "/1"))
+        self.urlqueue.put(self.get_url_data("b.example", "/1"))
+        self.urlqueue.do_shutdown()
+        self.assertTrue(self.urlqueue.empty())
+        self.urlqueue.join(timeout=1)
@@ -17,7 +17,17 @@
 Test html anchor parsing and checking.
 """
 from . import LinkCheckTest
-from .httpserver import HttpServerTest
+from .httpserver import HttpServerTest, NoQueryHttpRequestHandler
+
+
+class CountingHttpRequestHandler(NoQueryHttpRequestHandler):
+    """Handler remembering the paths of GET requests."""
+
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        super().do_GET()
 
 
 class TestFileAnchor(LinkCheckTest):
@@ -47,9 +57,18 @@ class TestHttpAnchor(HttpServerTest):
     Test checking of HTML pages containing links to anchors served over http.
     """
 
+    def __init__(self, methodName="runTest"):
+        super().__init__(methodName=methodName)
+        self.handler = CountingHttpRequestHandler
+
     def test_anchor_http(self):
         confargs = dict(enabledplugins=["AnchorCheck"], recursionlevel=1)
+        del self.handler.paths[:]
         self.file_test("http_anchor.html", confargs=confargs)
+        # the page is downloaded once for the page and once for the first
+        # anchor, the second anchor is checked with the cached anchors
+        path = "/tests/checker/data/http_anchor.html"
+        self.assertEqual(self.handler.paths.count(path), 2)
 
 
 class TestEncodedAnchors(HttpServerTest):
@@ -0,0 +1,100 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test checking URLs in an asyncio event loop.
+"""
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+from linkcheck import asynchttp
+from linkcheck.cache.results import ResultCache
+from linkcheck.cache.urlqueue import UrlQueue
+from linkcheck.director.checker import AsyncChecker
+from . import test_http, test_http_head, test_http_redirect, test_http_retry
+from . import test_http_robots, test_https, test_https_redirect
+
+
+UrlData = namedtuple("UrlData", "url cache_url aggregate has_result")
+Aggregate = namedtuple("Aggregate", "result_cache")
+
+
+class AsyncCheckMixin:
+    """Check the URLs of the tests in an asyncio event loop."""
+
+    def direct(self, url, resultlines, confargs=None, **kwargs):
+        confargs = dict(confargs or {}, threads=2, asyncchecks=10)
+        super().direct(url, resultlines, confargs=confargs, **kwargs)
+
+    def file_test(self, filename, confargs=None):
+        confargs = dict(confargs or {}, threads=2, asyncchecks=10)
+        super().file_test(filename, confargs=confargs)
+
+
+class TestHttpAsync(AsyncCheckMixin, test_http.TestHttp):
+    """Test http:// link checking in an asyncio event loop."""
+
+    def test_async_requests(self):
+        with patch.object(asynchttp, "send", wraps=asynchttp.send) as send:
+            self._test_status(200)
+        self.assertEqual(send.call_count, 1)
+
+
+class TestHttpHeadAsync(AsyncCheckMixin, test_http_head.TestHttpHead):
+    """Test checking http URLs with HEAD requests in an asyncio event loop."""
+
+
+class TestHttpRedirectAsync(AsyncCheckMixin, test_http_redirect.TestHttpRedirect):
+    """Test http:// link redirection checking in an asyncio event loop."""
+
+
+class TestHttpRetryAsync(AsyncCheckMixin, test_http_retry.TestHttpRetry):
+    """Test checking rate limited http URLs again in an asyncio event loop."""
+
+
+class TestHttpRobotsAsync(AsyncCheckMixin, test_http_robots.TestHttpRobots):
+    """Test robots.txt handling in an asyncio event loop."""
+
+
+class TestHttpsAsync(AsyncCheckMixin, test_https.TestHttps):
+    """Test https: link checking in an asyncio event loop."""
+
+
+class TestHttpsRedirectAsync(
+    AsyncCheckMixin, test_https_redirect.TestHttpsRedirect
+):
+    """Test https:// link redirection checking in an asyncio event loop."""
+
+
+class TestAsyncCheckerStop(unittest.TestCase):
+    def test_url_got_after_stop(self):
+        """
+        Test, that an URL got by the waiting thread after the event loop
+        ended is marked as done
+        """
+        urlqueue = UrlQueue()
+        checker = AsyncChecker(urlqueue, None, lambda: None, 10, 1)
+        checker.start()
+        # the waiting thread is blocked in urlqueue.get() when stopping
+        while not checker.loop:
+            checker.join(0.01)
+        checker.join(0.1)
+        checker.stop()
+        checker.join()
+        aggregate = Aggregate(result_cache=ResultCache(10))
+        urlqueue.put(UrlData("Foo", "Foo", aggregate, False))
+        urlqueue.join(timeout=2)
+        self.assertEqual(urlqueue.status(), (1, 0, 0))
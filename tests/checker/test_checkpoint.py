@@ -0,0 +1,111 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test checkpoints and resuming of interrupted checks.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+
+import linkcheck.director
+import linkcheck.robotparser2
+from linkcheck.director import checkpoint
+from . import LinkCheckTest, get_test_aggregate, get_url_from
+
+
+class TestCheckpoint(LinkCheckTest):
+    """Test writing and resuming checkpoints."""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "checkpoint.sqlite")
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def check(self, url, resultlines, **confargs):
+        """Check url with a checkpoint file and return the test logger."""
+        confargs["checkpointfile"] = self.filename
+        aggregate = get_test_aggregate(confargs, {"expected": resultlines})
+        aggregate.urlqueue.put(get_url_from(url, 0, aggregate, extern=(0, 0)))
+        linkcheck.director.check_urls(aggregate)
+        logger = aggregate.config["logger"]
+        self.assertEqual(logger.diff, [])
+        return logger
+
+    def test_resume(self):
+        url = self.get_url("file.html")
+        resultlines = self.get_resultlines("file.html")
+        logger = self.check(url, resultlines)
+        self.assertEqual(logger.stats.number, 2)
+        connection = sqlite3.connect(self.filename)
+        num_urls = connection.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        self.assertEqual(num_urls, 0)
+        keys = [row[0] for row in connection.execute("SELECT key FROM results")]
+        self.assertEqual(len(keys), 1)
+        self.assertTrue(keys[0].endswith("/file.html"))
+        # pretend the check was interrupted before the javascript link
+        # was checked
+        key = "javascript:loadthis()"
+        fields = [key, 1, keys[0], None, 2, 1, 0, "javascript url", None, None]
+        connection.execute(
+            "INSERT INTO urls VALUES (?, ?)", (key, json.dumps(fields))
+        )
+        connection.execute(
+            "UPDATE state SET data = ? WHERE name = 'logger0'",
+            (json.dumps(dict(number=1)),),
+        )
+        connection.commit()
+        connection.close()
+        # only the unfinished URL is checked again
+        logger = self.check(url, resultlines[5:], resume=True)
+        self.assertEqual(logger.stats.number, 2)
+        # without resuming, the checkpoint is discarded
+        logger = self.check(url, resultlines)
+        self.assertEqual(logger.stats.number, 2)
+
+    def test_robots_txt(self):
+        rp = linkcheck.robotparser2.RobotFileParser(None, url="http://a/robots.txt")
+        rp.parse(["User-agent: *", "Disallow: /private"])
+        text = checkpoint.dump_robots_txt(rp)
+        rp = checkpoint.load_robots_txt("http://a/robots.txt", text)
+        self.assertFalse(rp.can_fetch("LinkChecker", "http://a/private/x"))
+        self.assertTrue(rp.can_fetch("LinkChecker", "http://a/public"))
+        rp = linkcheck.robotparser2.RobotFileParser(None, url="http://a/robots.txt")
+        rp.disallow_all = True
+        rp = checkpoint.load_robots_txt("", checkpoint.dump_robots_txt(rp))
+        self.assertFalse(rp.can_fetch("LinkChecker", "http://a/"))
+
+    def test_foreign_database(self):
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE results (key TEXT PRIMARY KEY, data TEXT)")
+        connection.execute("INSERT INTO results VALUES ('a', 'b')")
+        connection.commit()
+        connection.close()
+        self.assertRaises(
+            linkcheck.LinkCheckerError, checkpoint.Checkpoint, self.filename
+        )
+        connection = sqlite3.connect(self.filename)
+        rows = connection.execute("SELECT * FROM results").fetchall()
+        connection.close()
+        self.assertEqual(rows, [("a", "b")])
+        # checkpoint files are used again
+        filename = os.path.join(self.tmpdir.name, "other.sqlite")
+        checkpoint.Checkpoint(filename).close()
+        checkpoint.Checkpoint(filename).close()
@@ -22,7 +22,6 @@ import unittest
 
 import linkcheck.configuration
 import linkcheck.director
-from linkcheck.htmlutil.htmlsoup import make_soup
 from . import get_url_from
 
 from . import LinkCheckTest
@@ -42,6 +41,18 @@ class TestHttpMetaRobots(HttpServerTest):
         ]
         self.direct(url, resultlines, recursionlevel=1)
 
+    def test_http_meta_robots_streamlinks(self):
+        url = self.get_url("norobots.html")
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "valid",
+        ]
+        self.direct(
+            url, resultlines, recursionlevel=1, confargs=dict(streamlinks=True)
+        )
+
 
 class TestFileMetaRobots(LinkCheckTest):
     """Test <meta name="robots" content="nofollow"> from a file."""
@@ -74,13 +85,15 @@ class TestMetaRobotsVariants(unittest.TestCase):
         url_data = get_url_from(url, 0, aggregate)
         url_data.content_type = "text/html"
 
-        url_data.soup = make_soup('<meta name="robots" content="nofollow">')
+        url_data.text = '<meta name="robots" content="nofollow">'
         self.assertFalse(url_data.content_allows_robots())
 
-        url_data.soup = make_soup(
+        url_data.free_content()
+        url_data.text = (
             '<meta name="robots" content="nocache, Nofollow, noimageindex">'
         )
         self.assertFalse(url_data.content_allows_robots())
 
-        url_data.soup = make_soup('<meta name="robots" content="noindex, follow">')
+        url_data.free_content()
+        url_data.text = '<meta name="robots" content="noindex, follow">'
         self.assertTrue(url_data.content_allows_robots())
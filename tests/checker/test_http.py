@@ -50,6 +50,27 @@ class TestHttp(HttpServerTest):
         self.file_test("http.xhtml", confargs=confargs)
         self.file_test("http_invalid_host.html", confargs=confargs)
 
+    def test_html_queuesize(self):
+        confargs = dict(recursionlevel=1, queuesize=1)
+        self.file_test("http_file.html", confargs=confargs)
+        self.file_test("http.xhtml", confargs=confargs)
+
+    def test_html_adaptivehostrate(self):
+        confargs = dict(recursionlevel=1, adaptivehostrate=True)
+        self.file_test("http_file.html", confargs=confargs)
+        self.file_test("http.xhtml", confargs=confargs)
+
+    def test_html_maxconnections(self):
+        confargs = dict(recursionlevel=1, maxconnectionshttp=2, maxconnectionsperhost=1)
+        self.file_test("http_file.html", confargs=confargs)
+        self.file_test("http.xhtml", confargs=confargs)
+
+    def test_html_streamlinks(self):
+        confargs = dict(recursionlevel=1, streamlinks=True)
+        self.file_test("http_file.html", confargs=confargs)
+        self.file_test("http_utf8.html", confargs=confargs)
+        self.file_test("http.xhtml", confargs=confargs)
+
     def test_status(self):
         for status in sorted(self.handler.responses.keys()):
             self._test_status(status)
@@ -0,0 +1,146 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test checking http URLs with HEAD requests.
+"""
+from linkcheck import get_link_pat
+
+from .httpserver import HttpServerTest, NoQueryHttpRequestHandler
+
+
+class HeadHttpRequestHandler(NoQueryHttpRequestHandler):
+    """Handler recording the request methods of status paths, answering
+    HEAD requests of /nohead/ paths with 405 Method Not Allowed and
+    redirecting /redirect/ paths to the rest of the path."""
+
+    # list of (method, path) tuples
+    requests = []
+
+    def redirect(self):
+        self.send_response(302)
+        self.send_header("Location", self.path[len("/redirect"):])
+        self.end_headers()
+
+    def do_GET(self):
+        if "status/" in self.path:
+            self.requests.append(("GET", self.path))
+        if self.path.startswith("/redirect/"):
+            self.redirect()
+        else:
+            super().do_GET()
+
+    def do_HEAD(self):
+        if "status/" in self.path:
+            self.requests.append(("HEAD", self.path))
+        if self.path.startswith("/redirect/"):
+            self.redirect()
+        elif "nohead/" in self.path:
+            self.send_response(405)
+            self.end_headers()
+        else:
+            super().do_HEAD()
+
+
+class TestHttpHead(HttpServerTest):
+    """Test checking http URLs with HEAD requests."""
+
+    def __init__(self, methodName="runTest"):
+        super().__init__(methodName=methodName)
+        self.handler = HeadHttpRequestHandler
+
+    def setUp(self):
+        super().setUp()
+        del self.handler.requests[:]
+
+    def get_resultlines(self, url, result):
+        return [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            result,
+        ]
+
+    def test_head(self):
+        url = "http://localhost:%d/status/200" % self.port
+        self.direct(
+            url, self.get_resultlines(url, "valid"), confargs=dict(headfirst=True)
+        )
+        self.assertEqual(self.handler.requests, [("HEAD", "/status/200")])
+
+    def test_head_error(self):
+        url = "http://localhost:%d/status/404" % self.port
+        self.direct(
+            url, self.get_resultlines(url, "error"), confargs=dict(headfirst=True)
+        )
+        self.assertEqual(
+            self.handler.requests, [("HEAD", "/status/404"), ("GET", "/status/404")]
+        )
+
+    def test_head_not_allowed(self):
+        url = "http://localhost:%d/nohead/status/200" % self.port
+        self.direct(
+            url, self.get_resultlines(url, "valid"), confargs=dict(headfirst=True)
+        )
+        self.assertEqual(
+            self.handler.requests,
+            [("HEAD", "/nohead/status/200"), ("GET", "/nohead/status/200")],
+        )
+
+    def test_content_needed(self):
+        url = "http://localhost:%d/status/200" % self.port
+        resultlines = self.get_resultlines(url, "valid")
+        resultlines.insert(
+            3,
+            "warning The URL with content type 'application/octet-stream' "
+            "is not parseable.",
+        )
+        self.direct(
+            url,
+            resultlines,
+            recursionlevel=1,
+            confargs=dict(headfirst=True),
+        )
+        self.assertEqual(self.handler.requests, [("GET", "/status/200")])
+
+    def test_redirect_content_needed(self):
+        # the extern URL is redirected to an intern URL which is parsed
+        url = "http://localhost:%d/redirect/status/200" % self.port
+        realurl = "http://localhost:%d/status/200" % self.port
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % realurl,
+            "warning Redirected to `%s' status: 302 Found." % realurl,
+            "warning The URL with content type 'application/octet-stream' "
+            "is not parseable.",
+            "valid",
+        ]
+        confargs = dict(
+            headfirst=True,
+            externlinks=[get_link_pat("^%s" % url)],
+            internlinks=[get_link_pat("^%s" % realurl)],
+        )
+        self.direct(url, resultlines, recursionlevel=1, confargs=confargs)
+        self.assertEqual(
+            self.handler.requests,
+            [("HEAD", "/redirect/status/200"), ("HEAD", "/status/200"),
+             ("GET", "/status/200")],
+        )
+
+    def test_get(self):
+        url = "http://localhost:%d/status/200" % self.port
+        self.direct(url, self.get_resultlines(url, "valid"))
+        self.assertEqual(self.handler.requests, [("GET", "/status/200")])
@@ -16,6 +16,9 @@
 """
 Test http checking.
 """
+from unittest.mock import patch
+
+from linkcheck.director.scheduler import HostScheduler
 from tests import need_network
 from .httpserver import HttpServerTest, CookieRedirectHttpRequestHandler
 
@@ -35,6 +38,14 @@ class TestHttpRedirect(HttpServerTest):
         self.redirect4()
         self.redirect5()
 
+    def test_redirect_throttled(self):
+        # the redirected request waits for its host, too
+        with patch.object(
+            HostScheduler, "_reserve", autospec=True, side_effect=HostScheduler._reserve
+        ) as reserve:
+            self.redirect1()
+        self.assertEqual(reserve.call_count, 2)
+
     def redirect1(self):
         url = "http://localhost:%d/redirect1" % self.port
         nurl = url
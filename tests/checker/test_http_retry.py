@@ -0,0 +1,90 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test checking rate limited http URLs again.
+"""
+import collections
+
+from .httpserver import HttpServerTest, NoQueryHttpRequestHandler
+
+
+class RetryHttpRequestHandler(NoQueryHttpRequestHandler):
+    """Handler answering requests of /retry/<num> with 429 Too Many
+    Requests for the first num requests."""
+
+    # mapping {path -> number of requests}
+    requests = collections.Counter()
+
+    def do_GET(self):
+        """Send 429 or 200 for retry paths."""
+        self.remove_path_query()
+        if "retry/" in self.path:
+            self.requests[self.path] += 1
+            if self.requests[self.path] <= int(self.path.rsplit("/", 1)[1]):
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+            else:
+                self.send_response(200)
+            self.end_headers()
+        else:
+            super().do_GET()
+
+
+class TestHttpRetry(HttpServerTest):
+    """Test checking rate limited http URLs again."""
+
+    def __init__(self, methodName="runTest"):
+        super().__init__(methodName=methodName)
+        self.handler = RetryHttpRequestHandler
+
+    def setUp(self):
+        super().setUp()
+        self.handler.requests.clear()
+
+    def test_retry(self):
+        url = "http://localhost:%d/retry/2" % self.port
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "valid",
+        ]
+        self.direct(url, resultlines, confargs=dict(maxretries=2))
+        self.assertEqual(self.handler.requests["/retry/2"], 3)
+
+    def test_retry_exceeded(self):
+        url = "http://localhost:%d/retry/3" % self.port
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "warning Rate limited (Retry-After: 0)",
+            "valid",
+        ]
+        self.direct(url, resultlines, confargs=dict(maxretries=1))
+        self.assertEqual(self.handler.requests["/retry/3"], 2)
+
+    def test_retry_disabled(self):
+        url = "http://localhost:%d/retry/1" % self.port
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "warning Rate limited (Retry-After: 0)",
+            "valid",
+        ]
+        self.direct(url, resultlines)
+        self.assertEqual(self.handler.requests["/retry/1"], 1)
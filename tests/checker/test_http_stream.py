@@ -0,0 +1,60 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test queueing the links of http pages while downloading them.
+"""
+from .httpserver import HttpServerTest, NoQueryHttpRequestHandler
+
+# maximum parse size in the tests
+MaxParseBytes = 32 * 1024
+
+
+class NoLengthHttpRequestHandler(NoQueryHttpRequestHandler):
+    """Handler sending /nolength/ pages without Content-Length header.
+    The link to a.html is at the start of the page, which is larger than
+    the maximum parse size."""
+
+    def do_GET(self):
+        if "nolength/" not in self.path:
+            super().do_GET()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(
+            b'<html><head><title>T</title></head><body><a href="a.html">a</a>'
+        )
+        self.wfile.write(b"<!-- %s -->" % (b"x" * 2 * MaxParseBytes))
+
+
+class TestHttpStream(HttpServerTest):
+    """Test queueing the links of http pages while downloading them."""
+
+    def __init__(self, methodName="runTest"):
+        super().__init__(methodName=methodName)
+        self.handler = NoLengthHttpRequestHandler
+
+    def test_oversized_without_length(self):
+        url = "http://localhost:%d/nolength/page.html" % self.port
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "valid",
+        ]
+        for streamlinks in (False, True):
+            confargs = dict(maxfilesizeparse=MaxParseBytes, streamlinks=streamlinks)
+            self.direct(url, resultlines, recursionlevel=1, confargs=confargs)
@@ -0,0 +1,83 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test queueing of pending links.
+"""
+import linkcheck.configuration
+import linkcheck.director
+from linkcheck.checker import PendingUrl, get_pending_url
+from linkcheck.director.checker import get_url_data
+from .__init__ import LinkCheckTest, get_url_from
+
+
+class TestPendingUrl(LinkCheckTest):
+    """Test pending link records."""
+
+    def setUp(self):
+        super().setUp()
+        config = linkcheck.configuration.Configuration()
+        self.aggregate = linkcheck.director.get_aggregate(config)
+
+    def get_pending_url(self, url):
+        return get_pending_url(
+            url, 1, self.aggregate, parent_url="http://example.org/dir/"
+        )
+
+    def test_cache_url(self):
+        pending_url = self.get_pending_url(" page.html#anchor")
+        self.assertIsInstance(pending_url, PendingUrl)
+        self.assertEqual(pending_url.cache_url, "http://example.org/dir/page.html")
+        self.assertEqual(pending_url.scheme, "http")
+        self.assertEqual(pending_url.host_key, "example.org")
+        url_data = pending_url.get_url_data()
+        self.assertEqual(url_data.cache_url, pending_url.cache_url)
+        self.assertEqual(url_data.parent_url, "http://example.org/dir/")
+        self.assertEqual(url_data.recursion_level, 1)
+
+    def test_host_key(self):
+        pending_url = self.get_pending_url("http://user@EXAMPLE.org:80/")
+        url_data = pending_url.get_url_data()
+        self.assertEqual(pending_url.host_key, "example.org")
+        self.assertEqual(url_data.host_key, "example.org")
+        pending_url = self.get_pending_url("https://example.org:8443/")
+        self.assertEqual(pending_url.host_key, "example.org:8443")
+        self.assertEqual(pending_url.get_url_data().host_key, "example.org:8443")
+
+    def test_invalid_url(self):
+        url_data = self.get_pending_url("http://example.org]")
+        self.assertNotIsInstance(url_data, PendingUrl)
+        self.assertTrue(url_data.has_result)
+
+    def test_duplicates(self):
+        urlqueue = self.aggregate.urlqueue
+        url = "http://example.org/dir/page.html"
+        urlqueue.put(get_url_from(url, 0, self.aggregate))
+        # same cache key as the queued URL
+        urlqueue.put(self.get_pending_url("page.html#anchor"))
+        self.assertEqual(urlqueue.qsize(), 1)
+        # different cache key until the URL is normed
+        duplicate = self.get_pending_url("http://EXAMPLE.org/dir/page.html")
+        urlqueue.put(duplicate)
+        urlqueue.put(self.get_pending_url("other.html"))
+        self.assertEqual(urlqueue.qsize(), 3)
+        urlqueue.max_allowed_urls = 10
+        urlqueue.get(0)
+        self.assertIsNone(get_url_data(urlqueue.get(0)))
+        # the duplicate is not counted and its approximated key is forgotten
+        self.assertEqual(urlqueue.max_allowed_urls, 11)
+        self.assertTrue(self.aggregate.result_cache.mark_seen(duplicate.cache_url))
+        url_data = get_url_data(urlqueue.get(0))
+        self.assertEqual(url_data.url, "http://example.org/dir/other.html")
@@ -0,0 +1,63 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test checking URLs in worker processes.
+"""
+import os
+import tempfile
+
+from .httpserver import HttpServerTest
+
+
+class TestProcesses(HttpServerTest):
+    """Test checking URLs in worker processes."""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def test_html(self):
+        confargs = dict(recursionlevel=1, processes=2, threads=2)
+        self.file_test("http_file.html", confargs=confargs)
+        self.file_test("http_utf8.html", confargs=confargs)
+        self.file_test("http.xhtml", confargs=confargs)
+
+    def test_revalidate(self):
+        url = self.get_url("http_file.html")
+        confargs = dict(
+            resultcachefile=os.path.join(self.tmpdir.name, "results.sqlite"),
+            revalidate=True,
+            processes=2,
+            threads=2,
+        )
+        resultlines = [
+            "url %s" % url,
+            "cache key %s" % url,
+            "real url %s" % url,
+            "valid",
+            "url file:///example/file",
+            "cache key file:///example/file",
+            "real url file:///example/file",
+            "name local file",
+            "error",
+        ]
+        self.direct(url, resultlines, recursionlevel=1, confargs=dict(confargs))
+        resultlines.insert(3, "info Content not modified since last check.")
+        self.direct(url, resultlines, recursionlevel=1, confargs=dict(confargs))
@@ -0,0 +1,48 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test the slots of URL checker objects.
+"""
+import linkcheck.configuration
+import linkcheck.director
+from linkcheck.checker import (  # noqa: F401
+    dnsurl, fileurl, ftpurl, httpurl, ignoreurl, itmsservicesurl,
+    mailtourl, unknownurl, urlbase,
+)
+
+from . import get_url_from
+from .. import TestBase
+
+
+class TestSlots(TestBase):
+    """Test that URL objects store their attributes in slots."""
+
+    def test_no_dict(self):
+        classes = [urlbase.UrlBase]
+        for klass in classes:
+            classes.extend(klass.__subclasses__())
+            self.assertEqual(klass.__dictoffset__, 0, klass)
+        self.assertGreater(len(classes), 10)
+
+    def test_state(self):
+        config = linkcheck.configuration.Configuration()
+        aggregate = linkcheck.director.get_aggregate(config)
+        url_data = get_url_from("http://example.org/", 0, aggregate)
+        state = url_data.get_state()
+        self.assertEqual(state["url"], "http://example.org/")
+        copy = url_data.__class__.__new__(url_data.__class__)
+        copy.set_state(state)
+        self.assertEqual(copy.get_state(), state)
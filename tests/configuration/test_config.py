@@ -45,6 +45,8 @@ class TestConfig(TestBase):
         for scheme in ("http", "https", "ftp"):
             self.assertTrue(scheme in config["allowedschemes"])
         self.assertEqual(config["threads"], 5)
+        self.assertEqual(config["processes"], 2)
+        self.assertEqual(config["asyncchecks"], 500)
         self.assertEqual(config["timeout"], 42)
         self.assertEqual(config["aborttimeout"], 99)
         self.assertEqual(config["recursionlevel"], 1)
@@ -55,10 +57,28 @@ class TestConfig(TestBase):
         self.assertEqual(config["sslverify"], "/path/to/cacerts.crt")
         self.assertEqual(config["maxnumurls"], 1000)
         self.assertEqual(config["maxrequestspersecond"], 0.1)
+        self.assertTrue(config["adaptivehostrate"])
+        self.assertEqual(config["maxretries"], 3)
+        self.assertEqual(config["maxretryseconds"], 120)
+        self.assertEqual(
+            config.get_connectionlimits(), {"http": 20, "https": 30, "ftp": 2}
+        )
+        self.assertEqual(config["maxconnectionsperhost"], 4)
+        self.assertTrue(config["headfirst"])
+        self.assertTrue(config["streamlinks"])
+        self.assertTrue(config["hostqueues"])
+        self.assertEqual(config["queuesize"], 5000)
         self.assertEqual(config["maxrunseconds"], 1)
         self.assertEqual(config["maxfilesizeparse"], 100)
         self.assertEqual(config["maxfilesizedownload"], 100)
         self.assertEqual(config["resultcachesize"], 9999)
+        self.assertEqual(config["resultcachebytes"], 99999999)
+        self.assertEqual(config["resultcachefile"], "imadoofus.sqlite")
+        self.assertEqual(config["resultcachevalidttl"], 1000)
+        self.assertEqual(config["resultcacheinvalidttl"], 10)
+        self.assertTrue(config["revalidate"])
+        self.assertEqual(config["checkpointfile"], "imadoofus.checkpoint")
+        self.assertEqual(config["checkpointseconds"], 30)
         # filtering section
         patterns = [x["pattern"].pattern for x in config["externlinks"]]
         for prefix in ("ignore_", "nofollow_"):
@@ -59,3 +59,66 @@ class TestLFUCache(unittest.TestCase):
             self.d[i] = i
         self.d[1001] = 1001
         self.assertTrue(950 <= len(self.d) <= self.size)
+
+
+class TestHashSet(unittest.TestCase):
+    """Test hash set implementation."""
+
+    def test_add(self):
+        s = linkcheck.containers.HashSet(size=4)
+        self.assertTrue(s.add("a"))
+        self.assertFalse(s.add("a"))
+        self.assertIn("a", s)
+        self.assertNotIn("b", s)
+        self.assertEqual(len(s), 1)
+
+    def test_grow(self):
+        s = linkcheck.containers.HashSet(size=4)
+        keys = ["http://example.org/%d" % i for i in range(1000)]
+        for key in keys:
+            self.assertTrue(s.add(key))
+        self.assertEqual(len(s), 1000)
+        self.assertGreaterEqual(len(s.table), 2000)
+        for key in keys:
+            self.assertIn(key, s)
+            self.assertFalse(s.add(key))
+        self.assertNotIn("http://example.org/1000", s)
+
+    def test_discard(self):
+        s = linkcheck.containers.HashSet(size=4)
+        keys = ["http://example.org/%d" % i for i in range(1000)]
+        for key in keys:
+            s.add(key)
+        for key in keys[::2]:
+            self.assertTrue(s.discard(key))
+        self.assertFalse(s.discard(keys[0]))
+        self.assertEqual(len(s), 500)
+        for key in keys[::2]:
+            self.assertNotIn(key, s)
+        for key in keys[1::2]:
+            self.assertIn(key, s)
+        self.assertTrue(s.add(keys[0]))
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, linkcheck.containers.HashSet, 3)
+        self.assertRaises(ValueError, linkcheck.containers.HashSet, 0)
+
+
+class TestInternTable(unittest.TestCase):
+    """Test table of shared strings."""
+
+    def test_intern(self):
+        t = linkcheck.containers.InternTable(2)
+        a = "".join(["http://example.org/", "a"])
+        a2 = "".join(["http://example.org/", "a"])
+        self.assertIsNot(a, a2)
+        self.assertIs(t.intern(a), a)
+        self.assertIs(t.intern(a2), a)
+        t.intern("b")
+        t.intern("c")
+        # the oldest string has been removed
+        self.assertEqual(len(t), 2)
+        self.assertIs(t.intern(a2), a2)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, linkcheck.containers.InternTable, 0)
@@ -0,0 +1,150 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test the shared HTTP connection pool.
+"""
+
+import datetime
+import os
+import ssl
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from linkcheck import httppool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Handler keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_certificate(dirname):
+    """Write a self-signed certificate for localhost and its key to dirname
+    and return the certificate and key file names."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keyfile = os.path.join(dirname, "https_key.pem")
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+    subject = issuer = x509.Name([
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "LinkChecker"),
+        x509.NameAttribute(NameOID.COMMON_NAME, "linkchecker.github.io"),
+    ])
+    cert = x509.CertificateBuilder().subject_name(
+        subject
+    ).issuer_name(
+        issuer
+    ).public_key(
+        key.public_key()
+    ).serial_number(
+        x509.random_serial_number()
+    ).not_valid_before(
+        datetime.datetime.now(datetime.timezone.utc)
+    ).not_valid_after(
+        datetime.datetime(2119, 1, 2, 3, 4, 5)
+    ).add_extension(
+        x509.SubjectAlternativeName([x509.DNSName("localhost")]),
+        critical=False,
+    ).sign(key, hashes.SHA256())
+    certfile = os.path.join(dirname, "https_cert.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return certfile, keyfile
+
+
+class TestPoolAdapter(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("localhost", 0), KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = "http://localhost:%d/" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_shared_connection(self):
+        adapter = httppool.PoolAdapter(2)
+        start = httppool.stats.get()
+
+        def get():
+            session = requests.Session()
+            session.mount("http://", adapter)
+            self.assertEqual(session.get(self.url).text, "ok")
+
+        # the connection of the first thread is reused by the second
+        for dummy in range(2):
+            t = threading.Thread(target=get)
+            t.start()
+            t.join()
+        adapter.close()
+        end = httppool.stats.get()
+        self.assertEqual(end["requests"] - start["requests"], 2)
+        self.assertEqual(end["connections"] - start["connections"], 1)
+
+    def test_tls_resumption(self):
+        # TLS 1.3 sends the session ticket after the handshake
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.minimum_version = ssl.TLSVersion.TLSv1_3
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        certfile, keyfile = write_certificate(tmpdir.name)
+        context.load_cert_chain(certfile, keyfile=keyfile)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        url = "https://localhost:%d/" % self.server.server_port
+        adapter = httppool.PoolAdapter(1)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        start = httppool.stats.get()
+        for dummy in range(2):
+            self.assertEqual(session.get(url, verify=certfile).text, "ok")
+            # the next request needs a new connection
+            adapter.poolmanager.clear()
+        adapter.close()
+        end = httppool.stats.get()
+        self.assertEqual(end["tls_handshakes"] - start["tls_handshakes"], 1)
+        self.assertEqual(end["tls_resumed"] - start["tls_resumed"], 1)
+
+    def test_ssl_context(self):
+        adapter = httppool.PoolAdapter(1)
+        context = adapter.get_ssl_context(True)
+        self.assertIsInstance(context, httppool.ResumingSSLContext)
+        self.assertIs(adapter.get_ssl_context(True), context)
+        context = adapter.get_ssl_context(False)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+        self.assertFalse(context.check_hostname)
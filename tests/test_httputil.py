@@ -0,0 +1,44 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test HTTP utility functions.
+"""
+
+import unittest
+
+from linkcheck.httputil import get_retry_after
+
+
+class TestHttpUtil(unittest.TestCase):
+    """Test HTTP utility functions."""
+
+    def test_retry_after_seconds(self):
+        self.assertEqual(get_retry_after({"Retry-After": "120"}), 120)
+        self.assertEqual(get_retry_after({"Retry-After": " 0 "}), 0)
+
+    def test_retry_after_date(self):
+        # Wed, 21 Oct 2015 07:28:00 GMT
+        now = 1445412470
+        date = "Wed, 21 Oct 2015 07:28:00 GMT"
+        self.assertEqual(get_retry_after({"Retry-After": date}, now=now), 10)
+        # dates in the past mean no delay
+        self.assertEqual(get_retry_after({"Retry-After": date}, now=now + 20), 0)
+
+    def test_retry_after_invalid(self):
+        self.assertIsNone(get_retry_after({}))
+        self.assertIsNone(get_retry_after({"Retry-After": ""}))
+        self.assertIsNone(get_retry_after({"Retry-After": "soon"}))
+        self.assertIsNone(get_retry_after({"Retry-After": "-1"}))
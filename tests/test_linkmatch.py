@@ -0,0 +1,93 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test matching URLs against link patterns.
+"""
+
+import unittest
+
+from linkcheck import get_link_pat
+from linkcheck.checker.internpaturl import get_intern_pattern
+from linkcheck.linkmatch import LinkMatcher, get_prefixes
+
+
+def match_in_order(externlinks, internlinks, url):
+    """Match the patterns one by one like the matcher should."""
+    for entry in externlinks:
+        if bool(entry["pattern"].search(url)) != entry["negate"]:
+            return True, entry
+    for entry in internlinks:
+        if bool(entry["pattern"].search(url)) != entry["negate"]:
+            return False, entry
+    return None
+
+
+class TestLinkMatch(unittest.TestCase):
+    """Test matching URLs against link patterns."""
+
+    def test_prefixes(self):
+        pattern = get_link_pat(get_intern_pattern("http://www.example.com/a/b.html"))
+        self.assertEqual(sorted(get_prefixes(pattern["pattern"])), [
+            "http://example.com/a",
+            "http://www.example.com/a",
+            "https://example.com/a",
+            "https://www.example.com/a",
+        ])
+        for arg in ("^http://example.com", "example", "^a+", r"^\w", "^a$", "(?i)^a"):
+            self.assertIsNone(get_prefixes(get_link_pat(arg)["pattern"]), arg)
+        self.assertEqual(get_prefixes(get_link_pat(r"^a\.b")["pattern"]), ["a.b"])
+
+    def test_match(self):
+        externlinks = [
+            get_link_pat(r"^https?://example\.com/private", strict=True),
+            get_link_pat(r"\.pdf$"),
+            get_link_pat(r"!^https?://"),
+            get_link_pat(r"(?P<x>a)(?P=x)"),
+            get_link_pat(r"(?P<x>b)b"),
+        ]
+        internlinks = [
+            get_link_pat(get_intern_pattern("http://example.com/")),
+            get_link_pat(get_intern_pattern("https://www.example.org/docs/")),
+            get_link_pat(r"(?P<x>c)c"),
+            get_link_pat("^"),
+        ]
+        matcher = LinkMatcher(externlinks, internlinks)
+        urls = [
+            "http://example.com/private/a",
+            "https://www.example.com/index.html",
+            "https://example.com/file.pdf",
+            "ftp://example.com/",
+            "http://www.example.org/docs/a",
+            "http://www.example.org/other",
+            "http://example.net/aa",
+            "http://example.net/bb",
+            "http://example.net/cc",
+            "http://example.net/",
+        ]
+        for url in urls:
+            self.assertEqual(
+                matcher.match(url), match_in_order(externlinks, internlinks, url), url
+            )
+        self.assertIsNone(LinkMatcher([], []).match("http://example.com/"))
+
+    def test_is_current(self):
+        externlinks = [get_link_pat("^http://a/")]
+        internlinks = []
+        matcher = LinkMatcher(externlinks, internlinks)
+        self.assertTrue(matcher.is_current(externlinks, internlinks))
+        internlinks.append(get_link_pat("^http://b/"))
+        self.assertFalse(matcher.is_current(externlinks, internlinks))
+        self.assertFalse(matcher.is_current(list(externlinks), internlinks))
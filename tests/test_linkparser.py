@@ -17,7 +17,7 @@
 Test linkparser routines.
 """
 
-from linkcheck.htmlutil import htmlsoup, linkparse
+from linkcheck.htmlutil import linkparse
 
 from . import TestBase
 
@@ -29,9 +29,7 @@ class TestLinkparser(TestBase):
 
     def _test_one_link(self, content, url):
         self.count_url = 0
-        linkparse.find_links(
-            htmlsoup.make_soup(content), self._test_one_url(url), linkparse.LinkTags
-        )
+        linkparse.find_links(content, self._test_one_url(url), linkparse.LinkTags)
         self.assertEqual(self.count_url, 1)
 
     def _test_one_url(self, origurl):
@@ -47,7 +45,7 @@ class TestLinkparser(TestBase):
         def callback(url, line, column, name, base):
             self.assertTrue(False, "URL %r found" % url)
 
-        linkparse.find_links(htmlsoup.make_soup(content), callback, linkparse.LinkTags)
+        linkparse.find_links(content, callback, linkparse.LinkTags)
 
     def test_href_parsing(self):
         # Test <a href> parsing.
@@ -130,6 +128,64 @@ class TestLinkparser(TestBase):
         content = "<table style='background: url( \"%s\") no-repeat' >"
         self._test_one_link(content % url, url)
 
+    def test_link_names(self):
+        # Test link names and the order of nested and unclosed links.
+        content = (
+            '<p><a href="a" title="t"><img src="i" alt="alt">A <b>B</b></a>'
+            '<a href="c">C<script>x</script></p>D<a href="e"/>E<a href="f">F'
+        )
+        links = []
+
+        def callback(url, line, column, name, base):
+            links.append((url, column, name))
+
+        linkparse.find_links(content, callback, linkparse.LinkTags)
+        self.assertEqual(links, [
+            ("a", 4, "A B"),
+            ("i", 26, "alt"),
+            ("c", 63, "C"),
+            ("e", 99, ""),
+            ("f", 113, "F"),
+        ])
+
+    def test_analyze(self):
+        # Test that one pass finds links, anchors and robots meta elements.
+        content = (
+            '<meta name="robots" content="noindex, nofollow">'
+            '<a href="link" name="anchor">name</a><p id="para">'
+        )
+        analysis = linkparse.analyze(content)
+        self.assertEqual(analysis.links, [("link", 1, 49, "name", "")])
+        self.assertEqual(
+            [x[0] for x in analysis.anchors], ["anchor", "para"]
+        )
+        self.assertTrue(analysis.nofollow)
+        self.assertFalse(linkparse.analyze("<p>").nofollow)
+        analysis = linkparse.analyze(content, anchors=False)
+        self.assertEqual(analysis.links, [("link", 1, 49, "name", "")])
+        self.assertEqual(analysis.anchors, [])
+
+    def test_analyzer_parts(self):
+        # Test that links are found while the document is fed in parts.
+        analyzer = linkparse.DocumentAnalyzer()
+        analyzer.feed('<html><head><link href="style.css"><ti')
+        self.assertEqual([x[0] for x in analyzer.analysis.links], ["style.css"])
+        self.assertFalse(analyzer.head_done)
+        analyzer.feed('tle>T</title></head><body><img src="a.png"><a hr')
+        self.assertEqual(
+            [x[0] for x in analyzer.analysis.links], ["style.css", "a.png"]
+        )
+        self.assertTrue(analyzer.head_done)
+        analyzer.feed('ef="b.html">b</a>')
+        analysis = analyzer.close()
+        self.assertEqual(
+            [x[0] for x in analysis.links], ["style.css", "a.png", "b.html"]
+        )
+        self.assertEqual(analysis.links, linkparse.analyze(
+            '<html><head><link href="style.css"><title>T</title></head>'
+            '<body><img src="a.png"><a href="b.html">b</a>'
+        ).links)
+
     def test_comment_stripping(self):
         strip = linkparse.strip_c_comments
         content = "/* url('http://example.org')*/"
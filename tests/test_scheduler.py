@@ -0,0 +1,209 @@
+# Copyright (C) 2026 LinkChecker Authors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Test per-host request scheduling.
+"""
+
+import threading
+import unittest
+from collections import namedtuple
+
+import linkcheck.configuration
+import linkcheck.director
+from linkcheck.checker import get_url_from
+from linkcheck.director.checker import check_url
+from linkcheck.director.scheduler import (
+    ConnectionLimits,
+    HostScheduler,
+    get_connection_key,
+)
+
+UrlData = namedtuple("UrlData", "scheme host_key has_result")
+
+
+def get_url_data(host, scheme="http", has_result=False):
+    return UrlData(
+        scheme=scheme, host_key=host, has_result=has_result
+    )
+
+
+class TestHostScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = HostScheduler(10)
+
+    def test_reserve(self):
+        self.assertEqual(self.scheduler.reserve("example.org"), 0)
+        # the second request to the same host is scheduled later
+        wait = self.scheduler.reserve("example.org")
+        self.assertTrue(
+            HostScheduler.wait_time_min_default
+            <= wait
+            <= HostScheduler.wait_time_max_default
+        )
+        # other hosts are not affected
+        self.assertEqual(self.scheduler.reserve("example.com"), 0)
+
+    def test_is_due(self):
+        url_data = get_url_data("example.org")
+        self.assertTrue(self.scheduler.is_due(url_data))
+        self.scheduler.reserve("example.org")
+        self.assertFalse(self.scheduler.is_due(url_data))
+        self.assertTrue(self.scheduler.is_due(get_url_data("example.com")))
+        # only HTTP requests without result are throttled
+        self.assertTrue(self.scheduler.is_due(get_url_data("example.org", "ftp")))
+        self.assertTrue(
+            self.scheduler.is_due(get_url_data("example.org", has_result=True))
+        )
+
+    def test_maxrated(self):
+        self.scheduler = HostScheduler(1000)
+        self.scheduler.set_maxrated("example.org")
+        self.scheduler.reserve("example.org")
+        self.assertTrue(self.scheduler.reserve("example.org") <= 0.006)
+
+
+class TestAdaptiveHostScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = HostScheduler(10, adaptive=True)
+
+    def test_concurrency(self):
+        self.assertEqual(self.scheduler.reserve("example.org"), 0)
+        # a new host allows one request at a time
+        self.assertIsNone(self.scheduler.reserve("example.org"))
+        self.assertFalse(self.scheduler.is_due(get_url_data("example.org")))
+        self.assertEqual(self.scheduler.reserve("example.com"), 0)
+        self.scheduler.release("example.org", status=200, latency=0.1)
+        self.assertIsNotNone(self.scheduler.reserve("example.org"))
+
+    def test_wait_for_release(self):
+        self.scheduler.reserve("example.org")
+        reserved = threading.Event()
+
+        def wait_for_host():
+            self.scheduler.wait_for_host("example.org")
+            reserved.set()
+
+        t = threading.Thread(target=wait_for_host)
+        t.start()
+        self.assertFalse(reserved.wait(0.2))
+        self.scheduler.release("example.org", status=200, latency=0.1)
+        self.assertTrue(reserved.wait(5))
+        t.join()
+
+    def test_increase(self):
+        state = self.scheduler.get_state("example.org")
+        rate = state.rate
+        for dummy in range(100):
+            self.scheduler.reserve("example.org")
+            self.scheduler.release("example.org", status=200, latency=0.1)
+        self.assertGreater(state.rate, rate)
+        self.assertEqual(state.rate, self.scheduler.get_max_rate("example.org"))
+        self.assertEqual(int(state.limit), HostScheduler.limit_max)
+        self.assertEqual(state.active, 0)
+
+    def test_decrease(self):
+        state = self.scheduler.get_state("example.org")
+        state.limit = 4.0
+        for kwargs in (dict(status=429), dict(status=503), dict(timeout=True)):
+            rate = state.rate
+            self.scheduler.reserve("example.org")
+            self.scheduler.release("example.org", **kwargs)
+            self.assertEqual(state.rate, rate * HostScheduler.decrease_factor)
+        self.assertEqual(state.limit, 1.0)
+        # rising latency
+        self.scheduler.reserve("example.org")
+        self.scheduler.release("example.org", status=200, latency=0.1)
+        rate = state.rate
+        self.scheduler.reserve("example.org")
+        self.scheduler.release("example.org", status=200, latency=1.0)
+        self.assertEqual(state.rate, rate * HostScheduler.decrease_factor)
+
+    def test_not_adaptive(self):
+        scheduler = HostScheduler(10)
+        scheduler.reserve("example.org")
+        self.assertIsNotNone(scheduler.reserve("example.org"))
+        scheduler.release("example.org", status=429)
+        self.assertEqual(scheduler.states, {})
+
+
+class TestConnectionLimits(unittest.TestCase):
+    def setUp(self):
+        self.limits = ConnectionLimits({"http": 2, "https": 0, "ftp": 1}, 1)
+
+    def test_host_limit(self):
+        key = get_connection_key(get_url_data("example.org"))
+        self.assertTrue(self.limits.try_acquire(key))
+        self.assertFalse(self.limits.is_free(key))
+        self.assertFalse(self.limits.try_acquire(key))
+        other = get_connection_key(get_url_data("example.com"))
+        self.assertTrue(self.limits.try_acquire(other))
+        self.limits.release(key)
+        self.assertTrue(self.limits.try_acquire(key))
+
+    def test_scheme_limit(self):
+        for host in ("a.example", "b.example"):
+            self.limits.acquire(get_connection_key(get_url_data(host)))
+        key = get_connection_key(get_url_data("c.example"))
+        self.assertFalse(self.limits.is_free(key))
+        # HTTPS connections are not limited
+        self.assertTrue(
+            self.limits.is_free(get_connection_key(get_url_data("c.example", "https")))
+        )
+
+    def test_acquire_waits(self):
+        key = get_connection_key(get_url_data("example.org"))
+        self.limits.acquire(key)
+        acquired = threading.Event()
+
+        def acquire():
+            self.limits.acquire(key)
+            acquired.set()
+
+        t = threading.Thread(target=acquire)
+        t.start()
+        self.assertFalse(acquired.wait(0.1))
+        self.limits.release(key)
+        self.assertTrue(acquired.wait(5))
+        t.join()
+
+    def test_not_limited(self):
+        self.assertIsNone(get_connection_key(get_url_data("example.org", "mailto")))
+        self.assertIsNone(
+            get_connection_key(get_url_data("example.org", has_result=True))
+        )
+        self.assertTrue(self.limits.try_acquire(None))
+        self.assertFalse(ConnectionLimits({"http": 0}, 0).is_limited())
+
+    def test_is_due(self):
+        scheduler = HostScheduler(10, connection_limits=self.limits)
+        url_data = get_url_data("example.org")
+        self.assertTrue(scheduler.is_due(url_data))
+        self.limits.acquire(get_connection_key(url_data))
+        self.assertFalse(scheduler.is_due(url_data))
+
+
+class TestConnectionRequeue(unittest.TestCase):
+    def test_requeue(self):
+        config = linkcheck.configuration.Configuration()
+        config["maxconnectionsperhost"] = 1
+        aggregate = linkcheck.director.get_aggregate(config)
+        url_data = get_url_from("http://example.org/", 0, aggregate)
+        key = aggregate.get_connection_key(url_data)
+        self.assertTrue(aggregate.try_acquire_connection(key))
+        # the URL is queued again instead of waiting for the connection
+        check_url(url_data, config["logger"])
+        self.assertEqual(aggregate.urlqueue.delayed[0][2], url_data)
+        self.assertFalse(url_data.has_result)
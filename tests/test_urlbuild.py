@@ -70,3 +70,16 @@ class TestUrlBuild(unittest.TestCase):
         o = get_url_from(base_url, recursion_level, aggregate, parent_url=parent_url)
         o.build_url()
         self.assertEqual(o.url, parent_url + base_url)
+
+    def test_join_url_cached(self):
+        join_url = linkcheck.checker.urlbase.join_url
+        join_url.cache_clear()
+        parent_url = "http://example.org/a/b.html#x"
+        for _i in range(2):
+            url, base_ref = join_url("../c/./d.html", parent_url, None, None)
+            self.assertEqual(url, "http://example.org/c/d.html")
+            self.assertIsNone(base_ref)
+        self.assertEqual(join_url.cache_info().hits, 1)
+        url, base_ref = join_url("d.html", parent_url, "e/", None)
+        self.assertEqual(url, "http://example.org/a/e/d.html")
+        self.assertEqual(base_ref, "http://example.org/a/e/")